@@ -0,0 +1,280 @@
+import csv
+import os
+import shutil
+import tempfile
+import time
+from collections import defaultdict
+
+from address_matching import BLOCKING_KEYS, TrigramIndex, match_key_frame, related_columns
+from normalize_addresses import classify_columns, normalize_address_columns, read_table_chunks
+
+# Spill partitions per run; each one is resolved in memory on its own
+DEDUPE_PARTITIONS = 64
+
+# Exact match keys: rows are duplicates when all of these fields are equal
+MATCH_KEYS = {
+    'address': ['address'],
+    'address_zip': ['address', 'zip'],
+    'address_city': ['address', 'city'],
+}
+
+# Fields of a spill file row, after the file number, row number and column
+SPILL_FIELDS = ['original', 'address', 'house_number', 'zip', 'city']
+
+# Columns of the duplicate report
+REPORT_FIELDS = ['group', 'file', 'row', 'column', 'original', 'address', 'zip', 'city']
+
+def _key_fields(key, threshold):
+    """Resolve a MATCH_KEYS / BLOCKING_KEYS name or a field list to the partition fields."""
+    fields = (MATCH_KEYS.get(key) or BLOCKING_KEYS.get(key)) if isinstance(key, str) else key
+    if not fields or not set(fields) <= {'address', 'house_number', 'zip', 'city'}:
+        raise ValueError(f"Unknown key '{key}'. Choose from: {list(MATCH_KEYS) + list(BLOCKING_KEYS)}")
+    if threshold is not None:
+        if 'address' in fields:
+            raise ValueError("threshold needs a blocking key that does not include the address")
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be greater than 0 and at most 1")
+    return list(fields)
+
+def _line_one_columns(columns):
+    """The 'Address line 1' columns among ``columns``, in file order."""
+    reverse_mapping, _ = classify_columns(columns)
+    return [col for col in columns if reverse_mapping.get(col) == 'Address line 1']
+
+def _partition_file(file_number, file_path, spill_dir, options):
+    """
+    Normalize one file chunk by chunk and append its address records to the spill files.
+
+    Every non-blank address cell becomes one record, written to the spill
+    file ``part-<partition>-<file_number>.csv`` picked by hashing its key
+    fields. The hash doesn't depend on the process or the column dtype, so
+    equal keys from every file land in the same partition.
+
+    Returns the number of ``rows`` read and ``records`` spilled per partition.
+    """
+    import pandas as pd
+
+    fields = options['fields']
+    partitions = options['partitions']
+    counts = [0] * partitions
+    spills = {}
+    rows = 0
+    columns = options['columns']
+    try:
+        for chunk in read_table_chunks(file_path, options['chunksize'], options['encoding']):
+            if columns is None:
+                columns = _line_one_columns(list(chunk.columns))
+            present = [col for col in columns if col in chunk.columns]
+            chunk = normalize_address_columns(chunk, specific_columns=present, verbose=False,
+                                              inplace=True, rules=options['rules'])
+
+            for col in present:
+                related = related_columns(chunk.columns, col)
+                key_columns = {}
+                for field, name in (('zip', 'ZIP Code'), ('city', 'City')):
+                    # An explicit column only applies to the files that have it
+                    column = options[f'{field}_column']
+                    key_columns[field] = column if column in chunk.columns else related.get(name)
+                    if field in fields and key_columns[field] is None:
+                        raise ValueError(f"No {field} column found for '{col}' in {file_path}; "
+                                         f"pass {field}_column explicitly")
+                keys = match_key_frame(chunk, col, key_columns['zip'], key_columns['city'])
+                keys.insert(0, 'original', chunk[col])
+                keys.insert(0, 'column', col)
+                keys.insert(0, 'row', range(rows, rows + len(chunk)))
+                keys.insert(0, 'file', file_number)
+                # Blank addresses, or a missing key field, never match anything
+                keys = keys[keys[fields].notna().all(axis=1)]
+
+                hashes = pd.util.hash_pandas_object(keys[fields].astype(object), index=False)
+                for partition, records in keys.groupby(hashes.to_numpy() % partitions, sort=False):
+                    if partition not in spills:
+                        path = os.path.join(spill_dir, f'part-{partition:04d}-{file_number:04d}.csv')
+                        spills[partition] = open(path, 'w', encoding='utf-8', newline='')
+                    records.to_csv(spills[partition], header=False, index=False)
+                    counts[partition] += len(records)
+            rows += len(chunk)
+    finally:
+        for handle in spills.values():
+            handle.close()
+    return {'rows': rows, 'records': counts}
+
+def _resolve_partition(spill_dir, partition, file_count, fields, threshold):
+    """
+    Find the duplicate groups of one partition, reading only its spill files.
+
+    Records are grouped by the partition fields. With a ``threshold``, the
+    distinct addresses of each group are linked when their trigram
+    similarity reaches it, and linked addresses form one duplicate group;
+    otherwise each distinct address does.
+
+    Returns:
+    --------
+    list
+        Duplicate groups of two or more records, each a list of
+        ``[file_number, row, column, original, address, house_number, zip, city]``
+        in file and row order, ordered by their first record
+    """
+    positions = [3 + SPILL_FIELDS.index(field) for field in fields]
+    blocks = defaultdict(lambda: defaultdict(list))
+    for file_number in range(file_count):
+        path = os.path.join(spill_dir, f'part-{partition:04d}-{file_number:04d}.csv')
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding='utf-8', newline='') as f:
+            for record in csv.reader(f):
+                record[0], record[1] = int(record[0]), int(record[1])
+                block = tuple(record[position] for position in positions)
+                blocks[block][record[4]].append(record)
+
+    groups = []
+    for addresses in blocks.values():
+        clusters = list(addresses.values())
+        if threshold is not None and len(addresses) > 1:
+            clusters = _link_similar(addresses, threshold)
+        for records in clusters:
+            if len(records) > 1:
+                # Stable, so records of one row keep their column order
+                records.sort(key=lambda record: (record[0], record[1]))
+                groups.append(records)
+    groups.sort(key=lambda records: (records[0][0], records[0][1]))
+    return groups
+
+def _link_similar(addresses, threshold):
+    """Merge the record lists of addresses whose trigram similarity reaches ``threshold``."""
+    parent = {address: address for address in addresses}
+
+    def root(address):
+        while parent[address] != address:
+            parent[address] = parent[parent[address]]
+            address = parent[address]
+        return address
+
+    for address_a, address_b, _ in TrigramIndex(addresses).similar_pairs(threshold):
+        parent[root(address_b)] = root(address_a)
+
+    clusters = defaultdict(list)
+    for address, records in addresses.items():
+        clusters[root(address)].extend(records)
+    return list(clusters.values())
+
+def dedupe_files(input_files, report_file, columns=None, key='address', threshold=None,
+                 partitions=DEDUPE_PARTITIONS, chunksize=100000, workers=1, spill_dir=None,
+                 encoding=None, zip_column=None, city_column=None, rules=None):
+    """
+    Find duplicate addresses across files that together don't fit in memory.
+
+    Works in two passes. First every file is streamed ``chunksize`` rows at a
+    time, its address columns are normalized and each address record is
+    hash-partitioned by its key into on-disk spill files. Then the
+    partitions are resolved one at a time, so memory is bounded by the
+    largest partition rather than the input, and the duplicate groups are
+    written to ``report_file`` as they are found. With several workers,
+    files are partitioned and partitions resolved in parallel processes.
+
+    Parameters:
+    -----------
+    input_files : list
+        CSV, Parquet or Arrow IPC files
+    report_file : str
+        CSV file for the duplicate groups, one line per record (REPORT_FIELDS).
+        ``row`` is the 0-based position of the data row in its file.
+    columns : list, optional
+        Address columns to compare. Defaults to the 'Address line 1' columns
+        of each file, so unit lines don't match each other.
+    key : str or list, optional
+        A MATCH_KEYS name (exact match on the normalized address, optionally
+        with ZIP or city), a BLOCKING_KEYS name, or a list of match-key
+        fields (``address``, ``house_number``, ``zip``, ``city``).
+        Default 'address'.
+    threshold : float, optional
+        With a blocking key: records in the same block are duplicates when
+        their addresses' trigram similarity is at least this. Without it,
+        only equal normalized addresses within a block are.
+    partitions : int, optional
+        Number of spill partitions (default DEDUPE_PARTITIONS). Each file
+        keeps up to this many spill files open while it is partitioned.
+    chunksize : int, optional
+        Rows read at a time (default 100000)
+    workers : int, optional
+        Worker processes (default 1)
+    spill_dir : str, optional
+        Directory for the temporary spill files (default: the system temp
+        directory); they are removed afterwards
+    encoding : str, optional
+        CSV encoding. If None, it is detected per file.
+    zip_column, city_column : str, optional
+        ZIP/City columns for keys using them; auto-detected for numbered
+        export columns (see related_columns)
+    rules : RuleSet, optional
+        Normalization rules (default: the built-in rules)
+
+    Returns:
+    --------
+    dict
+        ``files``, ``rows`` read, address ``records`` partitioned,
+        ``partitions``, ``largest_partition`` (records), duplicate ``groups``,
+        ``duplicates`` (records in a group), ``report`` and ``elapsed`` seconds
+    """
+    fields = _key_fields(key, threshold)
+    if partitions < 1:
+        raise ValueError("partitions must be a positive integer")
+
+    start = time.perf_counter()
+    options = {
+        'fields': fields,
+        'partitions': partitions,
+        'columns': columns,
+        'chunksize': chunksize,
+        'encoding': encoding,
+        'zip_column': zip_column,
+        'city_column': city_column,
+        'rules': rules,
+    }
+    spill_dir = tempfile.mkdtemp(prefix='address_dedupe_', dir=spill_dir)
+    executor = None
+    try:
+        if workers and workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+
+            executor = ProcessPoolExecutor(max_workers=workers)
+
+        spilled = [
+            executor.submit(_partition_file, number, path, spill_dir, options) if executor
+            else _partition_file(number, path, spill_dir, options)
+            for number, path in enumerate(input_files)
+        ]
+        spilled = [result.result() if executor else result for result in spilled]
+        counts = [sum(result['records'][p] for result in spilled) for p in range(partitions)]
+
+        arguments = [(spill_dir, p, len(input_files), fields, threshold) for p in range(partitions) if counts[p]]
+        resolved = (executor.map(_resolve_partition, *zip(*arguments)) if executor and arguments
+                    else (_resolve_partition(*args) for args in arguments))
+
+        group_count = duplicates = 0
+        with open(report_file, 'w', encoding='utf-8', newline='') as out:
+            writer = csv.writer(out)
+            writer.writerow(REPORT_FIELDS)
+            for groups in resolved:
+                for records in groups:
+                    for file_number, row, column, original, address, _, zip_code, city in records:
+                        writer.writerow([group_count, input_files[file_number], row, column,
+                                         original, address, zip_code, city])
+                    group_count += 1
+                    duplicates += len(records)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        shutil.rmtree(spill_dir, ignore_errors=True)
+
+    return {
+        'files': len(input_files),
+        'rows': sum(result['rows'] for result in spilled),
+        'records': sum(counts),
+        'partitions': partitions,
+        'largest_partition': max(counts),
+        'groups': group_count,
+        'duplicates': duplicates,
+        'report': report_file,
+        'elapsed': time.perf_counter() - start,
+    }
@@ -0,0 +1,399 @@
+import math
+from itertools import combinations
+
+import numpy as np
+
+from address_normalizer import AddressNormalizer
+from normalize_addresses import classify_columns
+
+# Leading house number of a normalized address ("123 Main St" -> "123"), not a fraction
+HOUSE_NUMBER_PATTERN = r'^(\d+)\b(?!/)'
+
+# Candidates must share this many of the rarest trigrams probed by TrigramIndex
+COUNT_FILTER = 3
+
+# Above this many candidates TrigramIndex verifies them with vectorized posting-list lookups
+VERIFY_BATCH = 64
+
+# Blocking keys available to candidate_pairs: name -> match-key fields
+BLOCKING_KEYS = {
+    'house_number_zip': ['house_number', 'zip'],
+    'house_number_city': ['house_number', 'city'],
+    'house_number': ['house_number'],
+    'zip': ['zip'],
+    'city': ['city'],
+}
+
+def related_columns(columns, address_column):
+    """
+    Find the City/State/ZIP Code columns that belong with an address column.
+
+    Numbered export columns (e.g. ``CnAdrAll_1_01_Addrline1``) are grouped by
+    their N index using the COLUMN_PATTERNS recognized by classify_columns.
+
+    Returns:
+    --------
+    dict
+        Standard name -> column name, e.g. ``{'City': 'CnAdrAll_1_01_City'}``.
+        Empty if the address column is not part of a numbered group.
+    """
+    _, groups = classify_columns(columns)
+    for group in groups.values():
+        if address_column in group.values():
+            return {name: col for name, col in group.items() if col != address_column}
+    return {}
+
+def match_key_frame(df, address_column, zip_column=None, city_column=None):
+    """
+    Build the match-key components for every row of a DataFrame.
+
+    Uses the ``n_`` column written by normalize_address_columns when present,
+    otherwise normalizes ``address_column`` on the fly. ZIP and City columns
+    are auto-detected with related_columns when not given.
+
+    Parameters:
+    -----------
+    df : pandas.DataFrame
+        The DataFrame containing the address column
+    address_column : str
+        Original (not ``n_``) address column name
+    zip_column, city_column : str, optional
+        Columns holding the ZIP code and city of the address
+
+    Returns:
+    --------
+    pandas.DataFrame
+        Columns ``address``, ``house_number``, ``zip`` and ``city`` with the
+        same index as ``df``; missing components are null
+    """
+    normalized_col = f'n_{address_column}'
+    if normalized_col in df.columns:
+        address = df[normalized_col]
+    else:
+        address = AddressNormalizer().normalize_series(df[address_column])
+
+    related = related_columns(df.columns, address_column)
+    zip_column = zip_column or related.get('ZIP Code')
+    city_column = city_column or related.get('City')
+
+    keys = address.to_frame('address')
+    if address.dtype.kind not in 'OSU' and str(address.dtype) not in ('string', 'str'):
+        # Numeric or all-null columns (e.g. a mostly empty Address line 2 read
+        # with read_csv) hold no addresses
+        keys['address'] = None
+    else:
+        keys['address'] = keys['address'].where(keys['address'].str.strip() != '')
+    keys['house_number'] = keys['address'].str.extract(HOUSE_NUMBER_PATTERN, expand=False)
+    # ZIP+4 and 5-digit ZIP codes block together
+    keys['zip'] = df[zip_column].astype('string').str.strip().str[:5] if zip_column else None
+    keys['city'] = df[city_column].astype('string').str.strip().str.upper() if city_column else None
+    return keys
+
+def _group_rows(keys, fields):
+    """Hash rows by ``fields`` in one pass; returns {key tuple: [row ids]}, nulls skipped."""
+    for field in ('zip', 'city'):
+        if field in fields and len(keys) and keys[field].isna().all():
+            raise ValueError(f"No {field} values found; pass {field}_column explicitly")
+
+    # Rows without an address never match anything
+    keys = keys[keys['address'].notna()]
+    groups = keys[fields].groupby(fields, sort=False, dropna=True).indices
+    index = keys.index
+    return {
+        (key if isinstance(key, tuple) else (key,)): list(index[positions])
+        for key, positions in groups.items()
+    }
+
+def build_address_index(df, address_column, use_zip=False, use_city=False,
+                        zip_column=None, city_column=None):
+    """
+    Build a hash index of normalized address (optionally plus ZIP/City) -> row ids.
+
+    Parameters:
+    -----------
+    df : pandas.DataFrame
+        Output of normalize_address_columns (or any DataFrame with the address column)
+    address_column : str
+        Original (not ``n_``) address column name
+    use_zip, use_city : bool, optional
+        Also key on the ZIP code / city, so equal streets in different towns don't match
+    zip_column, city_column : str, optional
+        ZIP/City columns; auto-detected for numbered export columns
+
+    Returns:
+    --------
+    dict
+        Key tuple -> list of row index labels, in order of first appearance.
+        Rows with a blank address (or a missing ZIP/City when used) are left out.
+    """
+    keys = match_key_frame(df, address_column, zip_column, city_column)
+    fields = ['address'] + (['zip'] if use_zip else []) + (['city'] if use_city else [])
+    return _group_rows(keys, fields)
+
+def find_duplicate_clusters(df, address_column, use_zip=False, use_city=False,
+                            zip_column=None, city_column=None):
+    """
+    Find groups of rows sharing the same normalized address, in a single hashing pass.
+
+    Takes the same arguments as build_address_index.
+
+    Returns:
+    --------
+    list
+        Lists of row index labels, one per cluster of two or more rows
+    """
+    index = build_address_index(df, address_column, use_zip, use_city, zip_column, city_column)
+    return [rows for rows in index.values() if len(rows) > 1]
+
+def candidate_pairs(df, address_column, blocking_key='house_number_zip', max_block_size=None,
+                    zip_column=None, city_column=None):
+    """
+    Yield candidate record pairs that share a blocking key.
+
+    Rows are hashed into blocks (e.g. house number + ZIP) and pairs are only
+    produced inside each block, so the work grows with the block sizes
+    instead of quadratically with the number of rows.
+
+    Parameters:
+    -----------
+    df : pandas.DataFrame
+        Output of normalize_address_columns (or any DataFrame with the address column)
+    address_column : str
+        Original (not ``n_``) address column name
+    blocking_key : str or list, optional
+        A name from BLOCKING_KEYS or a list of match-key fields
+        (``address``, ``house_number``, ``zip``, ``city``). Default 'house_number_zip'.
+    max_block_size : int, optional
+        Skip blocks with more rows than this (e.g. a ZIP-only block for a whole town)
+    zip_column, city_column : str, optional
+        ZIP/City columns; auto-detected for numbered export columns
+
+    Yields:
+    -------
+    tuple
+        ``(row_id_a, row_id_b)`` with ``row_id_a`` appearing before ``row_id_b``
+    """
+    fields = BLOCKING_KEYS.get(blocking_key, blocking_key) if isinstance(blocking_key, str) else blocking_key
+    if isinstance(fields, str):
+        raise ValueError(f"Unknown blocking key '{blocking_key}'. Choose from: {list(BLOCKING_KEYS)}")
+
+    keys = match_key_frame(df, address_column, zip_column, city_column)
+    for rows in _group_rows(keys, list(fields)).values():
+        if len(rows) < 2 or (max_block_size is not None and len(rows) > max_block_size):
+            continue
+        yield from combinations(rows, 2)
+
+def address_trigrams(address):
+    """
+    Return the set of character trigrams of a normalized address.
+
+    Matching is case-insensitive and the string is padded so that the start
+    and end of the address form trigrams of their own ("12 Oak" ->
+    {"  1", " 12", "12 ", "2 o", " oa", "oak", "ak "}).
+    """
+    padded = f"  {address.lower()} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def _prefix_length(size, threshold):
+    """
+    How many of ``size`` trigrams must be probed so that any address with
+    similarity >= ``threshold`` shares one of them.
+
+    Jaccard >= t implies at least ceil(t * size) shared trigrams, so at most
+    size - ceil(t * size) of them can be missing from a match.
+    """
+    # Tolerance so e.g. 0.8 * 5 doesn't round up to a required overlap of 5
+    return size - math.ceil(threshold * size - 1e-9) + 1
+
+def trigram_similarity(a, b):
+    """Jaccard similarity of the trigram sets of two addresses, from 0.0 to 1.0."""
+    grams_a, grams_b = address_trigrams(a), address_trigrams(b)
+    shared = len(grams_a & grams_b)
+    return shared / (len(grams_a) + len(grams_b) - shared)
+
+class TrigramIndex:
+    """
+    Inverted trigram index over distinct normalized addresses for fuzzy lookups.
+
+    Each trigram maps to the sorted ids of the addresses containing it.
+    Queries use prefix filtering: an address with Jaccard similarity of at
+    least ``t`` to a query of ``n`` trigrams shares at least ``ceil(t * n)``
+    of them, so it must contain one of any ``n - ceil(t * n) + 1`` query
+    trigrams. Only the posting lists of the rarest ones are read (plus
+    COUNT_FILTER - 1 more, keeping addresses found at least COUNT_FILTER
+    times), candidates outside the possible length range are dropped, and
+    the rest are verified exactly. Common trigrams such as "st " are
+    therefore never scanned, and the work per query depends on how many
+    addresses are similar rather than on the size of the index.
+
+    Parameters:
+    -----------
+    addresses : iterable
+        Normalized addresses; nulls, blanks and repeats are skipped
+    """
+
+    def __init__(self, addresses):
+        self.addresses = []
+        sizes = []
+        postings = {}
+        seen = set()
+        for address in addresses:
+            if not isinstance(address, str) or not address.strip() or address in seen:
+                continue
+            seen.add(address)
+            address_id = len(self.addresses)
+            self.addresses.append(address)
+            grams = address_trigrams(address)
+            sizes.append(len(grams))
+            for gram in grams:
+                posting = postings.get(gram)
+                if posting is None:
+                    postings[gram] = [address_id]
+                else:
+                    posting.append(address_id)
+
+        self._sizes = np.array(sizes, dtype=np.int32)
+        self._postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    def __len__(self):
+        return len(self.addresses)
+
+    def _candidates(self, grams, threshold, below=None):
+        """Ids (under ``below`` if given) of the indexed addresses that can reach ``threshold``."""
+        empty = np.empty(0, dtype=np.int32)
+        size = len(grams)
+        prefix = _prefix_length(size, threshold)
+        # Probing min_shared - 1 more trigrams, a match must turn up min_shared times
+        min_shared = min(COUNT_FILTER, size - prefix + 1)
+        rarest = sorted(grams, key=lambda gram: len(self._postings.get(gram, empty)))
+        lists = [self._postings[gram] for gram in rarest[:prefix + min_shared - 1]
+                 if gram in self._postings]
+        if below is not None:
+            lists = [ids[:np.searchsorted(ids, below)] for ids in lists]
+        if not lists:
+            return empty
+        candidates, counts = np.unique(np.concatenate(lists), return_counts=True)
+        return self._length_filter(candidates[counts >= min_shared], size, threshold)
+
+    def _length_filter(self, candidates, size, threshold):
+        """Drop candidates too short or too long to reach ``threshold``: t * size <= |y| <= size / t."""
+        sizes = self._sizes[candidates]
+        keep = (sizes >= threshold * size - 1e-9) & (sizes * threshold <= size + 1e-9)
+        return candidates[keep]
+
+    def _verify(self, grams, candidates, threshold):
+        """Return (similarities, ids) of the candidates that reach ``threshold``."""
+        if len(candidates) <= VERIFY_BATCH:
+            # A few candidates: intersecting their trigram sets beats one numpy call per trigram
+            shared = np.array([len(grams & address_trigrams(self.addresses[address_id]))
+                               for address_id in candidates.tolist()], dtype=np.int32)
+        else:
+            # Binary search of all candidates in each sorted posting list
+            shared = np.zeros(len(candidates), dtype=np.int32)
+            for gram in grams:
+                posting = self._postings.get(gram)
+                if posting is not None:
+                    found = np.searchsorted(posting, candidates)
+                    shared += posting[np.minimum(found, len(posting) - 1)] == candidates
+        similarity = shared / (len(grams) + self._sizes[candidates] - shared)
+        keep = similarity >= threshold
+        return similarity[keep], candidates[keep]
+
+    def search(self, address, threshold=0.5, top_k=None):
+        """
+        Find indexed addresses similar to a normalized ``address``.
+
+        Parameters:
+        -----------
+        address : str
+            Normalized address to look up (e.g. normalize_address output)
+        threshold : float, optional
+            Minimum trigram similarity, greater than 0 and at most 1 (default 0.5)
+        top_k : int, optional
+            Return only the ``top_k`` most similar addresses
+
+        Returns:
+        --------
+        list
+            ``(similarity, address)`` tuples, most similar first
+        """
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be greater than 0 and at most 1")
+        if not isinstance(address, str) or not address.strip():
+            return []
+
+        grams = address_trigrams(address)
+        similarity, ids = self._verify(grams, self._candidates(grams, threshold), threshold)
+        # Most similar first, ties in index order (ids are ascending)
+        order = np.argsort(-similarity, kind='stable')
+        if top_k is not None:
+            order = order[:top_k]
+        return [(float(similarity[i]), self.addresses[ids[i]]) for i in order]
+
+    def similar_pairs(self, threshold=0.8):
+        """
+        Yield every pair of distinct indexed addresses with similarity >= ``threshold``.
+
+        Each address is looked up, like search, among the addresses indexed
+        before it only, so every pair is produced once and nothing is
+        compared all-to-all.
+
+        Yields:
+        -------
+        tuple
+            ``(address_a, address_b, similarity)`` with ``address_a`` indexed first
+        """
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be greater than 0 and at most 1")
+        for address_id, address in enumerate(self.addresses):
+            grams = address_trigrams(address)
+            candidates = self._candidates(grams, threshold, below=address_id)
+            if len(candidates):
+                similarity, ids = self._verify(grams, candidates, threshold)
+                for other_id, value in zip(ids.tolist(), similarity.tolist()):
+                    yield self.addresses[other_id], address, value
+
+def build_trigram_index(df, address_column):
+    """
+    Build a TrigramIndex over the normalized addresses of a DataFrame.
+
+    Uses the ``n_`` column when present, like match_key_frame. Look up rows
+    for a matched address with build_address_index.
+    """
+    return TrigramIndex(match_key_frame(df, address_column)['address'])
+
+def fuzzy_duplicate_pairs(df, address_column, threshold=0.8):
+    """
+    Yield pairs of rows whose normalized addresses are similar but not necessarily equal.
+
+    Catches typo variants exact matching misses ("123 Canyn Lake Cir" vs
+    "123 Canyon Lake Cir"). Rows are grouped by normalized address in one
+    hashing pass, similar distinct addresses are found with
+    TrigramIndex.similar_pairs, and rows sharing an address pair up with
+    similarity 1.0.
+
+    Parameters:
+    -----------
+    df : pandas.DataFrame
+        Output of normalize_address_columns (or any DataFrame with the address column)
+    address_column : str
+        Original (not ``n_``) address column name
+    threshold : float, optional
+        Minimum trigram similarity (see trigram_similarity), default 0.8
+
+    Yields:
+    -------
+    tuple
+        ``(row_id_a, row_id_b, similarity)``
+    """
+    keys = match_key_frame(df, address_column)
+    rows = {key[0]: ids for key, ids in _group_rows(keys, ['address']).items()}
+
+    for ids in rows.values():
+        for row_a, row_b in combinations(ids, 2):
+            yield row_a, row_b, 1.0
+
+    for address_a, address_b, similarity in TrigramIndex(rows).similar_pairs(threshold):
+        for row_a in rows[address_a]:
+            for row_b in rows[address_b]:
+                yield row_a, row_b, similarity
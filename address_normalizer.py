@@ -1,46 +1,150 @@
-import re
+import heapq
+import time
+from collections import OrderedDict, namedtuple
 
-class AddressNormalizer:
-    def __init__(self):
-        # Configurations
-        self.ignore_list = {"Apartment", "Apartments","Apt", "Penthouse", "Ph", "Basement", "Bsmt", "Pier", "Building", "Bldg", "Rear", "Department", "Dept", "Room", "Rm","Floor", "Fl", "Side", "Front", "Frnt", "Slip", "Hanger","Hngr", "Space", "Spc", "Key",  "Stop", "Lobby", "Lbby","Suite", "Ste", "Lot", "Trailer", "Trlr", "Lower", "Lowr", "Unit","Office", "Ofc", "Upper", "Uppr"}
-        self.directional = {'S', 'W', 'N', 'E', 'SE', 'SW', 'NE', 'NW', 'PO'} 
-        self.street_suffix_mapping = {'Alley': 'Aly','Anex': 'Anx','Annex': 'Anx', 'Apartment': 'Apt','Apartments': 'Apt','Arcade': 'Arc','Avenue': 'Ave','Bayou': 'Byu','Beach': 'Bch','Bend': 'Bnd','Bluff': 'Blf','Bluffs': 'Blfs','Bottom': 'Btm','Boulevard': 'Blvd','Branch': 'Br','Bridge': 'Brg','Brook': 'Brk','Brooks': 'Brks','Burg': 'Bg','Burgs': 'Bgs','Bypass': 'Byp','Camp': 'Cp','Canyon': 'Cyn','Cape': 'Cpe','Causeway': 'Cswy','Center': 'Ctr','Centers': 'Ctrs','Circle': 'Cir','Circles': 'Cirs','Cliff': 'Clf','Cliffs': 'Clfs','Club': 'Clb','Common': 'Cmn','Commons': 'Cmns','Corner': 'Cor','Corners': 'Cors','Course': 'Crse','Court': 'Ct','Courts': 'Cts','Cove': 'Cv','Coves': 'Cvs','Creek': 'Crk','Crescent': 'Cres','Crest': 'Crst','Crossing': 'Xing','Crossroad': 'Xrd','Crossroads': 'Xrds','Curve': 'Curv','Dale': 'Dl','Dam': 'Dm','Divide': 'Dv','Drive': 'Dr','Drives': 'Drs','Estate': 'Est','Estates': 'Ests','Expressway': 'Expy','Extension': 'Ext','Extensions': 'Exts','Fall': 'Fall','Falls': 'Fls','Ferry': 'Fry','Field': 'Fld','Fields': 'Flds','Flat': 'Flt','Flats': 'Flts','Ford': 'Frd','Fords': 'Frds','Forest': 'Frst','Forge': 'Frg','Forges': 'Frgs','Fork': 'Frk','Forks': 'Frks','Fort': 'Ft','Freeway': 'Fwy','Garden': 'Gdn','Gardens': 'Gdns','Gateway': 'Gtwy','Glen': 'Gln','Glens': 'Glns','Green': 'Grn','Greens': 'Grns','Grove': 'Grv','Groves': 'Grvs','Harbor': 'Hbr','Harbors': 'Hbrs','Haven': 'Hvn','Heights': 'Hts','Highway': 'Hwy','Hill': 'Hl','Hills': 'Hls','Hollow': 'Holw','Inlet': 'Inlt','Island': 'Is','Islands': 'Iss','Isle': 'Isle','Junction': 'Jct','Junctions': 'Jcts','Key': 'Ky','Keys': 'Kys','Knoll': 'Knl','Knolls': 'Knls','Lake': 'Lk','Lakes': 'Lks','Land': 'Land','Landing': 'Lndg','Lane': 'Ln','Light': 'Lgt','Lights': 'Lgts','Loaf': 'Lf','Lock': 'Lck','Locks': 'Lcks','Lodge': 'Ldg','Loop': 'Lp','Mall': 'Mall','Manor': 'Mnr','Manors': 'Mnrs','Meadow': 'Mdw','Meadows': 'Mdws','Mews': 'Mews','Mill': 'Ml','Mills': 'Mls','Mission': 'Msn','Motorway': 'Mtwy','Mount': 'Mt','Mountain': 'Mtn','Mountains': 'Mtns','Neck': 'Nck','Orchard': 'Orch','Oval': 'Oval','Overpass': 'Opas','Park': 'Park','Parkway': 'Pkwy','Pass': 'Pass','Passage': 'Psge','Path': 'Path','Pike': 'Pike','Pine': 'Pne','Pines': 'Pnes','Place': 'Pl','Plain': 'Pln','Plains': 'Plns','Plaza': 'Plz','Point': 'Pt','Points': 'Pts','Port': 'Prt','Ports': 'Prts','Prairie': 'Pr','Radial': 'Radl','Ranch': 'Rnch','Rapid': 'Rpd','Rapids': 'Rpds','Rest': 'Rst','Ridge': 'Rdg','Ridges': 'Rdgs','River': 'Riv','Road': 'Rd','Roads': 'Rds','Route': 'Rte','Row': 'Row','Rue': 'Rue','Run': 'Run','Shoal': 'Shl','Shoals': 'Shls','Shore': 'Shr','Shores': 'Shrs','Skyway': 'Skyway','Spring': 'Spg','Springs': 'Spgs','Spur': 'Spur','Square': 'Sq','Squares': 'Sqs','Station': 'Sta','Stravenue': 'Stra','Stream': 'Strm','Street': 'St','Streets': 'Sts','Summit': 'Smt','Terrace': 'Ter','Throughway': 'Trwy','Trace': 'Trce','Track': 'Trak','Trafficway': 'Trfy','Trail': 'Trl','Trailer': 'Trlr','Tunnel': 'Tunl','Turnpike': 'Tpke','Underpass': 'Upas','Union': 'Un','Valley': 'Vly','Valleys': 'Vlys','Viaduct': 'Via','View': 'Vw','Views': 'Vws','Village': 'Vlg','Villages': 'Vlgs','Vista': 'Vis','Walk': 'Walk','Way': 'Way','Well': 'Wl','Wells': 'Wls','North': 'N','East': 'E','South': 'S','West': 'W','Northeast': 'NE','Southeast': 'SE','Northwest': 'NW','Southwest': 'SW'}
-
-        
-        # Create reverse mapping for abbreviated to full forms
-        self.reverse_mapping = {v: k for k, v in self.street_suffix_mapping.items()}
-    
-    def normalize_address(self, address):
-        if not isinstance(address, str) or address.strip() == '':
-            return address
+from address_rules import RULES_VERSION, default_rules
 
-        # 1) Fix the erroneous "/n" patterns
-        cleaned_address = re.sub(r'(\S*)\s*/\s*n\s*(\S*)', r'\1 \2', address)
-        cleaned_address = re.sub(r'(^/\s*n\s*)|(\s*/\s*n\s*$)', ' ', cleaned_address)
-        cleaned_address = re.sub(r'(?<!\d)/\s*n\b', ' ', cleaned_address)
-        cleaned_address = re.sub(r'(?<!\d)(\s)/(\s+)(?!\d)', r'\1\2', cleaned_address)
-        cleaned_address = cleaned_address.replace('\\n', ' ').replace('\n', ' ').strip()
+# Steps of normalize_address, in order, as reported by NormalizationProfile
+PROFILE_STAGES = ('slash_n', 'phrases', 'spacing', 'hash', 'special_chars', 'tokens')
 
-        # 2) Remove common throwaway phrases
-        cleaned_address = re.sub(r'See\s+[Mm]ailing(?:\s+[Aa]ddress)?', '', cleaned_address).strip()
-        cleaned_address = re.sub(r'\bunlisted\b', '', cleaned_address, flags=re.IGNORECASE).strip()
+class NormalizationProfile:
+    """
+    Per-stage timing collected by an AddressNormalizer created with ``profile=``.
 
-        # Insert spaces between letters and digits (e.g. "Center25" => "Center 25")
-        cleaned_address = re.sub(r'([A-Za-z])(\d+)', r'\1 \2', cleaned_address)
+    For each stage of PROFILE_STAGES it keeps the number of calls, the
+    cumulative time, and how many times the stage actually changed the
+    string. It also keeps the ``top_k`` slowest inputs seen. One profile can
+    be shared by several normalizers to collect totals for a whole run.
+    """
 
-        # Handle multiple slash fraction (e.g. "25/1/2" => "25 1/2")
-        cleaned_address = re.sub(r'(\d+)/(?=\d+/)', r'\1 ', cleaned_address)
+    def __init__(self, top_k=10):
+        self.top_k = top_k
+        self.reset()
 
-        # ----------------------------------------------------------------
-        # 2.5) SPECIAL STEP FOR '#':
-        #
-        # If '#' does NOT have an ignore-list word directly to the left
-        # or right (ignoring spaces), we replace '#' with "Unit ".
-        # Otherwise, we remove '#' entirely.
-        #
-        # We'll do this by splitting on whitespace, scanning token by token.
+    def reset(self):
+        self.addresses = 0
+        self.total_ns = 0
+        self.calls = dict.fromkeys(PROFILE_STAGES, 0)
+        self.elapsed_ns = dict.fromkeys(PROFILE_STAGES, 0)
+        self.changed = dict.fromkeys(PROFILE_STAGES, 0)
+        # Min-heap of (elapsed_ns, sequence, address); the root is the fastest kept
+        self._slowest = []
 
+    def add(self, stage, elapsed_ns, changed):
+        self.calls[stage] += 1
+        self.elapsed_ns[stage] += elapsed_ns
+        if changed:
+            self.changed[stage] += 1
+
+    def add_address(self, address, elapsed_ns):
+        self.addresses += 1
+        self.total_ns += elapsed_ns
+        if not self.top_k:
+            return
+        entry = (elapsed_ns, self.addresses, address)
+        if len(self._slowest) < self.top_k:
+            heapq.heappush(self._slowest, entry)
+        elif entry > self._slowest[0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    def stats(self):
+        """
+        Return the collected statistics as a dict.
+
+        ``addresses`` and ``seconds`` cover whole normalize_address calls;
+        ``stages`` maps each stage name to its ``calls``, ``seconds`` and
+        ``changed`` counts; ``slowest`` lists ``(seconds, address)`` pairs,
+        slowest first.
+        """
+        return {
+            'addresses': self.addresses,
+            'seconds': self.total_ns / 1e9,
+            'stages': {
+                stage: {
+                    'calls': self.calls[stage],
+                    'seconds': self.elapsed_ns[stage] / 1e9,
+                    'changed': self.changed[stage],
+                }
+                for stage in PROFILE_STAGES
+            },
+            'slowest': [(elapsed / 1e9, address) for elapsed, _, address in sorted(self._slowest, reverse=True)],
+        }
+
+# collections.namedtuple rather than typing.NamedTuple: importing typing alone
+# would take longer than the rest of this module
+ParsedAddress = namedtuple('ParsedAddress', [
+    'normalized', 'house_number', 'predirectional', 'street', 'suffix', 'postdirectional',
+    'unit_type', 'unit',
+], defaults=(None,) * 7)
+ParsedAddress.__doc__ = """
+    Components of one address, produced by AddressNormalizer.parse_address.
+
+    ``normalized`` is the same string normalize_address returns; the other
+    fields split it into its parts, already normalized (e.g. suffix "St",
+    directional "N"). Parts that are not present are None.
+    """
+
+class AddressNormalizer:
+    # Bump address_rules.RULES_VERSION whenever a code change alters normalized output
+    RULES_VERSION = RULES_VERSION
+
+    def __init__(self, cache_size=None, profile=None, rules=None):
+        """
+        Parameters:
+        -----------
+        cache_size : int, optional
+            Maximum number of raw address -> normalized address results to
+            memoize, evicting the least recently used entry when full.
+            None or 0 disables the cache.
+        profile : bool or NormalizationProfile, optional
+            Time every stage of normalize_address (see profile_stats). True
+            creates a new NormalizationProfile; pass an existing one to share
+            it between normalizers. Off by default, which costs one attribute
+            check per address.
+        rules : RuleSet, optional
+            Rule tables to normalize with, e.g. from load_rules for a client
+            specific rule file. Defaults to the built-in tables, which are
+            compiled once per process.
+        """
+        # Compiled rule tables, shared with every other normalizer using the same rules
+        self.rules = rules = rules if rules is not None else default_rules()
+        self.ignore_list = rules.ignore_list
+        self.directional = rules.directional
+        self.street_suffix_mapping = rules.street_suffix_mapping
+        self.reverse_mapping = rules.reverse_mapping
+        self._spelled_directionals = rules.spelled_directionals
+        self._token_table = rules.token_table
+        self._classify_token = rules.classify_token
+
+        # Precompiled patterns, so the per-address hot path never goes
+        # through the re module's pattern cache
+        patterns = rules.patterns
+        self._slash_n_pattern = patterns['slash_n']
+        self._slash_n_edge_pattern = patterns['slash_n_edge']
+        self._slash_n_word_pattern = patterns['slash_n_word']
+        self._lone_slash_pattern = patterns['lone_slash']
+        self._see_mailing_pattern = patterns['see_mailing']
+        self._unlisted_pattern = patterns['unlisted']
+        self._spacing_pattern = patterns['spacing']
+        self._fraction_pattern = patterns['fraction']
+        self._special_char_pattern = patterns['special_char']
+        self._ordinal_pattern = patterns['ordinal']
+
+        # Opt-in LRU cache of normalized results keyed on the raw input string
+        if cache_size is not None and cache_size < 0:
+            raise ValueError("cache_size must be None or a non-negative integer")
+        self.cache_size = cache_size or 0
+        self._cache = OrderedDict() if self.cache_size else None
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_evictions = 0
+
+        if profile is True:
+            profile = NormalizationProfile()
+        self._profile = profile or None
+    
+    def _expand_hash_signs(self, cleaned_address):
+        """Apply the '#' rule from step 2.5 of normalize_address."""
         words = cleaned_address.split()
         transformed = []
         for i, token in enumerate(words):
@@ -79,126 +183,423 @@ class AddressNormalizer:
                 replaced = token.replace('#', 'Unit ', 1)
                 transformed.append(replaced.strip())
 
-        cleaned_address = ' '.join(transformed)
-        # ----------------------------------------------------------------
+        return ' '.join(transformed)
 
-        # 3) Next, protect numeric fractions like 1/2, 1/3rd, etc.
-        fraction_placeholders = {}
-        fraction_counter = 0
+    def normalize_address(self, address):
+        if not isinstance(address, str) or address.strip() == '':
+            return address
 
-        # Only match if there's no extra slash after it
-        fraction_pattern = r'\b\d+/\d+(?:st|nd|rd|th)?(?!/)\b'
-        for fraction_match in re.finditer(fraction_pattern, cleaned_address):
-            fraction = fraction_match.group(0)
-            placeholder = f"FRACTION_{fraction_counter}"
-            fraction_placeholders[placeholder] = fraction
-            cleaned_address = cleaned_address.replace(fraction, placeholder, 1)
-            fraction_counter += 1
+        if self._cache is None:
+            if self._profile is not None:
+                return self._normalize_profiled(address)
+            return self._normalize_cleaned(address, self._clean_text(address))
 
-        # 4) Handle hyphens differently - replace them with spaces
-        cleaned_address = cleaned_address.replace('-', ' ')
-        
-        # 5) Now remove other "special" characters except letters, digits, underscores, spaces
-        cleaned_address = re.sub(r'[^\w\s]', '', cleaned_address).strip()
+        normalized = self._cache_get(address)
+        if normalized is None:
+            if self._profile is not None:
+                normalized = self._normalize_profiled(address)
+            else:
+                normalized = self._normalize_cleaned(address, self._clean_text(address))
+            self._cache_put(address, normalized)
+        return normalized
+
+    def profile_stats(self):
+        """Return NormalizationProfile.stats() for this normalizer, or None if profiling is off."""
+        return self._profile.stats() if self._profile is not None else None
+
+    def _normalize_profiled(self, address):
+        """normalize_address with every stage timed into self._profile."""
+        profile = self._profile
+        clock = time.perf_counter_ns
+        start = clock()
+
+        before = clock()
+        text = self._fix_slash_n(address)
+        after = clock()
+        profile.add('slash_n', after - before, text != address)
+
+        before, previous = after, text
+        text = self._remove_phrases(text)
+        after = clock()
+        profile.add('phrases', after - before, text != previous)
+
+        before, previous = after, text
+        text = self._spacing_pattern.sub(' ', text)
+        after = clock()
+        profile.add('spacing', after - before, text != previous)
+
+        before, previous = after, text
+        if '#' in text:
+            text = self._expand_hash_signs(text)
+        after = clock()
+        profile.add('hash', after - before, text != previous)
+
+        before, previous = after, text
+        text = self._strip_special_characters(text)
+        after = clock()
+        profile.add('special_chars', after - before, text != previous)
+
+        if text:
+            before = after
+            normalized = self._render_words(text.split())
+            after = clock()
+            profile.add('tokens', after - before, normalized != text)
+        else:
+            normalized = address
+
+        profile.add_address(address, after - start)
+        return normalized
+
+    def cache_info(self):
+        """Return hit/miss/eviction counters and the current size of the result cache."""
+        return {
+            'hits': self.cache_hits,
+            'misses': self.cache_misses,
+            'evictions': self.cache_evictions,
+            'size': len(self._cache) if self._cache is not None else 0,
+            'max_size': self.cache_size,
+        }
 
-        # 6) Restore the fraction placeholders
-        for placeholder, fraction in fraction_placeholders.items():
-            cleaned_address = cleaned_address.replace(placeholder, fraction)
+    def clear_cache(self):
+        """Empty the result cache and reset its counters."""
+        if self._cache is not None:
+            self._cache.clear()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_evictions = 0
 
+    def _cache_get(self, address):
+        normalized = self._cache.get(address)
+        if normalized is None:
+            self.cache_misses += 1
+        else:
+            self._cache.move_to_end(address)
+            self.cache_hits += 1
+        return normalized
+
+    def _cache_put(self, address, normalized):
+        self._cache[address] = normalized
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+            self.cache_evictions += 1
+
+    def normalize_many(self, addresses):
+        """
+        Normalize an iterable of addresses (list, array, pandas Series, ...).
+
+        Returns a list in input order. Values that are not strings, or are
+        blank, are passed through unchanged just like normalize_address.
+        """
+        if self._cache is not None or self._profile is not None:
+            return [self.normalize_address(address) for address in addresses]
+
+        clean_text = self._clean_text
+        normalize_cleaned = self._normalize_cleaned
+
+        results = []
+        append = results.append
+        for address in addresses:
+            if isinstance(address, str) and address.strip():
+                append(normalize_cleaned(address, clean_text(address)))
+            else:
+                append(address)
+        return results
+
+    def normalize_series(self, series):
+        """
+        Normalize a pandas Series of addresses as a whole column.
+
+        Nulls, non-strings and blank strings are masked out up front and the
+        remaining values are deduplicated, so each distinct address is only
+        normalized once. The regex cleanup stages run as vectorized ``.str``
+        operations over the distinct values; only the token-level
+        suffix/directional logic runs per value. Returns a new Series with the
+        same index.
+        """
+        if series.dtype.name == 'category':
+            # Normalized values need not be categories, and two categories may
+            # normalize to the same value, so work on plain objects
+            series = series.astype(object)
+        result = series.copy()
+        if series.dtype.kind not in 'OSU' and str(series.dtype) not in ('string', 'str'):
+            # Numeric or all-null columns have nothing to normalize
+            return result
+
+        stripped = series.str.strip()
+        mask = stripped.notna() & (stripped != '')
+        if not mask.any():
+            return result
+
+        addresses = series[mask]
+        distinct = addresses.drop_duplicates()
+        normalized = self._normalize_unique(distinct)
+        result[mask] = addresses.map(dict(zip(distinct, normalized)))
+        return result
+
+    def parse_address(self, address):
+        """
+        Normalize an address and split it into its components.
+
+        Runs the same steps as normalize_address, so ``normalized`` on the
+        returned ParsedAddress is always equal to normalize_address(address).
+        Values that are not strings, or are blank, come back as
+        ``ParsedAddress(address)`` with every component None.
+        """
+        if not isinstance(address, str) or address.strip() == '':
+            return ParsedAddress(address)
+
+        words = self._token_text(self._clean_text(address))
+        if not words:
+            return ParsedAddress(address)
+        return self._parse_words(words.split())
+
+    def parse_many(self, addresses):
+        """parse_address over an iterable of addresses; returns a list in input order."""
+        return [self.parse_address(address) for address in addresses]
+
+    def parse_series(self, series):
+        """
+        Parse a pandas Series of addresses into a DataFrame.
+
+        The result has one column per ParsedAddress field and the same index
+        as ``series``. Like normalize_series, each distinct address is only
+        parsed once.
+        """
+        import pandas as pd
+
+        parsed = {}
+        if series.dtype.kind in 'OSU' or str(series.dtype) in ('string', 'str'):
+            stripped = series.str.strip()
+            mask = stripped.notna() & (stripped != '')
+            distinct = series[mask].drop_duplicates()
+            parsed = dict(zip(distinct, self.parse_many(distinct)))
+
+        records = [parsed.get(address) or ParsedAddress(address) if isinstance(address, str)
+                   else ParsedAddress(address) for address in series]
+        return pd.DataFrame.from_records(records, columns=ParsedAddress._fields, index=series.index)
+
+    def _normalize_unique(self, addresses):
+        """Normalize a Series of distinct, non-blank strings; returns a list."""
+        if self._cache is None:
+            return self._normalize_strings(addresses)
+
+        results = [self._cache_get(address) for address in addresses]
+        missing = [i for i, normalized in enumerate(results) if normalized is None]
+        if missing:
+            misses = addresses.iloc[missing]
+            for i, address, normalized in zip(missing, misses, self._normalize_strings(misses)):
+                self._cache_put(address, normalized)
+                results[i] = normalized
+        return results
+
+    def _normalize_strings(self, addresses):
+        """Vectorized cleanup followed by the per-row token stage; returns a list."""
+        if self._profile is not None:
+            # Profiling times each stage per address, so skip the vectorized cleanup
+            return [self._normalize_profiled(address) for address in addresses]
+        cleaned = self._clean_series(addresses)
+        normalize_cleaned = self._normalize_cleaned
+        return [
+            normalize_cleaned(address, cleaned_address)
+            for address, cleaned_address in zip(addresses, cleaned)
+        ]
+
+    def _clean_series(self, addresses):
+        """Vectorized equivalent of _clean_text for a Series of non-blank strings."""
+        has_slash = addresses.str.contains('/', regex=False)
+        if has_slash.any():
+            slashed = addresses[has_slash]
+            slashed = slashed.str.replace(self._slash_n_pattern, r'\1 \2', regex=True)
+            slashed = slashed.str.replace(self._slash_n_edge_pattern, ' ', regex=True)
+            slashed = slashed.str.replace(self._slash_n_word_pattern, ' ', regex=True)
+            slashed = slashed.str.replace(self._lone_slash_pattern, r'\1\2', regex=True)
+            addresses = addresses.mask(has_slash, slashed)
+        cleaned = addresses.str.replace('\\n', ' ', regex=False)
+        cleaned = cleaned.str.replace('\n', ' ', regex=False).str.strip()
+
+        cleaned = cleaned.str.replace(self._see_mailing_pattern, '', regex=True).str.strip()
+        cleaned = cleaned.str.replace(self._unlisted_pattern, '', regex=True).str.strip()
+
+        return cleaned.str.replace(self._spacing_pattern, ' ', regex=True)
+
+    def _clean_text(self, address):
+        """Regex cleanup stage: "/n" artifacts, throwaway phrases and spacing."""
+        cleaned_address = self._remove_phrases(self._fix_slash_n(address))
+
+        # Insert spaces between letters and digits (e.g. "Center25" => "Center 25")
+        # and handle multiple slash fraction (e.g. "25/1/2" => "25 1/2")
+        return self._spacing_pattern.sub(' ', cleaned_address)
+
+    def _fix_slash_n(self, address):
+        """Step 1: fix the erroneous "/n" patterns and literal line breaks."""
+        # Each substitution feeds the next, so they stay separate passes,
+        # but none of them can fire without a '/'.
+        cleaned_address = address
+        if '/' in cleaned_address:
+            cleaned_address = self._slash_n_pattern.sub(r'\1 \2', cleaned_address)
+            cleaned_address = self._slash_n_edge_pattern.sub(' ', cleaned_address)
+            cleaned_address = self._slash_n_word_pattern.sub(' ', cleaned_address)
+            cleaned_address = self._lone_slash_pattern.sub(r'\1\2', cleaned_address)
+        return cleaned_address.replace('\\n', ' ').replace('\n', ' ').strip()
+
+    def _remove_phrases(self, cleaned_address):
+        """Step 2: remove common throwaway phrases."""
+        if 'See' in cleaned_address:
+            cleaned_address = self._see_mailing_pattern.sub('', cleaned_address).strip()
+        return self._unlisted_pattern.sub('', cleaned_address).strip()
+
+    def _normalize_cleaned(self, address, cleaned_address):
+        """Token stage: '#', fractions, special characters, suffixes and directionals."""
+        cleaned_address = self._token_text(cleaned_address)
         if not cleaned_address:
             return address
 
-        words = cleaned_address.split()
+        return self._render_words(cleaned_address.split())
 
-        # Normalize spelled-out directionals to abbreviations (Southeast -> SE, etc.)
-        normalized_words = []
-        for w in words:
-            w_stripped = w.upper().rstrip('.')  # remove trailing period
-            if w_stripped == "SOUTHEAST":
-                normalized_words.append("SE")
-            elif w_stripped == "SOUTHWEST":
-                normalized_words.append("SW")
-            elif w_stripped == "NORTHEAST":
-                normalized_words.append("NE")
-            elif w_stripped == "NORTHWEST":
-                normalized_words.append("NW")
-            else:
-                normalized_words.append(w)
-        words = normalized_words
+    def _token_text(self, cleaned_address):
+        """Steps 2.5-4: the '#' rule and special characters, leaving only the words."""
+        # ----------------------------------------------------------------
+        # 2.5) SPECIAL STEP FOR '#':
+        #
+        # If '#' does NOT have an ignore-list word directly to the left
+        # or right (ignoring spaces), we replace '#' with "Unit ".
+        # Otherwise, we remove '#' entirely.
+        #
+        # We'll do this by splitting on whitespace, scanning token by token.
 
-        # Identify suffixes, directionals, unit designators
-        primary_suffix_indices = []
-        directional_indices = []
-        unit_indices = []
+        if '#' in cleaned_address:
+            cleaned_address = self._expand_hash_signs(cleaned_address)
+        # ----------------------------------------------------------------
 
-        for i, word in enumerate(words):
-            # Check if word is a suffix (either full form or abbreviation)
-            if (word.title() in self.street_suffix_mapping or 
-                word.title() in self.reverse_mapping):
-                primary_suffix_indices.append(i)
-            if word.upper() in self.directional:
-                directional_indices.append(i)
-            if word.title() in self.ignore_list:
-                unit_indices.append(i)
-
-        processed_words = []
-        for i, word in enumerate(words):
-            # Always abbreviate directionals (N, S, E, W, NE, etc.)
-            if word.upper() in self.directional:
-                processed_words.append(word.upper())
-                continue
+        return self._strip_special_characters(cleaned_address)
 
-            # If word is in ignore_list, pass it through (we don't expand or abbreviate)
-            if word.title() in self.ignore_list:
-                processed_words.append(word)
-                continue
+    def _strip_special_characters(self, cleaned_address):
+        """Steps 3-4: hyphens to spaces, then drop other special characters outside fractions."""
+        # Hyphens become spaces; '-' is never part of a fraction and both are
+        # non-word characters, so fraction matches are unaffected
+        cleaned_address = cleaned_address.replace('-', ' ')
+        if '/' not in cleaned_address:
+            return self._special_char_pattern.sub('', cleaned_address).strip()
 
-            # New simplified rule: Only the LAST suffix gets abbreviated, all others spelled out
-            if i in primary_suffix_indices:
-                # Find the last suffix index
-                last_suffix_index = max(primary_suffix_indices) if primary_suffix_indices else -1
-                
-                if i == last_suffix_index:
-                    # This is the last suffix - abbreviate it
-                    # If it's already abbreviated, keep it. If it's full form, abbreviate it.
-                    if word.title() in self.street_suffix_mapping:
-                        # Full form -> abbreviate
-                        processed_words.append(self.street_suffix_mapping[word.title()])
-                    else:
-                        # Already abbreviated -> keep as is
-                        processed_words.append(word)
-                else:
-                    # Not the last suffix - spell it out
-                    if word.title() in self.reverse_mapping:
-                        # Abbreviated -> spell out
-                        processed_words.append(self.reverse_mapping[word.title()])
+        # Even items are text between fractions, odd items the fractions themselves
+        spans = self._fraction_pattern.split(cleaned_address)
+        special_char_sub = self._special_char_pattern.sub
+        spans[::2] = [special_char_sub('', text) for text in spans[::2]]
+        return ''.join(spans).strip()
+
+    def _classify_words(self, words):
+        """Return (token-table entry per word, index of the last suffix or -1)."""
+        # Classify each word with a single token-table lookup. Only the LAST
+        # suffix gets abbreviated, all other suffixes are spelled out, so every
+        # entry holds the word's final form both ways.
+        token_table = self._token_table
+        ordinal_pattern = self._ordinal_pattern
+        token_infos = []
+        last_suffix_index = -1
+        for i, word in enumerate(words):
+            if word.isascii():
+                key = word.lower()
+                info = token_table.get(key)
+                if info is None:
+                    # Not a suffix, directional or unit designator; "1st", "2nd"
+                    # keep the suffix part lower case, anything else is title-cased
+                    if key[0].isdecimal() and ordinal_pattern.match(key):
+                        final = key
                     else:
-                        # Already spelled out -> keep as is
-                        processed_words.append(word.title())
-                continue
+                        final = word.title()
+                    info = (False, final, None, final, None)
+            else:
+                info = self._classify_token(word)
+            if info[0]:
+                last_suffix_index = i
+            token_infos.append(info)
+        return token_infos, last_suffix_index
 
-            processed_words.append(word)
+    def _render_words(self, words):
+        """Suffix/directional stage: render the words of a cleaned address."""
+        token_infos, last_suffix_index = self._classify_words(words)
 
         # Remove duplicate ignore_list words (e.g. "Unit Unit" if it occurred twice)
         seen_ignore = set()
-        final_words = []
-        for word in processed_words:
-            if word.title() in self.ignore_list:
-                if word.title() in seen_ignore:
-                    continue
-                seen_ignore.add(word.title())
-            final_words.append(word)
-
-        # Capitalize properly
         capitalized_words = []
-        for word in final_words:
-            # e.g. "1st", "2nd": keep them lower for the suffix part
-            if re.match(r'^\d+(?:st|nd|rd|th)$', word.lower()):
-                capitalized_words.append(word.lower())
-            # Keep directionals in uppercase
-            elif word.upper() in self.directional:
-                capitalized_words.append(word.upper())
+        for i, info in enumerate(token_infos):
+            if i == last_suffix_index:
+                final, ignore_key = info[1], info[2]
             else:
-                capitalized_words.append(word.title())
+                final, ignore_key = info[3], info[4]
+            if ignore_key is not None:
+                if ignore_key in seen_ignore:
+                    continue
+                seen_ignore.add(ignore_key)
+            capitalized_words.append(final)
 
         return ' '.join(capitalized_words)
+
+    def _parse_words(self, words):
+        """Render the words like _render_words and split them into ParsedAddress components."""
+        token_infos, last_suffix_index = self._classify_words(words)
+
+        # Same rendering and de-duplication as _render_words, keeping each word's role
+        seen_ignore = set()
+        finals = []
+        roles = []
+        directional = self.directional
+        for i, info in enumerate(token_infos):
+            if i == last_suffix_index:
+                final, ignore_key = info[1], info[2]
+            else:
+                final, ignore_key = info[3], info[4]
+            if ignore_key is not None:
+                if ignore_key in seen_ignore:
+                    continue
+                seen_ignore.add(ignore_key)
+            finals.append(final)
+            if ignore_key is not None:
+                roles.append('unit')
+            elif final in directional and not final.strip('NSEW'):
+                # The directional table also keeps e.g. "PO" upper-case; only compass points count
+                roles.append('directional')
+            elif info[0]:
+                roles.append('suffix')
+            else:
+                roles.append(None)
+
+        # House number: a leading token starting with a digit (not an ordinal
+        # street name like "1st"), plus a fraction right after it ("12 1/2")
+        start = 0
+        house_number = None
+        if finals[0][0].isdecimal() and not self._ordinal_pattern.match(finals[0]):
+            start = 1
+            if len(finals) > 1 and '/' in finals[1]:
+                start = 2
+            house_number = ' '.join(finals[:start])
+
+        # Unit: from the first unit designator on
+        end = roles.index('unit', start) if 'unit' in roles[start:] else len(finals)
+        unit_type = unit = postdirectional = None
+        if end < len(finals):
+            unit_type = finals[end]
+            unit_words = []
+            for final, role in zip(finals[end + 1:], roles[end + 1:]):
+                if role == 'directional' and postdirectional is None:
+                    postdirectional = final
+                else:
+                    unit_words.append(final)
+            unit = ' '.join(unit_words) or None
+
+        # Street: what is left, minus a trailing directional, the suffix and a
+        # leading directional; the street itself always keeps at least one word
+        predirectional = suffix = None
+        if end - start > 1 and roles[end - 1] == 'directional' and postdirectional is None:
+            postdirectional = finals[end - 1]
+            end -= 1
+        if end - start > 1 and roles[end - 1] == 'suffix':
+            suffix = finals[end - 1]
+            end -= 1
+        if end - start > 1 and roles[start] == 'directional':
+            predirectional = finals[start]
+            start += 1
+        street = ' '.join(finals[start:end]) or None
+
+        return ParsedAddress(' '.join(finals), house_number, predirectional, street, suffix,
+                             postdirectional, unit_type, unit)
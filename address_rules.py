@@ -0,0 +1,301 @@
+import re
+from types import MappingProxyType
+
+# Bump whenever a code change alters normalized output, so persistent
+# result stores built with older rules are invalidated.
+RULES_VERSION = 2
+
+# Built-in rule tables (USPS suffixes, unit designators, directionals)
+DEFAULT_IGNORE_LIST = {"Apartment", "Apartments","Apt", "Penthouse", "Ph", "Basement", "Bsmt", "Pier", "Building", "Bldg", "Rear", "Department", "Dept", "Room", "Rm","Floor", "Fl", "Side", "Front", "Frnt", "Slip", "Hanger","Hngr", "Space", "Spc", "Key",  "Stop", "Lobby", "Lbby","Suite", "Ste", "Lot", "Trailer", "Trlr", "Lower", "Lowr", "Unit","Office", "Ofc", "Upper", "Uppr"}
+DEFAULT_DIRECTIONAL = {'S', 'W', 'N', 'E', 'SE', 'SW', 'NE', 'NW', 'PO'}
+DEFAULT_STREET_SUFFIX_MAPPING = {'Alley': 'Aly','Anex': 'Anx','Annex': 'Anx', 'Apartment': 'Apt','Apartments': 'Apt','Arcade': 'Arc','Avenue': 'Ave','Bayou': 'Byu','Beach': 'Bch','Bend': 'Bnd','Bluff': 'Blf','Bluffs': 'Blfs','Bottom': 'Btm','Boulevard': 'Blvd','Branch': 'Br','Bridge': 'Brg','Brook': 'Brk','Brooks': 'Brks','Burg': 'Bg','Burgs': 'Bgs','Bypass': 'Byp','Camp': 'Cp','Canyon': 'Cyn','Cape': 'Cpe','Causeway': 'Cswy','Center': 'Ctr','Centers': 'Ctrs','Circle': 'Cir','Circles': 'Cirs','Cliff': 'Clf','Cliffs': 'Clfs','Club': 'Clb','Common': 'Cmn','Commons': 'Cmns','Corner': 'Cor','Corners': 'Cors','Course': 'Crse','Court': 'Ct','Courts': 'Cts','Cove': 'Cv','Coves': 'Cvs','Creek': 'Crk','Crescent': 'Cres','Crest': 'Crst','Crossing': 'Xing','Crossroad': 'Xrd','Crossroads': 'Xrds','Curve': 'Curv','Dale': 'Dl','Dam': 'Dm','Divide': 'Dv','Drive': 'Dr','Drives': 'Drs','Estate': 'Est','Estates': 'Ests','Expressway': 'Expy','Extension': 'Ext','Extensions': 'Exts','Fall': 'Fall','Falls': 'Fls','Ferry': 'Fry','Field': 'Fld','Fields': 'Flds','Flat': 'Flt','Flats': 'Flts','Ford': 'Frd','Fords': 'Frds','Forest': 'Frst','Forge': 'Frg','Forges': 'Frgs','Fork': 'Frk','Forks': 'Frks','Fort': 'Ft','Freeway': 'Fwy','Garden': 'Gdn','Gardens': 'Gdns','Gateway': 'Gtwy','Glen': 'Gln','Glens': 'Glns','Green': 'Grn','Greens': 'Grns','Grove': 'Grv','Groves': 'Grvs','Harbor': 'Hbr','Harbors': 'Hbrs','Haven': 'Hvn','Heights': 'Hts','Highway': 'Hwy','Hill': 'Hl','Hills': 'Hls','Hollow': 'Holw','Inlet': 'Inlt','Island': 'Is','Islands': 'Iss','Isle': 'Isle','Junction': 'Jct','Junctions': 'Jcts','Key': 'Ky','Keys': 'Kys','Knoll': 'Knl','Knolls': 'Knls','Lake': 'Lk','Lakes': 'Lks','Land': 'Land','Landing': 'Lndg','Lane': 'Ln','Light': 'Lgt','Lights': 'Lgts','Loaf': 'Lf','Lock': 'Lck','Locks': 'Lcks','Lodge': 'Ldg','Loop': 'Lp','Mall': 'Mall','Manor': 'Mnr','Manors': 'Mnrs','Meadow': 'Mdw','Meadows': 'Mdws','Mews': 'Mews','Mill': 'Ml','Mills': 'Mls','Mission': 'Msn','Motorway': 'Mtwy','Mount': 'Mt','Mountain': 'Mtn','Mountains': 'Mtns','Neck': 'Nck','Orchard': 'Orch','Oval': 'Oval','Overpass': 'Opas','Park': 'Park','Parkway': 'Pkwy','Pass': 'Pass','Passage': 'Psge','Path': 'Path','Pike': 'Pike','Pine': 'Pne','Pines': 'Pnes','Place': 'Pl','Plain': 'Pln','Plains': 'Plns','Plaza': 'Plz','Point': 'Pt','Points': 'Pts','Port': 'Prt','Ports': 'Prts','Prairie': 'Pr','Radial': 'Radl','Ranch': 'Rnch','Rapid': 'Rpd','Rapids': 'Rpds','Rest': 'Rst','Ridge': 'Rdg','Ridges': 'Rdgs','River': 'Riv','Road': 'Rd','Roads': 'Rds','Route': 'Rte','Row': 'Row','Rue': 'Rue','Run': 'Run','Shoal': 'Shl','Shoals': 'Shls','Shore': 'Shr','Shores': 'Shrs','Skyway': 'Skyway','Spring': 'Spg','Springs': 'Spgs','Spur': 'Spur','Square': 'Sq','Squares': 'Sqs','Station': 'Sta','Stravenue': 'Stra','Stream': 'Strm','Street': 'St','Streets': 'Sts','Summit': 'Smt','Terrace': 'Ter','Throughway': 'Trwy','Trace': 'Trce','Track': 'Trak','Trafficway': 'Trfy','Trail': 'Trl','Trailer': 'Trlr','Tunnel': 'Tunl','Turnpike': 'Tpke','Underpass': 'Upas','Union': 'Un','Valley': 'Vly','Valleys': 'Vlys','Viaduct': 'Via','View': 'Vw','Views': 'Vws','Village': 'Vlg','Villages': 'Vlgs','Vista': 'Vis','Walk': 'Walk','Way': 'Way','Well': 'Wl','Wells': 'Wls','North': 'N','East': 'E','South': 'S','West': 'W','Northeast': 'NE','Southeast': 'SE','Northwest': 'NW','Southwest': 'SW'}
+
+DEFAULT_SPELLED_DIRECTIONALS = {'SOUTHEAST': 'SE', 'SOUTHWEST': 'SW', 'NORTHEAST': 'NE', 'NORTHWEST': 'NW'}
+
+# Rule file keys, in the order of the RuleSet constructor
+RULE_TABLES = ('street_suffix_mapping', 'ignore_list', 'directional', 'spelled_directionals')
+
+# Compiled rule sets of this process, by their tables (see _rules_key)
+_compiled_rules = {}
+
+class RuleSet:
+    """
+    Immutable, compiled normalization rules.
+
+    Holds the rule tables as read-only views together with everything derived
+    from them: the reverse suffix mapping, the token classification table and
+    the compiled patterns. Building one is the expensive part of creating an
+    AddressNormalizer, so compile_rules / load_rules hand out one shared
+    instance per distinct rule set, and any number of normalizers can use it.
+
+    Pickling sends only the source tables; unpickling in a worker process
+    compiles them at most once per process.
+    """
+
+    __slots__ = ('street_suffix_mapping', 'reverse_mapping', 'ignore_list', 'directional',
+                 'spelled_directionals', '_fingerprint', 'token_table', 'patterns')
+
+    def __init__(self, street_suffix_mapping, ignore_list, directional, spelled_directionals):
+        """
+        Parameters:
+        -----------
+        street_suffix_mapping : dict
+            Full suffix -> abbreviation, e.g. ``{'Street': 'St'}``
+        ignore_list : iterable
+            Unit designators such as 'Apt' or 'Suite'
+        directional : iterable
+            Upper-case abbreviations that are always upper-cased, e.g. 'NE'
+        spelled_directionals : dict
+            Upper-case spelled-out directional -> abbreviation, e.g. ``{'NORTHEAST': 'NE'}``
+        """
+        street_suffix_mapping = dict(street_suffix_mapping)
+        tables = {
+            'street_suffix_mapping': MappingProxyType(street_suffix_mapping),
+            # Abbreviated to full forms
+            'reverse_mapping': MappingProxyType({v: k for k, v in street_suffix_mapping.items()}),
+            'ignore_list': frozenset(ignore_list),
+            'directional': frozenset(directional),
+            'spelled_directionals': MappingProxyType(dict(spelled_directionals)),
+        }
+        for name, value in tables.items():
+            object.__setattr__(self, name, value)
+        object.__setattr__(self, '_fingerprint', None)
+        object.__setattr__(self, 'patterns', _compile_patterns())
+
+        # Token classification table keyed by the lower-case form of every word
+        # the rules know about. For ASCII words, str.title()/str.upper() only
+        # depend on the lower-case form, so one lookup replaces the repeated
+        # case conversions; any word not in the table is a plain word.
+        vocabulary = set(self.street_suffix_mapping) | set(self.reverse_mapping)
+        vocabulary |= self.ignore_list | self.directional | set(self.spelled_directionals)
+        object.__setattr__(self, 'token_table', MappingProxyType({
+            word.lower(): self.classify_token(word.lower()) for word in vocabulary if word.isascii()
+        }))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("RuleSet is immutable")
+
+    def __reduce__(self):
+        tables = self.tables()
+        return compile_rules, tuple(tables[name] for name in RULE_TABLES)
+
+    @property
+    def fingerprint(self):
+        """sha256 of the rule tables and RULES_VERSION, computed on first use."""
+        if self._fingerprint is None:
+            object.__setattr__(self, '_fingerprint', _fingerprint(
+                self.street_suffix_mapping, self.ignore_list, self.directional, self.spelled_directionals
+            ))
+        return self._fingerprint
+
+    def __repr__(self):
+        return (f"RuleSet({len(self.street_suffix_mapping)} suffixes, {len(self.ignore_list)} unit "
+                f"designators, {len(self.directional)} directionals, {self.fingerprint[:12]})")
+
+    def tables(self):
+        """Return the source tables as plain JSON-ready values, keyed by RULE_TABLES."""
+        return {
+            'street_suffix_mapping': dict(self.street_suffix_mapping),
+            'ignore_list': sorted(self.ignore_list),
+            'directional': sorted(self.directional),
+            'spelled_directionals': dict(self.spelled_directionals),
+        }
+
+    def classify_token(self, word):
+        """
+        Work out how a single word is rendered in the output.
+
+        Returns a tuple ``(is_suffix, last_form, last_ignore_key, other_form,
+        other_ignore_key)``: whether the word counts as a street suffix, its
+        final output form when it is / is not the last suffix of the address,
+        and the ignore_list word each form dedupes against (or None).
+        """
+        # Normalize spelled-out directionals to abbreviations (Southeast -> SE, etc.)
+        word = self.spelled_directionals.get(word.upper().rstrip('.'), word)
+
+        title = word.title()
+        upper = word.upper()
+        is_suffix = title in self.street_suffix_mapping or title in self.reverse_mapping
+
+        if upper in self.directional:
+            # Always abbreviate directionals (N, S, E, W, NE, etc.)
+            last_form = other_form = upper
+        elif title in self.ignore_list:
+            # Unit designators pass through (we don't expand or abbreviate)
+            last_form = other_form = word
+        elif is_suffix:
+            # Last suffix: full form -> abbreviate, already abbreviated -> keep as is.
+            # Other suffixes: abbreviated -> spell out, already spelled out -> keep.
+            last_form = self.street_suffix_mapping.get(title, word)
+            other_form = self.reverse_mapping.get(title, title)
+        else:
+            last_form = other_form = word
+
+        return (is_suffix,
+                self._capitalize(last_form), self._ignore_key(last_form),
+                self._capitalize(other_form), self._ignore_key(other_form))
+
+    def _capitalize(self, word):
+        # e.g. "1st", "2nd": keep them lower for the suffix part
+        if self.patterns['ordinal'].match(word.lower()):
+            return word.lower()
+        # Keep directionals in uppercase
+        if word.upper() in self.directional:
+            return word.upper()
+        return word.title()
+
+    def _ignore_key(self, word):
+        title = word.title()
+        return title if title in self.ignore_list else None
+
+def _fingerprint(street_suffix_mapping, ignore_list, directional, spelled_directionals):
+    """sha256 of the rule tables and RULES_VERSION."""
+    # Only the result store needs the fingerprint, so these are not imported up front
+    import hashlib
+    import json
+
+    content = {
+        'version': RULES_VERSION,
+        'street_suffix_mapping': sorted(street_suffix_mapping.items()),
+        'ignore_list': sorted(ignore_list),
+        'directional': sorted(directional),
+        'spelled_directionals': sorted(spelled_directionals.items()),
+    }
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode('utf-8')).hexdigest()
+
+def _compile_patterns():
+    """Compile the patterns used by the normalization steps."""
+    return MappingProxyType({
+        'slash_n': re.compile(r'(\S*)\s*/\s*n\s*(\S*)'),
+        'slash_n_edge': re.compile(r'(^/\s*n\s*)|(\s*/\s*n\s*$)'),
+        'slash_n_word': re.compile(r'(?<!\d)/\s*n\b'),
+        'lone_slash': re.compile(r'(?<!\d)(\s)/(\s+)(?!\d)'),
+        'see_mailing': re.compile(r'See\s+[Mm]ailing(?:\s+[Aa]ddress)?'),
+        'unlisted': re.compile(r'\bunlisted\b', re.IGNORECASE),
+        # Letter/digit splitting ("Center25" => "Center 25") and multiple slash
+        # fractions ("25/1/2" => "25 1/2") both just put a space in, so they
+        # share a single pass.
+        'spacing': re.compile(r'(?<=[A-Za-z])(?=\d)|(?<=\d)/(?=\d+/)'),
+        # Splitting on the capturing fraction pattern tokenizes an address into
+        # alternating text and fraction spans (1/2, 1/3rd; only if there's no
+        # extra slash after it), so special characters can be stripped from
+        # the text spans while fractions are kept exactly where they matched.
+        'fraction': re.compile(r'(\b\d+/\d+(?:st|nd|rd|th)?(?!/)\b)'),
+        'special_char': re.compile(r'[^\w\s]+'),
+        'ordinal': re.compile(r'^\d+(?:st|nd|rd|th)$'),
+    })
+
+def _rules_key(street_suffix_mapping, ignore_list, directional, spelled_directionals):
+    """Hashable key identifying equal rule tables, cheaper to build than the fingerprint."""
+    return (tuple(sorted(street_suffix_mapping.items())), tuple(sorted(ignore_list)),
+            tuple(sorted(directional)), tuple(sorted(spelled_directionals.items())))
+
+def compile_rules(street_suffix_mapping=None, ignore_list=None, directional=None,
+                  spelled_directionals=None):
+    """
+    Return the shared RuleSet for these tables, compiling it on first use.
+
+    Tables left as None use the built-in defaults. Calling it again with
+    equal tables returns the same RuleSet object.
+    """
+    tables = (
+        dict(DEFAULT_STREET_SUFFIX_MAPPING if street_suffix_mapping is None else street_suffix_mapping),
+        frozenset(DEFAULT_IGNORE_LIST if ignore_list is None else ignore_list),
+        frozenset(DEFAULT_DIRECTIONAL if directional is None else directional),
+        dict(DEFAULT_SPELLED_DIRECTIONALS if spelled_directionals is None else spelled_directionals),
+    )
+    key = _rules_key(*tables)
+    rules = _compiled_rules.get(key)
+    if rules is None:
+        rules = _compiled_rules[key] = RuleSet(*tables)
+    return rules
+
+_default_rules = None
+
+def default_rules():
+    """Return the RuleSet of the built-in tables, compiled once per process."""
+    global _default_rules
+    if _default_rules is None:
+        _default_rules = compile_rules()
+    return _default_rules
+
+def _match_case(content, directional):
+    """
+    Put rule file entries in the case lookups use: title case for suffixes and
+    unit designators, upper case for spelled directionals. Suffix
+    abbreviations that are in ``directional`` (e.g. "Northeast" -> "NE") stay
+    upper case.
+    """
+    tables = {}
+    if 'street_suffix_mapping' in content:
+        tables['street_suffix_mapping'] = {
+            key.title(): value.upper() if value.upper() in directional else value.title()
+            for key, value in content['street_suffix_mapping'].items()
+        }
+    if 'ignore_list' in content:
+        tables['ignore_list'] = [word.title() for word in content['ignore_list']]
+    if 'spelled_directionals' in content:
+        spelled = {key.upper(): value.upper() for key, value in content['spelled_directionals'].items()}
+        unknown = sorted(set(spelled.values()) - directional)
+        if unknown:
+            raise ValueError(f"spelled_directionals map to {unknown}, which are not in directional")
+        tables['spelled_directionals'] = spelled
+    return tables
+
+def load_rules(path):
+    """
+    Load a rule file (JSON) and return its compiled, shared RuleSet.
+
+    The file holds any of the RULE_TABLES keys, e.g.::
+
+        {
+            "extends": "default",
+            "street_suffix_mapping": {"Croissant": "Crois", "Montee": "Mtee"},
+            "ignore_list": ["Bureau"]
+        }
+
+    With ``"extends": "default"`` (the default) the tables add to the built-in
+    ones: mappings are updated and lists are added. With ``"extends": null``
+    the file is the complete rule set and missing tables are empty. Entries
+    and abbreviations may be in any case; they are stored in the case
+    lookups use, so "MONTEE": "MTEE" and "Montee": "Mtee" are the same rule.
+    spelled_directionals must map to entries of the directional table.
+    """
+    import json
+
+    with open(path, encoding='utf-8') as f:
+        content = json.load(f)
+
+    unknown = set(content) - set(RULE_TABLES) - {'extends'}
+    if unknown:
+        raise ValueError(f"Unknown rule table(s) in {path}: {sorted(unknown)}")
+    extends = content.get('extends', 'default')
+    if extends not in ('default', None):
+        raise ValueError(f"'extends' must be \"default\" or null, not {extends!r}")
+
+    directional = {word.upper() for word in content.get('directional', [])}
+    if extends is None:
+        content = _match_case(content, directional)
+        return compile_rules(
+            street_suffix_mapping=content.get('street_suffix_mapping', {}),
+            ignore_list=content.get('ignore_list', []),
+            directional=directional,
+            spelled_directionals=content.get('spelled_directionals', {}),
+        )
+
+    base = default_rules()
+    directional |= base.directional
+    content = _match_case(content, directional)
+    return compile_rules(
+        street_suffix_mapping={**base.street_suffix_mapping, **content.get('street_suffix_mapping', {})},
+        ignore_list=base.ignore_list | set(content.get('ignore_list', [])),
+        directional=directional,
+        spelled_directionals={**base.spelled_directionals, **content.get('spelled_directionals', {})},
+    )
+
+def save_rules(rules, path):
+    """Write a RuleSet's tables to a stand-alone rule file that load_rules reads back."""
+    import json
+
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(dict({'extends': None}, **rules.tables()), f, indent=2, sort_keys=True)
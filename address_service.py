@@ -0,0 +1,463 @@
+import argparse
+import json
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+from collections import deque
+from http.client import HTTPConnection
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from address_normalizer import AddressNormalizer
+from address_stats import percentile
+
+# Results kept in the service's LRU cache
+SERVICE_CACHE_SIZE = 100000
+
+# Most addresses normalized in one batch; a request larger than this is still one batch
+MAX_BATCH = 4096
+
+# Latencies of this many recent requests are kept for the percentiles
+LATENCY_WINDOW = 10000
+
+DEFAULT_PORT = 8765
+
+class _Request:
+    __slots__ = ('addresses', 'results', 'error', 'done', 'queued')
+
+    def __init__(self, addresses):
+        self.addresses = addresses
+        self.results = None
+        self.error = None
+        self.done = threading.Event()
+        self.queued = time.perf_counter()
+
+_STOP = object()
+
+class RequestBatcher:
+    """
+    Normalize requests from many threads in batches on one warm AddressNormalizer.
+
+    Requests are queued and a single worker thread takes everything waiting
+    (up to ``max_batch`` addresses) and normalizes it with one normalize_many
+    call. A lone request is handled at once; requests that arrive while a
+    batch is running are coalesced into the next one, so batches grow with
+    the load instead of adding a fixed delay.
+    """
+
+    def __init__(self, normalizer=None, cache_size=SERVICE_CACHE_SIZE, max_batch=MAX_BATCH, max_wait=0.0,
+                 rules=None):
+        """
+        Parameters:
+        -----------
+        normalizer : AddressNormalizer, optional
+            Normalizer to use; only the worker thread calls it. Defaults to a
+            new one with ``cache_size`` and ``rules``.
+        cache_size : int, optional
+            LRU result cache size of the default normalizer (default SERVICE_CACHE_SIZE)
+        max_batch : int, optional
+            Most addresses taken into one batch (default MAX_BATCH)
+        max_wait : float, optional
+            Seconds to wait for more requests before running a batch that
+            isn't full (default 0: only what is already queued)
+        rules : RuleSet, optional
+            Normalization rules of the default normalizer
+        """
+        self.normalizer = normalizer or AddressNormalizer(cache_size=cache_size, rules=rules)
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+        self._counts = {'requests': 0, 'addresses': 0, 'batches': 0, 'largest_batch': 0,
+                        'max_queue_depth': 0, 'errors': 0}
+        self._started = time.perf_counter()
+        self._thread = None
+
+    def start(self):
+        """Start the worker thread; returns self."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='address-batcher', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Finish the queued requests and stop the worker thread."""
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    def normalize(self, addresses, timeout=None):
+        """
+        Normalize a list of addresses through the shared batches.
+
+        Blocks until the result is ready. Values that are not strings, or
+        are blank, are passed through unchanged like normalize_address.
+        """
+        if self._thread is None:
+            raise RuntimeError("The batcher is not running")
+        request = _Request(list(addresses))
+        self._queue.put(request)
+        depth = self._queue.qsize()
+        with self._lock:
+            self._counts['max_queue_depth'] = max(self._counts['max_queue_depth'], depth)
+
+        if not request.done.wait(timeout):
+            raise TimeoutError("The address batch did not finish in time")
+        self._latencies.append(time.perf_counter() - request.queued)
+        if request.error is not None:
+            raise request.error
+        return request.results
+
+    def _take_batch(self, first):
+        batch = [first]
+        size = len(first.addresses)
+        deadline = time.perf_counter() + self.max_wait
+        while size < self.max_batch:
+            try:
+                remaining = deadline - time.perf_counter()
+                request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is _STOP:
+                # Handled after this batch
+                self._queue.put(_STOP)
+                break
+            batch.append(request)
+            size += len(request.addresses)
+        return batch, size
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch, size = self._take_batch(first)
+
+            try:
+                if len(batch) == 1:
+                    first.results = self.normalizer.normalize_many(first.addresses)
+                else:
+                    results = self.normalizer.normalize_many(
+                        [address for request in batch for address in request.addresses]
+                    )
+                    start = 0
+                    for request in batch:
+                        request.results = results[start:start + len(request.addresses)]
+                        start += len(request.addresses)
+            except Exception as e:
+                for request in batch:
+                    request.error = e
+                with self._lock:
+                    self._counts['errors'] += len(batch)
+
+            with self._lock:
+                counts = self._counts
+                counts['requests'] += len(batch)
+                counts['addresses'] += size
+                counts['batches'] += 1
+                counts['largest_batch'] = max(counts['largest_batch'], size)
+            for request in batch:
+                request.done.set()
+
+    def stats(self):
+        """
+        Return the service counters.
+
+        Returns:
+        --------
+        dict
+            ``requests``, ``addresses``, ``batches``, ``mean_batch`` and
+            ``largest_batch`` (addresses), ``errors``, ``queue_depth`` (requests
+            waiting now) and ``max_queue_depth``, ``latency_ms`` with ``p50``,
+            ``p90``, ``p99`` and ``max`` of the recent requests (queueing plus
+            normalizing), ``uptime`` seconds, and ``cache`` (see cache_info)
+            when the normalizer has one
+        """
+        with self._lock:
+            counts = dict(self._counts)
+        latencies = sorted(self._latencies)
+        stats = dict(counts, queue_depth=self._queue.qsize(),
+                     mean_batch=counts['addresses'] / counts['batches'] if counts['batches'] else None,
+                     uptime=time.perf_counter() - self._started)
+        stats['latency_ms'] = {
+            name: percentile(latencies, fraction) * 1000 if latencies else None
+            for name, fraction in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99), ('max', 1.0))
+        }
+        if self.normalizer.cache_size:
+            stats['cache'] = self.normalizer.cache_info()
+        return stats
+
+def _handle_json(batcher, payload):
+    """Answer one JSON request: a list, a single string, or ``{"addresses": [...]}`` / ``{"stats": true}``."""
+    if isinstance(payload, list):
+        return batcher.normalize(payload)
+    if isinstance(payload, str):
+        return batcher.normalize([payload])[0]
+    if isinstance(payload, dict) and isinstance(payload.get('addresses'), list):
+        return {'normalized': batcher.normalize(payload['addresses'])}
+    if isinstance(payload, dict) and payload.get('stats'):
+        return batcher.stats()
+    raise ValueError('Expected a list of addresses, a string, or {"addresses": [...]}')
+
+class _HTTPHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so clients pay the connection setup once
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately; without TCP_NODELAY each
+    # response would wait for the client's delayed ACK
+    disable_nagle_algorithm = True
+
+    def _reply(self, status, body, content_type='application/json'):
+        if content_type == 'application/json':
+            body = json.dumps(body)
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == '/stats':
+            self._reply(200, self.server.batcher.stats())
+        else:
+            self._reply(404, {'error': f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        if self.path != '/normalize':
+            self._reply(404, {'error': f"Unknown path {self.path}"})
+            return
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        try:
+            body = body.decode('utf-8')
+            if self.headers.get_content_type() == 'application/json':
+                self._reply(200, _handle_json(self.server.batcher, json.loads(body)))
+            else:
+                # Newline-delimited addresses, answered one per line in the same order
+                lines = body.split('\n')
+                if lines and lines[-1] == '':
+                    lines.pop()
+                normalized = self.server.batcher.normalize([line.rstrip('\r') for line in lines])
+                self._reply(200, ''.join(f'{line}\n' for line in normalized), 'text/plain')
+        except ValueError as e:
+            self._reply(400, {'error': str(e)})
+
+    def log_message(self, format, *args):
+        # One line per request would swamp the console at service rates
+        pass
+
+class _SocketHandler(socketserver.StreamRequestHandler):
+    """JSON lines: each request line is answered with one JSON line."""
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                response = _handle_json(self.server.batcher, json.loads(line))
+            except ValueError as e:
+                response = {'error': str(e)}
+            self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+class NormalizationService:
+    """
+    A resident normalizer for other local processes, over HTTP and/or a Unix socket.
+
+    HTTP (bound to localhost by default):
+
+    - ``POST /normalize`` with ``Content-Type: application/json`` and a JSON
+      list of addresses (answered with a list) or ``{"addresses": [...]}``
+      (answered with ``{"normalized": [...]}``); any other content type is
+      read as one address per line and answered the same way
+    - ``GET /stats``: RequestBatcher.stats
+
+    Unix socket: JSON lines, each a list, a single address string,
+    ``{"addresses": [...]}`` or ``{"stats": true}``.
+
+    All requests share one RequestBatcher, so concurrent small requests are
+    normalized together. Use as a context manager, or call start and stop.
+    """
+
+    def __init__(self, host='127.0.0.1', port=DEFAULT_PORT, socket_path=None, http=True, **batcher_options):
+        """
+        Parameters:
+        -----------
+        host, port : str, int, optional
+            HTTP address (default 127.0.0.1:8765); port 0 picks a free port
+        socket_path : str, optional
+            Also listen on this Unix socket
+        http : bool, optional
+            Serve HTTP (default True)
+        **batcher_options
+            Passed to RequestBatcher (cache_size, max_batch, max_wait, rules)
+        """
+        if not http and socket_path is None:
+            raise ValueError("Serve HTTP, a Unix socket or both")
+        if socket_path is not None and not hasattr(socketserver, 'ThreadingUnixStreamServer'):
+            raise ValueError("Unix sockets are not supported on this platform")
+        self.batcher = RequestBatcher(**batcher_options)
+        self._servers = []
+        self._threads = []
+        if http:
+            self._servers.append(ThreadingHTTPServer((host, port), _HTTPHandler))
+        if socket_path is not None:
+            self._servers.append(socketserver.ThreadingUnixStreamServer(socket_path, _SocketHandler))
+        for server in self._servers:
+            server.daemon_threads = True
+            server.batcher = self.batcher
+        self.socket_path = socket_path
+
+    @property
+    def url(self):
+        """Base URL of the HTTP server, or None without one."""
+        for server in self._servers:
+            if isinstance(server, ThreadingHTTPServer):
+                host, port = server.server_address[:2]
+                return f'http://{host}:{port}'
+        return None
+
+    def start(self):
+        """Serve in background threads; returns self."""
+        self.batcher.start()
+        for server in self._servers:
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        """Stop serving and remove the Unix socket."""
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self.batcher.stop()
+        if self.socket_path is not None and os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+class ServiceClient:
+    """
+    Client for a NormalizationService, over HTTP or its Unix socket.
+
+    Keeps one connection open; use one client per thread.
+    """
+
+    def __init__(self, url=None, socket_path=None, timeout=30):
+        if (url is None) == (socket_path is None):
+            raise ValueError("Pass either url or socket_path")
+        self._url = url
+        self._socket_path = socket_path
+        self._timeout = timeout
+        self._connection = None
+
+    def _connect(self):
+        if self._url is not None:
+            parts = urlsplit(self._url)
+            self._connection = HTTPConnection(parts.hostname, parts.port, timeout=self._timeout)
+        else:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self._timeout)
+            sock.connect(self._socket_path)
+            self._connection = (sock, sock.makefile('rwb'))
+
+    def _request(self, payload, path='/normalize'):
+        """Send one JSON request; over HTTP, a None payload is a GET of ``path``."""
+        if self._connection is None:
+            self._connect()
+        if self._url is not None:
+            if payload is None:
+                self._connection.request('GET', path)
+            else:
+                self._connection.request('POST', path, body=json.dumps(payload),
+                                         headers={'Content-Type': 'application/json'})
+            response = self._connection.getresponse()
+            result = json.loads(response.read())
+            if response.status != 200:
+                raise ValueError(result.get('error', f"HTTP {response.status}"))
+            return result
+
+        stream = self._connection[1]
+        stream.write(json.dumps(payload).encode('utf-8') + b'\n')
+        stream.flush()
+        result = json.loads(stream.readline())
+        if isinstance(result, dict) and 'error' in result:
+            raise ValueError(result['error'])
+        return result
+
+    def normalize(self, addresses):
+        """Normalize a list of addresses on the service; returns the list of results."""
+        return self._request(list(addresses))
+
+    def normalize_address(self, address):
+        """Normalize one address on the service."""
+        return self._request([address])[0]
+
+    def stats(self):
+        """The service's RequestBatcher.stats."""
+        if self._url is not None:
+            return self._request(None, '/stats')
+        return self._request({'stats': True})
+
+    def close(self):
+        if self._connection is not None:
+            if self._url is not None:
+                self._connection.close()
+            else:
+                sock, stream = self._connection
+                stream.close()
+                sock.close()
+            self._connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve address normalization to local processes.")
+    parser.add_argument('--host', default='127.0.0.1', help="HTTP bind address (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"HTTP port (default: {DEFAULT_PORT})")
+    parser.add_argument('--socket', default=None, help="Also listen on this Unix socket")
+    parser.add_argument('--no-http', action='store_true', help="Only listen on --socket")
+    parser.add_argument('--cache-size', type=int, default=SERVICE_CACHE_SIZE,
+                        help=f"Normalized addresses kept in the LRU cache (default: {SERVICE_CACHE_SIZE})")
+    parser.add_argument('--max-batch', type=int, default=MAX_BATCH,
+                        help=f"Most addresses normalized in one batch (default: {MAX_BATCH})")
+    parser.add_argument('--max-wait-ms', type=float, default=0.0,
+                        help="Wait this long for more requests before running a batch (default: 0)")
+    parser.add_argument('--rules', default=None, help="JSON rule file (see normalize_addresses.py --rules)")
+    args = parser.parse_args(argv)
+
+    rules = None
+    if args.rules:
+        from address_rules import load_rules
+
+        rules = load_rules(args.rules)
+    service = NormalizationService(args.host, args.port, socket_path=args.socket, http=not args.no_http,
+                                   cache_size=args.cache_size, max_batch=args.max_batch,
+                                   max_wait=args.max_wait_ms / 1000, rules=rules)
+    with service:
+        print(f"Serving address normalization on {service.url or service.socket_path}"
+              + (f" and {service.socket_path}" if service.url and service.socket_path else ""))
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
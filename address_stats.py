@@ -0,0 +1,6 @@
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted sequence; None if it is empty."""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
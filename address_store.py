@@ -0,0 +1,93 @@
+import sqlite3
+
+from address_normalizer import AddressNormalizer
+
+# SQLite limits the number of bound parameters per statement; stay well below it
+_QUERY_BATCH = 500
+
+def rules_fingerprint(normalizer):
+    """
+    Hash the rule tables of a normalizer.
+
+    This is the fingerprint of its RuleSet, which covers the suffix,
+    unit designator and directional tables and RULES_VERSION, so editing a
+    rule (or the normalization logic) gives a different fingerprint.
+    """
+    return normalizer.rules.fingerprint
+
+class NormalizationStore:
+    """
+    Persistent raw address -> normalized address store backed by SQLite.
+
+    Weekly exports are mostly unchanged, so results from earlier runs can
+    be reused. The store remembers the rules_fingerprint of the normalizer
+    that filled it. When opened with different rules it is emptied, so
+    stale results are never served.
+
+    Usage:
+        with NormalizationStore('addresses.sqlite') as store:
+            found = store.get_many(addresses)
+            ...
+            store.put_many(new_results)
+    """
+
+    def __init__(self, path, normalizer=None):
+        """
+        Parameters:
+        -----------
+        path : str
+            SQLite database file; created if missing
+        normalizer : AddressNormalizer, optional
+            Normalizer whose rules the stored results must match. Defaults
+            to a fresh AddressNormalizer().
+        """
+        self.path = path
+        self.fingerprint = rules_fingerprint(normalizer or AddressNormalizer())
+        self.invalidated = False
+
+        # Several files may share one store when processed concurrently
+        self._connection = sqlite3.connect(path, timeout=60)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS results (raw TEXT PRIMARY KEY, normalized TEXT NOT NULL)")
+
+            row = self._connection.execute(
+                "SELECT value FROM meta WHERE key = 'rules_fingerprint'").fetchone()
+            if row is None or row[0] != self.fingerprint:
+                # Rules changed (or new store): drop everything computed with the old ones
+                self.invalidated = row is not None
+                self._connection.execute("DELETE FROM results")
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('rules_fingerprint', ?)",
+                    (self.fingerprint,))
+
+    def get_many(self, addresses):
+        """Look up many raw addresses at once; returns {raw: normalized} for the hits."""
+        addresses = list(addresses)
+        found = {}
+        for i in range(0, len(addresses), _QUERY_BATCH):
+            batch = addresses[i:i + _QUERY_BATCH]
+            placeholders = ','.join('?' * len(batch))
+            found.update(self._connection.execute(
+                f"SELECT raw, normalized FROM results WHERE raw IN ({placeholders})", batch))
+        return found
+
+    def put_many(self, results):
+        """Store (raw, normalized) pairs in a single transaction."""
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO results (raw, normalized) VALUES (?, ?)", results)
+
+    def __len__(self):
+        return self._connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,461 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from address_stats import percentile
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    # Not available on Windows; peak RSS is reported as None there
+    RESOURCE_AVAILABLE = False
+
+# Building blocks for synthetic addresses, weighted towards what real exports contain
+STREET_NAMES = ["Main", "Oak", "Pine", "Maple", "Cedar", "Elm", "Washington", "Lincoln", "Park",
+                "Canyon Lake", "Lake Shore", "Hill Top", "Mountain View", "River Canyon", "Spring Creek",
+                "Mill Pond", "Forest Glen", "Sunset Ridge", "Stone Bridge", "Harbor Point"]
+STREET_SUFFIXES = ["St", "Street", "Ave", "Avenue", "Dr", "Drive", "Rd", "Road", "Ln", "Lane", "Cir",
+                   "Circle", "Ct", "Court", "Blvd", "Boulevard", "Way", "Pl", "Place", "Ter", "Pkwy"]
+DIRECTIONALS = ["N", "S", "E", "W", "NE", "NW", "SE", "SW", "North", "South", "Northeast",
+                "Southwest", "Southeast", "Northwest"]
+UNIT_DESIGNATORS = ["Apt", "Apartment", "Suite", "Ste", "Unit", "Bldg", "Building", "Fl", "Floor",
+                    "Rm", "Room", "Lot", "Trlr", "Ofc", "Office", "Ph", "Dept"]
+CITIES = ["Austin", "Denver", "Portland", "Columbus", "Raleigh", "Madison", "Boise", "Tucson"]
+STATES = ["TX", "CO", "OR", "OH", "NC", "WI", "ID", "AZ"]
+
+# Benchmark stages, run in this order
+STAGES = ['normalize_address', 'normalize_address_columns', 'csv_in_memory', 'csv_streaming']
+
+
+def generate_address(rng):
+    """Return one synthetic street address exercising the normalizer's rules."""
+    parts = [str(rng.randint(1, 99999))]
+    roll = rng.random()
+    if roll < 0.05:
+        parts[0] += " 1/2"
+    elif roll < 0.07:
+        parts[0] = f"{parts[0]}/1/2"
+
+    if rng.random() < 0.2:
+        parts.append(rng.choice(DIRECTIONALS))
+    parts.append(rng.choice(STREET_NAMES))
+    if rng.random() < 0.15:
+        # Multi-suffix street names, e.g. "Canyon Lake Circle Dr"
+        parts.append(rng.choice(STREET_SUFFIXES))
+    parts.append(rng.choice(STREET_SUFFIXES))
+    if rng.random() < 0.15:
+        parts.append(rng.choice(DIRECTIONALS))
+
+    roll = rng.random()
+    if roll < 0.15:
+        parts.append(f"{rng.choice(UNIT_DESIGNATORS)} {rng.randint(1, 999)}{rng.choice(['', 'A', 'B'])}")
+    elif roll < 0.25:
+        parts.append(f"#{rng.randint(1, 999)}{rng.choice(['', 'A', 'B'])}")
+    elif roll < 0.28:
+        parts.append(f"{rng.choice(UNIT_DESIGNATORS)} #{rng.randint(1, 99)}")
+
+    address = " ".join(parts)
+    roll = rng.random()
+    if roll < 0.03:
+        # Line breaks that were exported as "/n"
+        address = address.replace(" ", " /n ", 1)
+    elif roll < 0.05:
+        address = address.replace(" ", ", ", 1)
+    elif roll < 0.06:
+        address = address.upper()
+    elif roll < 0.07:
+        address = "See Mailing Address"
+    return address
+
+
+def generate_corpus(n, seed=0, repeat_rate=0.3):
+    """
+    Generate a list of ``n`` synthetic addresses.
+
+    Parameters:
+    -----------
+    n : int
+        Number of addresses
+    seed : int, optional
+        Random seed, so corpora are reproducible between versions
+    repeat_rate : float, optional
+        Fraction of rows that repeat an earlier address, like CRM exports do
+
+    Returns:
+    --------
+    list
+        Address strings, with occasional None and blank values
+    """
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(n):
+        roll = rng.random()
+        if corpus and roll < repeat_rate:
+            corpus.append(corpus[rng.randrange(len(corpus))])
+        elif roll < repeat_rate + 0.02:
+            corpus.append(None)
+        elif roll < repeat_rate + 0.03:
+            corpus.append("")
+        else:
+            corpus.append(generate_address(rng))
+    return corpus
+
+
+def generate_dataframe(n, seed=0, extra_columns=0):
+    """
+    Generate an export-shaped DataFrame with two address lines plus City/State/ZIP.
+
+    ``extra_columns`` adds that many numeric non-address columns, to mimic
+    wide CRM exports where copying the frame is expensive.
+    """
+    import numpy as np
+    import pandas as pd
+
+    rng = random.Random(seed + 1)
+    df = pd.DataFrame({
+        'Id': range(n),
+        'Address1': generate_corpus(n, seed),
+        'Address2': [rng.choice(UNIT_DESIGNATORS) + f" {rng.randint(1, 99)}" if rng.random() < 0.1 else None
+                     for _ in range(n)],
+        'City': [rng.choice(CITIES) for _ in range(n)],
+        'State': [rng.choice(STATES) for _ in range(n)],
+        'ZIP': [f"{rng.randint(10000, 99999)}" for _ in range(n)],
+    })
+    if extra_columns:
+        values = np.random.default_rng(seed).integers(0, 1000000, size=(n, extra_columns))
+        extra = pd.DataFrame(values, columns=[f'Field{i}' for i in range(extra_columns)])
+        df = pd.concat([df, extra], axis=1)
+    return df
+
+
+def _proc_status_mb(field):
+    """Read a kB field such as VmRSS from /proc/self/status (Linux) in MB, or None."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def current_rss_mb():
+    """Current resident set size of this process in MB, or None if unavailable."""
+    return _proc_status_mb('VmRSS')
+
+
+def reset_peak_rss():
+    """
+    Reset the peak RSS to the current RSS, so peak_rss_mb covers only what runs next.
+
+    Linux only; returns False where it is not supported, and peak_rss_mb then
+    stays the peak of the whole process.
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None if unavailable."""
+    peak = _proc_status_mb('VmHWM')
+    if peak is not None or not RESOURCE_AVAILABLE:
+        return peak
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def start_measurement():
+    """Mark the start of a timed section; returns the RSS before it in MB."""
+    reset_peak_rss()
+    return current_rss_mb()
+
+
+def bench_normalize_address(n, seed, extra_columns=0):
+    """Time normalize_address one call at a time and record per-address latency."""
+    from address_normalizer import AddressNormalizer
+
+    corpus = generate_corpus(n, seed)
+    normalizer = AddressNormalizer()
+    normalize = normalizer.normalize_address
+    clock = time.perf_counter_ns
+
+    latencies = []
+    rss_before = start_measurement()
+    for address in corpus:
+        start = clock()
+        normalize(address)
+        latencies.append(clock() - start)
+
+    seconds = sum(latencies) / 1e9
+    latencies.sort()
+    return {
+        'seconds': seconds,
+        'rss_before_mb': rss_before,
+        'p50_us': percentile(latencies, 0.50) / 1000,
+        'p99_us': percentile(latencies, 0.99) / 1000,
+    }
+
+
+def bench_normalize_address_columns(n, seed, extra_columns=0):
+    """Time normalize_address_columns over an export-shaped DataFrame."""
+    from normalize_addresses import normalize_address_columns
+
+    df = generate_dataframe(n, seed, extra_columns)
+    rss_before = start_measurement()
+    start = time.perf_counter()
+    normalize_address_columns(df, verbose=False)
+    return {'seconds': time.perf_counter() - start, 'rss_before_mb': rss_before}
+
+
+def _bench_csv(n, seed, chunksize, extra_columns=0):
+    from normalize_addresses import process_file
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_file = os.path.join(tmp, 'export.csv')
+        generate_dataframe(n, seed, extra_columns).to_csv(input_file, index=False)
+
+        rss_before = start_measurement()
+        start = time.perf_counter()
+        process_file(input_file, chunksize=chunksize, encoding='utf-8', verbose=False)
+        return {'seconds': time.perf_counter() - start, 'rss_before_mb': rss_before}
+
+
+def bench_csv_in_memory(n, seed, extra_columns=0):
+    """Time the end-to-end CSV path: read, normalize, write."""
+    return _bench_csv(n, seed, chunksize=None, extra_columns=extra_columns)
+
+
+def bench_csv_streaming(n, seed, extra_columns=0):
+    """Time the end-to-end chunked CSV path."""
+    return _bench_csv(n, seed, chunksize=100000, extra_columns=extra_columns)
+
+
+BENCHMARKS = {
+    'normalize_address': bench_normalize_address,
+    'normalize_address_columns': bench_normalize_address_columns,
+    'csv_in_memory': bench_csv_in_memory,
+    'csv_streaming': bench_csv_streaming,
+}
+
+
+def _run_in_child(stage, n, seed, extra_columns, connection):
+    try:
+        result = BENCHMARKS[stage](n, seed, extra_columns)
+        result['peak_rss_mb'] = peak_rss_mb()
+        connection.send(result)
+    except Exception as e:
+        connection.send({'error': f"{type(e).__name__}: {e}"})
+    finally:
+        connection.close()
+
+
+def run_stage(stage, n, seed=0, extra_columns=0):
+    """
+    Run one benchmark stage in a fresh process, so its peak RSS is its own.
+
+    Returns:
+    --------
+    dict
+        ``stage``, ``rows``, ``seconds``, ``rows_per_sec``, ``rss_before_mb``
+        (RSS once the input is built) and ``peak_rss_mb`` (peak while the
+        stage ran where supported, otherwise of the whole process), plus
+        ``p50_us``/``p99_us`` for per-address stages
+    """
+    parent, child = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=_run_in_child, args=(stage, n, seed, extra_columns, child))
+    process.start()
+    child.close()
+    result = parent.recv()
+    process.join()
+
+    result = dict({'stage': stage, 'rows': n}, **result)
+    if 'seconds' in result:
+        result['rows_per_sec'] = n / result['seconds'] if result['seconds'] > 0 else None
+    return result
+
+
+# Imported, constructed and called once in a fresh interpreter by measure_startup
+STARTUP_MODULES = ['address_normalizer', 'normalize_addresses']
+
+_STARTUP_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+imported = time.perf_counter()
+from address_normalizer import AddressNormalizer
+normalizer = AddressNormalizer()
+constructed = time.perf_counter()
+normalizer.normalize_address("123 North Main Street Apartment 4")
+called = time.perf_counter()
+print(json.dumps({{
+    'import_ms': (imported - start) * 1000,
+    'construct_ms': (constructed - imported) * 1000,
+    'first_call_ms': (called - constructed) * 1000,
+    'pandas_loaded': 'pandas' in sys.modules,
+}}))
+"""
+
+
+def measure_startup(runs=5):
+    """
+    Time a cold start of each STARTUP_MODULES entry in fresh interpreters.
+
+    Each module is run once first so its bytecode is cached, as it would be
+    in a deployed job, then ``runs`` times; the medians are reported.
+
+    Returns:
+    --------
+    list
+        One dict per module with ``process_ms`` (the whole interpreter run),
+        ``import_ms``, ``construct_ms`` (first AddressNormalizer()),
+        ``first_call_ms`` (first normalize_address) and ``pandas_loaded``
+    """
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    cwd = os.path.dirname(os.path.abspath(__file__))
+
+    results = []
+    for module in STARTUP_MODULES:
+        command = [sys.executable, '-c', _STARTUP_SCRIPT.format(module=module)]
+        samples = []
+        for run in range(runs + 1):
+            start = time.perf_counter()
+            output = subprocess.run(command, cwd=cwd, env=env, capture_output=True, text=True, check=True).stdout
+            elapsed = (time.perf_counter() - start) * 1000
+            if run:
+                samples.append(dict(json.loads(output), process_ms=elapsed))
+
+        result = {'module': module, 'pandas_loaded': samples[-1]['pandas_loaded']}
+        for key in ('process_ms', 'import_ms', 'construct_ms', 'first_call_ms'):
+            result[key] = statistics.median(sample[key] for sample in samples)
+        results.append(result)
+    return results
+
+
+def print_startup(result):
+    print(f"{result['module']:28} process {result['process_ms']:7.1f} ms  import {result['import_ms']:7.1f} ms  "
+          f"construct {result['construct_ms']:5.1f} ms  first call {result['first_call_ms']:5.2f} ms  "
+          f"pandas {'loaded' if result['pandas_loaded'] else 'not loaded'}")
+
+
+def run_benchmarks(sizes, stages=None, seed=0, extra_columns=0, startup=False):
+    """Run the selected stages for every corpus size and return the JSON-ready report."""
+    report = {}
+    if startup:
+        report['startup'] = measure_startup()
+        for result in report['startup']:
+            print_startup(result)
+
+    results = []
+    for n in sizes:
+        for stage in stages or STAGES:
+            result = run_stage(stage, n, seed, extra_columns)
+            print_result(result)
+            results.append(result)
+
+    return dict({
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'seed': seed,
+        'extra_columns': extra_columns,
+        'results': results,
+    }, **report)
+
+
+def print_result(result):
+    if 'error' in result:
+        print(f"{result['stage']:28} {result['rows']:>10}  ERROR: {result['error']}")
+        return
+
+    latency = ''
+    if 'p50_us' in result:
+        latency = f"  p50 {result['p50_us']:8.1f} us  p99 {result['p99_us']:8.1f} us"
+    rss = f"{result['peak_rss_mb']:8.1f} MB" if result['peak_rss_mb'] is not None else "     n/a"
+    if result.get('rss_before_mb') is not None:
+        rss = f"{result['rss_before_mb']:8.1f} -> {rss}"
+    print(f"{result['stage']:28} {result['rows']:>10} {result['seconds']:9.2f} s "
+          f"{result['rows_per_sec']:>11.0f} rows/s  RSS {rss}{latency}")
+
+
+def compare_reports(baseline, current):
+    """Print the rows/sec ratio and peak RSS of ``current`` against ``baseline`` for matching stages."""
+    previous = {(r['stage'], r['rows']): r for r in baseline['results'] if 'error' not in r}
+    print(f"\n{'Stage':28} {'Rows':>10} {'Before':>11} {'After':>11} {'Speedup':>8} "
+          f"{'Peak MB before':>15} {'after':>9}")
+    print("-" * 98)
+    for result in current['results']:
+        before = previous.get((result['stage'], result['rows']))
+        if before is None or 'error' in result:
+            continue
+        ratio = result['rows_per_sec'] / before['rows_per_sec']
+        peaks = [f"{r['peak_rss_mb']:.1f}" if r.get('peak_rss_mb') is not None else "n/a" for r in (before, result)]
+        print(f"{result['stage']:28} {result['rows']:>10} {before['rows_per_sec']:>11.0f} "
+              f"{result['rows_per_sec']:>11.0f} {ratio:>7.2f}x {peaks[0]:>15} {peaks[1]:>9}")
+
+    previous = {r['module']: r for r in baseline.get('startup', [])}
+    startup = [r for r in current.get('startup', []) if r['module'] in previous]
+    if startup:
+        print(f"\n{'Startup':28} {'Import ms before':>17} {'after':>9} {'Process ms before':>18} {'after':>9}")
+        print("-" * 85)
+    for result in startup:
+        before = previous[result['module']]
+        print(f"{result['module']:28} {before['import_ms']:>17.1f} {result['import_ms']:>9.1f} "
+              f"{before['process_ms']:>18.1f} {result['process_ms']:>9.1f}")
+
+
+def parse_size(text):
+    """Parse corpus sizes like ``10000``, ``10k`` or ``1M``."""
+    multipliers = {'k': 1000, 'm': 1000000}
+    text = text.strip().lower()
+    if text and text[-1] in multipliers:
+        return int(float(text[:-1]) * multipliers[text[-1]])
+    return int(text)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark address normalization throughput and memory.")
+    parser.add_argument('--sizes', nargs='+', type=parse_size, default=[10000],
+                        help="Corpus sizes, e.g. 10k 1M 10M (default: 10k)")
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=None,
+                        help="Stages to run (default: all)")
+    parser.add_argument('--seed', type=int, default=0, help="Corpus random seed (default: 0)")
+    parser.add_argument('--extra-columns', type=int, default=0,
+                        help="Numeric non-address columns added to the generated exports (default: 0)")
+    parser.add_argument('--startup', action='store_true',
+                        help="Also time import, construction and the first call in fresh interpreters")
+    parser.add_argument('--output', default=None, help="Write the results to this JSON file")
+    parser.add_argument('--compare', default=None, help="Earlier JSON results to compare against")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.sizes, args.stages, args.seed, args.extra_columns, args.startup)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved results to: {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare_reports(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+import argparse
+import json
+import random
+import re
+import time
+
+from address_normalizer import AddressNormalizer
+from benchmark_addresses import generate_corpus, parse_size
+from reference_normalizer import ReferenceNormalizer
+
+# Engines run with a small LRU cache, so repeated addresses take the cache path
+CACHE_SIZE = 1024
+
+# Calls of the differing check allowed while minimizing one input
+MAX_MINIMIZE_CHECKS = 2000
+
+# Fragments real exports are full of, mixed into generated addresses by generate_messy_corpus
+MESSY_FRAGMENTS = [
+    "#", "#5", "#2B", "/n", "/ n", "\\n", "\n", "1/2", "3/4th", "25/1/2", "1/2/", "-", "--", ",", ".",
+    "'", "/", "See Mailing Address", "see mailing", "UNLISTED", "PO Box 12", "P.O. Box", "FRACTION_0",
+    "1st", "2ND", "11th", "Center25", "A1", "O'Neil", "Jr.", "St.", "Apt", "APT", "apartment",
+    "Suite", "Ste", "Unit", "unit", "Bldg", "Fl", "Lot", "Trlr", "Key", "Stop", "Lk", "Lake",
+    "Northeast", "NORTHWEST", "southeast", "Southwest.", "N", "s", "ne", "PO", "Po",
+    "é", "Straße", "ſt", "Key", "İ", "ı", "ﬀ", "١٢",
+]
+
+# Separators between an address and an inserted fragment
+MESSY_SEPARATORS = [" ", " ", " ", "", "  ", ", ", "\t", "/", "-"]
+
+
+def generate_messy_address(rng, address):
+    """Return ``address`` with one to three real-world defects mixed in."""
+    for _ in range(rng.randint(1, 3)):
+        roll = rng.random()
+        words = address.split(' ')
+        if roll < 0.45:
+            # Insert a fragment between two words
+            position = rng.randint(0, len(words))
+            fragment = rng.choice(MESSY_FRAGMENTS)
+            words.insert(position, fragment)
+            address = rng.choice(MESSY_SEPARATORS).join(words) if rng.random() < 0.2 else ' '.join(words)
+        elif roll < 0.6:
+            # Glue two words together, or split one with punctuation
+            position = rng.randrange(len(words))
+            glue = rng.choice(['', '', '.', ',', '-', '/', '#'])
+            address = ' '.join(words[:position]) + glue + ' '.join(words[position:])
+        elif roll < 0.75:
+            # Change the case of some words
+            change = rng.choice([str.upper, str.lower, str.title])
+            address = ' '.join(change(w) if rng.random() < 0.5 else w for w in words)
+        elif roll < 0.85:
+            # Stray whitespace
+            address = rng.choice(['', ' ', '  ', '\t']) + address.replace(' ', rng.choice(['  ', '\t', ' \n ']), 1) \
+                + rng.choice(['', ' ', ' \\n'])
+        else:
+            # Drop a word
+            del words[rng.randrange(len(words))]
+            address = ' '.join(words)
+    return address
+
+
+def generate_messy_corpus(n, seed=0):
+    """
+    Generate ``n`` export-shaped addresses with the defects real files have.
+
+    Starts from generate_corpus and mixes in "/n" artifacts, '#' units,
+    fractions, punctuation, odd casing and whitespace, throwaway phrases and
+    non-ASCII letters, plus the values that are passed through unchanged
+    (None, NaN, numbers, blank strings).
+    """
+    rng = random.Random(seed)
+    corpus = []
+    for address in generate_corpus(n, seed, repeat_rate=0.1):
+        roll = rng.random()
+        if roll < 0.01:
+            corpus.append(rng.choice([float('nan'), 12345, '   ', '\t', '#', '/n']))
+        elif isinstance(address, str) and address and roll < 0.8:
+            corpus.append(generate_messy_address(rng, address))
+        else:
+            corpus.append(address)
+    return corpus
+
+
+def load_file_addresses(file_paths):
+    """Return every cell of the address line columns of the given CSV, Parquet or Arrow files."""
+    from normalize_addresses import identify_address_columns, read_table
+
+    addresses = []
+    for file_path in file_paths:
+        df = read_table(file_path)
+        for column in identify_address_columns(df):
+            addresses.extend(df[column].tolist())
+    return addresses
+
+
+# Corpus generators for --corpus, by name
+CORPORA = {
+    'generated': generate_corpus,
+    'messy': generate_messy_corpus,
+}
+
+
+def _per_address(normalizer):
+    return lambda addresses: [normalizer.normalize_address(address) for address in addresses]
+
+
+def engine_normalize_address(addresses):
+    return _per_address(AddressNormalizer())(addresses)
+
+
+def engine_cached(addresses):
+    return _per_address(AddressNormalizer(cache_size=CACHE_SIZE))(addresses)
+
+
+def engine_normalize_many(addresses):
+    return AddressNormalizer().normalize_many(addresses)
+
+
+def engine_normalize_series(addresses):
+    import pandas as pd
+
+    return AddressNormalizer().normalize_series(pd.Series(addresses, dtype=object)).tolist()
+
+
+def engine_parse_address(addresses):
+    return [parsed.normalized for parsed in AddressNormalizer().parse_many(addresses)]
+
+
+def _engine_columns(addresses, workers=None):
+    import pandas as pd
+    from normalize_addresses import normalize_address_columns
+
+    df = pd.DataFrame({'Address1': pd.Series(addresses, dtype=object)})
+    df = normalize_address_columns(df, specific_columns=['Address1'], workers=workers, verbose=False)
+    return df['n_Address1'].tolist()
+
+
+def engine_normalize_address_columns(addresses):
+    return _engine_columns(addresses)
+
+
+def engine_parallel(addresses):
+    return _engine_columns(addresses, workers=2)
+
+
+# Engines compared against the reference by default. An engine takes a list
+# of addresses and returns their normalized values in the same order.
+ENGINES = {
+    'normalize_address': engine_normalize_address,
+    'cached': engine_cached,
+    'normalize_many': engine_normalize_many,
+    'normalize_series': engine_normalize_series,
+    'parse_address': engine_parse_address,
+    'normalize_address_columns': engine_normalize_address_columns,
+    'parallel': engine_parallel,
+}
+
+
+def same_output(expected, actual):
+    """True if two normalized values are identical, counting NaN as equal to NaN."""
+    if expected is actual:
+        return True
+    if type(expected) is not type(actual):
+        return False
+    return expected == actual or (expected != expected and actual != actual)
+
+
+def minimize_difference(address, differs, max_checks=MAX_MINIMIZE_CHECKS):
+    """
+    Shrink an address while ``differs`` still holds for it.
+
+    Removes chunks of words (with the whitespace before them), then chunks of
+    single characters, halving the chunk size whenever no removal of that
+    size keeps the difference, until nothing more can be removed or
+    ``max_checks`` calls of ``differs`` have been made.
+
+    Parameters:
+    -----------
+    address : str
+        Input for which ``differs(address)`` is True
+    differs : callable
+        Takes one address and returns True if the engines disagree on it
+    max_checks : int, optional
+        Upper bound on calls of ``differs``
+
+    Returns:
+    --------
+    str
+        A shorter (or the same) address on which the engines still disagree
+    """
+    checks = 0
+    for split in (lambda text: re.findall(r'\s*\S+|\s+', text), list):
+        pieces = split(address)
+        size = max(len(pieces) // 2, 1)
+        while size >= 1 and checks < max_checks:
+            removed = False
+            start = 0
+            while start < len(pieces) and checks < max_checks:
+                candidate = pieces[:start] + pieces[start + size:]
+                checks += 1
+                if differs(''.join(candidate)):
+                    pieces, removed = candidate, True
+                else:
+                    start += size
+            if not removed:
+                size //= 2
+        address = ''.join(pieces)
+    return address
+
+
+def check_engine(addresses, engine, expected, max_examples=10, reference=None):
+    """
+    Run one engine over a corpus and compare it with the reference row by row.
+
+    Parameters:
+    -----------
+    addresses : list
+        The corpus
+    engine : callable
+        Takes a list of addresses and returns their normalized values
+    expected : list
+        Reference output for ``addresses``
+    max_examples : int, optional
+        Number of distinct differing inputs to minimize and report
+    reference : ReferenceNormalizer, optional
+        Used to minimize differing inputs
+
+    Returns:
+    --------
+    dict
+        ``rows``, ``seconds``, ``mismatches`` (differing rows) and
+        ``examples``: for each reported input its row, the ``address``, the
+        ``minimized`` address and the ``expected``/``actual`` output for the
+        minimized one
+    """
+    reference = reference or ReferenceNormalizer()
+    # One warm-up call, so lazy imports are not timed
+    engine(addresses[:1])
+    start = time.perf_counter()
+    actual = engine(addresses)
+    seconds = time.perf_counter() - start
+
+    if len(actual) != len(addresses):
+        raise ValueError(f"engine returned {len(actual)} values for {len(addresses)} addresses")
+
+    def differs(address):
+        return not same_output(reference.normalize_address(address), engine([address])[0])
+
+    mismatches = 0
+    examples = []
+    reported = set()
+    for row, (address, want, got) in enumerate(zip(addresses, expected, actual)):
+        if same_output(want, got):
+            continue
+        mismatches += 1
+        if len(examples) >= max_examples or (isinstance(address, str) and address in reported):
+            continue
+
+        minimized = address
+        if isinstance(address, str):
+            reported.add(address)
+            # Batch engines may only differ in the context of the whole
+            # corpus; such inputs are reported as they are
+            if differs(address):
+                minimized = minimize_difference(address, differs)
+        if minimized is not address:
+            want, got = reference.normalize_address(minimized), engine([minimized])[0]
+        examples.append({'row': row, 'address': address, 'minimized': minimized, 'expected': want, 'actual': got})
+
+    return {'rows': len(addresses), 'seconds': seconds, 'mismatches': mismatches, 'examples': examples}
+
+
+def run_differential(addresses, engines=None, max_examples=10):
+    """
+    Compare engines against the frozen reference normalizer on one corpus.
+
+    Parameters:
+    -----------
+    addresses : list
+        The corpus
+    engines : dict, optional
+        Engine name -> callable taking a list of addresses (default: ENGINES)
+    max_examples : int, optional
+        Differing inputs to minimize and report per engine
+
+    Returns:
+    --------
+    list
+        One check_engine result per engine with its ``engine`` name,
+        ``reference_seconds`` and ``speedup`` (reference time over engine time)
+    """
+    if ReferenceNormalizer.RULES_VERSION != AddressNormalizer.RULES_VERSION:
+        raise ValueError(
+            f"reference_normalizer.py reproduces RULES_VERSION {ReferenceNormalizer.RULES_VERSION}, "
+            f"but the rules are at version {AddressNormalizer.RULES_VERSION}; update the reference "
+            "with the intended output change"
+        )
+
+    reference = ReferenceNormalizer()
+    start = time.perf_counter()
+    expected = [reference.normalize_address(address) for address in addresses]
+    reference_seconds = time.perf_counter() - start
+
+    results = []
+    for name, engine in (engines or ENGINES).items():
+        result = check_engine(addresses, engine, expected, max_examples, reference)
+        result = dict({'engine': name}, **result, reference_seconds=reference_seconds)
+        result['speedup'] = reference_seconds / result['seconds'] if result['seconds'] > 0 else None
+        results.append(result)
+    return results
+
+
+def print_result(corpus, result):
+    status = 'OK' if not result['mismatches'] else f"{result['mismatches']} DIFFERING ROWS"
+    speedup = f"{result['speedup']:7.2f}x" if result['speedup'] is not None else "    n/a"
+    print(f"{corpus:10} {result['engine']:26} {result['rows']:>9} {result['seconds']:8.2f} s "
+          f"{speedup} vs reference  {status}")
+    for example in result['examples']:
+        print(f"    row {example['row']}: {example['address']!r}")
+        print(f"        minimized {example['minimized']!r}: "
+              f"reference {example['expected']!r}, engine {example['actual']!r}")
+
+
+def main(argv=None):
+    """
+    Compare normalization engines with the reference normalizer.
+
+    Returns the process exit status: 1 if any engine differed, otherwise 0.
+    """
+    parser = argparse.ArgumentParser(
+        description="Check that optimized normalization engines match the frozen reference output.")
+    parser.add_argument('--engines', nargs='+', choices=list(ENGINES), default=None,
+                        help="Engines to check (default: all)")
+    parser.add_argument('--corpus', nargs='+', choices=list(CORPORA), default=list(CORPORA),
+                        help="Generated corpora to run (default: all)")
+    parser.add_argument('--rows', type=parse_size, default=20000,
+                        help="Addresses per generated corpus, e.g. 20k or 1M (default: 20k)")
+    parser.add_argument('--seed', type=int, default=0, help="Corpus random seed (default: 0)")
+    parser.add_argument('--input', nargs='+', default=None,
+                        help="Also check the address line columns of these CSV, Parquet or Arrow files")
+    parser.add_argument('--max-examples', type=int, default=10,
+                        help="Differing inputs to minimize and report per engine (default: 10)")
+    parser.add_argument('--output', default=None, help="Write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    engines = {name: ENGINES[name] for name in args.engines} if args.engines else ENGINES
+    corpora = {name: CORPORA[name](args.rows, args.seed) for name in args.corpus}
+    if args.input:
+        corpora['files'] = load_file_addresses(args.input)
+
+    report = {}
+    for corpus, addresses in corpora.items():
+        report[corpus] = run_differential(addresses, engines, args.max_examples)
+        for result in report[corpus]:
+            print_result(corpus, result)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, default=repr)
+        print(f"\nSaved results to: {args.output}")
+
+    return 1 if any(result['mismatches'] for results in report.values() for result in results) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,15 +1,14 @@
-import pandas as pd
+import codecs
+import json
 import re
 import os
 import glob
-from address_normalizer import AddressNormalizer
-
-try:
-    import chardet
-    CHARDET_AVAILABLE = True
-except ImportError:
-    CHARDET_AVAILABLE = False
-    print("Note: chardet not available. Using fallback encoding detection.")
+import mmap
+import time
+from collections import deque
+from itertools import chain
+from address_normalizer import AddressNormalizer, NormalizationProfile
+from address_rules import load_rules
 
 # Column mapping for address line identification
 COLUMN_MAPPING = {
@@ -40,70 +39,209 @@ COLUMN_PATTERNS = {
     ],
 }
 
-def create_enhanced_reverse_mapping(dataframe_columns):
-    """Create a reverse mapping from actual column names to standard names."""
-    reverse_mapping = {}
+# Compiled form of COLUMN_MAPPING / COLUMN_PATTERNS, built on first use by _column_index
+_compiled_column_index = None
+
+def _column_index():
+    """
+    Compile COLUMN_MAPPING and COLUMN_PATTERNS into a lookup structure.
+    
+    Returns (exact, combined, group_names): a dict from exact column name to
+    (rank, standard name), one alternation regex with a named group per
+    pattern (tried in COLUMN_PATTERNS order, like the original loop), and a
+    dict from group name to (standard name, index group name). The first
+    ``\\d+`` of each pattern is captured as the N index of the column.
+    """
+    global _compiled_column_index
+    if _compiled_column_index is None:
+        exact = {}
+        rank = 0
+        for standard_name, variations in COLUMN_MAPPING.items():
+            for variation in variations:
+                exact[variation] = (rank, standard_name)
+                rank += 1
+        
+        alternatives = []
+        group_names = {}
+        for standard_name, patterns in COLUMN_PATTERNS.items():
+            for pattern in patterns:
+                k = len(alternatives)
+                index_group = f'n{k}' if r'\d+' in pattern else None
+                if index_group:
+                    pattern = pattern.replace(r'\d+', f'(?P<{index_group}>\\d+)', 1)
+                alternatives.append(f'(?P<p{k}>{pattern})')
+                group_names[f'p{k}'] = (standard_name, index_group)
+        
+        combined = re.compile('|'.join(alternatives)) if alternatives else None
+        _compiled_column_index = (exact, combined, group_names)
+    return _compiled_column_index
+
+def classify_columns(dataframe_columns):
+    """
+    Classify column names against COLUMN_MAPPING and COLUMN_PATTERNS in one pass.
     
-    # Map exact matches from COLUMN_MAPPING - only if they exist in the DataFrame
-    for standard_name, variations in COLUMN_MAPPING.items():
-        for variation in variations:
-            if variation in dataframe_columns:
-                reverse_mapping[variation] = standard_name
+    Parameters:
+    -----------
+    dataframe_columns : iterable
+        Column names to classify
+    
+    Returns:
+    --------
+    tuple
+        ``(reverse_mapping, groups)``. ``reverse_mapping`` maps each recognized
+        column to its standard name, exact matches first, in the same order
+        as create_enhanced_reverse_mapping. ``groups`` maps the prefix of each
+        numbered column set up to its N index (e.g. ``'CnAdrAll_1_01'``) to a
+        dict of standard name -> column, so the Address line, City, State and
+        ZIP Code columns of one address can be found without rescanning.
+    """
+    exact, combined, group_names = _column_index()
+    exact_matches = []
+    pattern_matches = {}
+    groups = {}
     
-    # Map pattern matches from COLUMN_PATTERNS
     for col in dataframe_columns:
-        if col not in reverse_mapping:  
-            for standard_name, patterns in COLUMN_PATTERNS.items():
-                for pattern in patterns:
-                    if re.match(pattern, col):
-                        reverse_mapping[col] = standard_name
-                        break  
-                if col in reverse_mapping:  
-                    break
+        if not isinstance(col, str):
+            continue
+        hit = exact.get(col)
+        if hit is not None:
+            exact_matches.append((hit[0], col, hit[1]))
+            continue
+        
+        match = combined.match(col) if combined is not None else None
+        if match is None:
+            continue
+        standard_name, index_group = group_names[match.lastgroup]
+        pattern_matches[col] = standard_name
+        if index_group:
+            key = col[:match.end(index_group)]
+            groups.setdefault(key, {})[standard_name] = col
+    
+    reverse_mapping = {col: standard_name for _, col, standard_name in sorted(exact_matches)}
+    reverse_mapping.update(pattern_matches)
+    return reverse_mapping, groups
+
+def create_enhanced_reverse_mapping(dataframe_columns):
+    """Create a reverse mapping from actual column names to standard names."""
+    return classify_columns(dataframe_columns)[0]
+
+# Encoding detection reads files in blocks of this size
+ENCODING_BLOCK_SIZE = 1024 * 1024
+
+# Byte order marks, checked longest first
+_BOMS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+# Bytes that cp1252 leaves undefined; a file containing any of them is read as latin-1
+_CP1252_UNDEFINED = re.compile(rb'[\x81\x8d\x8f\x90\x9d]')
+
+# Detected encodings keyed by (path, size, mtime), so unchanged files are never rescanned
+_encoding_cache = {}
+
+def _file_key(file_path):
+    stat = os.stat(file_path)
+    return f"{os.path.abspath(file_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+
+def _load_encoding_cache(cache_file):
+    try:
+        with open(cache_file, encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def _save_encoding_cache(cache_file, entries):
+    with open(cache_file, 'w', encoding='utf-8') as f:
+        json.dump(entries, f, indent=0)
+
+def _scan_encoding(file_path):
+    """Read the file once in blocks and return an encoding that decodes all of it."""
+    utf8_decoder = codecs.getincrementaldecoder('utf-8')()
+    is_utf8 = True
+    seen_undefined = False
     
-    return reverse_mapping
+    with open(file_path, 'rb') as file:
+        block = file.read(ENCODING_BLOCK_SIZE)
+        for bom, encoding in _BOMS:
+            if block.startswith(bom):
+                return encoding
+        
+        while block:
+            # Fast path: pure-ASCII blocks are valid in every candidate encoding,
+            # unless they have to complete a UTF-8 sequence split across blocks
+            if not block.isascii() or (is_utf8 and utf8_decoder.getstate()[0]):
+                # Checked in valid UTF-8 blocks too: if a later block is not
+                # UTF-8, these bytes still rule out cp1252
+                if not seen_undefined and _CP1252_UNDEFINED.search(block):
+                    seen_undefined = True
+                if is_utf8:
+                    try:
+                        utf8_decoder.decode(block)
+                    except UnicodeDecodeError:
+                        is_utf8 = False
+                if not is_utf8 and seen_undefined:
+                    # latin-1 decodes any byte, so nothing later can change the answer
+                    return 'latin-1'
+            block = file.read(ENCODING_BLOCK_SIZE)
+    
+    if is_utf8:
+        try:
+            # A multi-byte sequence cut off at the end of the file is not UTF-8
+            utf8_decoder.decode(b'', final=True)
+            return 'utf-8'
+        except UnicodeDecodeError:
+            pass
+    return 'cp1252'
 
-def detect_file_encoding(file_path):
+def detect_file_encoding(file_path, cache_file=None):
     """
-    Detect the encoding of a file using chardet or fallback methods.
+    Detect the encoding of a file in a single pass over its bytes.
+    
+    A byte order mark decides immediately. Otherwise the file is read in
+    ENCODING_BLOCK_SIZE blocks: pure-ASCII blocks are skipped, the rest are
+    validated as UTF-8. Files that are not UTF-8 are read as cp1252, or as
+    latin-1 if they contain bytes cp1252 leaves undefined anywhere; the scan
+    stops as soon as the file is known to be latin-1. Whatever is returned is guaranteed to decode the
+    whole file, so the CSV never has to be parsed twice.
+    
+    Results are cached per (path, size, mtime), in memory and optionally in a
+    JSON file, so unchanged files are not rescanned.
     
     Parameters:
     -----------
     file_path : str
         Path to the file to detect encoding for
+    cache_file : str, optional
+        JSON file persisting detected encodings between runs
         
     Returns:
     --------
     str
         Detected encoding string
     """
-    if CHARDET_AVAILABLE:
-        # Use chardet for accurate detection
-        with open(file_path, 'rb') as file:
-            raw_data = file.read(10000)  # Read first 10KB for detection
-            result = chardet.detect(raw_data)
-            encoding = result['encoding']
-            confidence = result['confidence']
-            print(f"Detected encoding: {encoding} (confidence: {confidence:.2f})")
-            return encoding
-    else:
-        # Fallback: try common encodings
-        common_encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1', 'utf-16']
-        
-        for encoding in common_encodings:
-            try:
-                with open(file_path, 'r', encoding=encoding) as file:
-                    file.read(1000)  # Try to read first 1000 characters
-                print(f"Successfully detected encoding: {encoding}")
-                return encoding
-            except (UnicodeDecodeError, UnicodeError):
-                continue
-        
-        # If all fail, return utf-8 as default
-        print("Could not detect encoding, defaulting to utf-8")
-        return 'utf-8'
+    key = _file_key(file_path)
+    encoding = _encoding_cache.get(key)
+    
+    persistent = None
+    if encoding is None and cache_file is not None:
+        persistent = _load_encoding_cache(cache_file)
+        encoding = persistent.get(key)
+    
+    if encoding is None:
+        encoding = _scan_encoding(file_path)
+        print(f"Detected encoding: {encoding}")
+        if persistent is not None:
+            persistent[key] = encoding
+            _save_encoding_cache(cache_file, persistent)
+    
+    _encoding_cache[key] = encoding
+    return encoding
 
-def read_csv_with_encoding(file_path):
+def read_csv_with_encoding(file_path, encoding=None):
     """
     Read CSV file with automatic encoding detection.
     
@@ -111,33 +249,21 @@ def read_csv_with_encoding(file_path):
     -----------
     file_path : str
         Path to the CSV file
+    encoding : str, optional
+        Encoding to use. If None, it is detected with detect_file_encoding,
+        which only returns encodings that decode the whole file.
         
     Returns:
     --------
     pandas.DataFrame
         Loaded DataFrame
     """
-    encoding = detect_file_encoding(file_path)
+    import pandas as pd
     
-    try:
-        df = pd.read_csv(file_path, encoding=encoding)
-        return df
-    except UnicodeDecodeError:
-        # If detected encoding fails, try other common encodings
-        fallback_encodings = ['latin-1', 'cp1252', 'iso-8859-1', 'utf-16']
-        
-        for fallback_encoding in fallback_encodings:
-            if fallback_encoding != encoding:  # Skip the one we already tried
-                try:
-                    print(f"Trying fallback encoding: {fallback_encoding}")
-                    df = pd.read_csv(file_path, encoding=fallback_encoding)
-                    print(f"Successfully loaded with encoding: {fallback_encoding}")
-                    return df
-                except UnicodeDecodeError:
-                    continue
-        
-        # If all encodings fail, raise the original error
-        raise
+    if encoding is None:
+        encoding = detect_file_encoding(file_path)
+    
+    return pd.read_csv(file_path, encoding=encoding)
 
 def identify_address_columns(df):
     """Identify all address line columns in the DataFrame."""
@@ -150,63 +276,943 @@ def identify_address_columns(df):
     
     return address_columns
 
-def normalize_address_columns(df, specific_columns=None):
+# Per-process normalizer for the worker pool, built once by _init_worker
+_worker_normalizer = None
+
+def _init_worker(rules=None):
+    global _worker_normalizer
+    _worker_normalizer = AddressNormalizer(rules=rules)
+
+def _normalize_chunk(addresses):
+    return _worker_normalizer.normalize_many(addresses)
+
+def create_worker_pool(workers, rules=None):
+    """
+    Start a process pool whose workers each hold one AddressNormalizer.
+    
+    ``rules`` (a RuleSet) is sent to each worker once; only its source tables
+    are pickled and each worker compiles them a single time.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(rules,))
+
+def normalize_values_parallel(addresses, workers, chunks_per_worker=4, executor=None, rules=None):
+    """
+    Normalize a list of address strings across a pool of worker processes.
+    
+    Parameters:
+    -----------
+    addresses : list
+        Address values to normalize
+    workers : int
+        Number of worker processes
+    chunks_per_worker : int, optional
+        How many chunks to split the work into per worker, to even out load
+    executor : ProcessPoolExecutor, optional
+        Pool from create_worker_pool to reuse. If None, a pool is started
+        and shut down for this call.
+    rules : RuleSet, optional
+        Rules for the pool started by this call; a reused ``executor``
+        keeps the rules it was created with
+    
+    Returns:
+    --------
+    list
+        Normalized addresses, in the same order as the input
+    """
+    if not addresses:
+        return []
+    
+    chunk_size = -(-len(addresses) // (workers * chunks_per_worker))
+    chunks = [addresses[i:i + chunk_size] for i in range(0, len(addresses), chunk_size)]
+    
+    if executor is not None:
+        # map() yields results in submission order, so the output is deterministic
+        return list(chain.from_iterable(executor.map(_normalize_chunk, chunks)))
+    
+    with create_worker_pool(workers, rules) as executor:
+        return list(chain.from_iterable(executor.map(_normalize_chunk, chunks)))
+
+def _normalize_columns_distinct(df, columns, normalize, store=None):
+    """
+    Normalize the distinct values of all columns in one call to ``normalize``.
+    
+    Values already in ``store`` (a NormalizationStore) are reused; only the
+    rest are normalized, and those results are written back in one transaction.
+    
+    Returns ({column: Series}, number of distinct values reused from the store).
+    """
+    # Collect each distinct non-blank string once across every column
+    distinct = {}
+    for col in columns:
+        for value in df[col].unique():
+            if isinstance(value, str) and value.strip():
+                distinct[value] = None
+    
+    lookup, reused = _normalize_distinct(distinct, normalize, store)
+    normalized_columns = {}
+    for col in columns:
+        # Assign into a copy like normalize_series does: map() alone would
+        # infer a new dtype and turn None into NaN in all-string columns.
+        # Categorical columns become objects, as normalized values are not categories.
+        result = df[col].astype(object) if df[col].dtype.name == 'category' else df[col].copy()
+        normalized = df[col].map(lookup)
+        mask = normalized.notna()
+        result[mask] = normalized[mask]
+        normalized_columns[col] = result
+    return normalized_columns, reused
+
+def _normalize_distinct(distinct, normalize, store=None):
+    """
+    Return ({value: normalized}, number reused from ``store``) for distinct
+    non-blank strings, normalizing only the values not already in the store.
+    """
+    lookup = store.get_many(distinct) if store is not None else {}
+    reused = len(lookup)
+    missing = [value for value in distinct if value not in lookup]
+    if missing:
+        normalized = normalize(missing)
+        lookup.update(zip(missing, normalized))
+        if store is not None:
+            store.put_many(zip(missing, normalized))
+    return lookup, reused
+
+def _open_store(store, normalizer):
+    """Return (NormalizationStore or None, whether the caller must close it) for a path or store."""
+    if store is None:
+        return None, False
+    from address_store import NormalizationStore
+    if not isinstance(store, NormalizationStore):
+        return NormalizationStore(store, normalizer), True
+    if store.fingerprint != normalizer.rules.fingerprint:
+        raise ValueError("The result store was opened for different normalization rules")
+    return store, False
+
+def add_normalized_columns(df, normalized_columns, inplace=False, originals=None):
+    """
+    Add ``n_`` columns to a DataFrame, each right after its original column.
+    
+    Parameters:
+    -----------
+    df : pandas.DataFrame
+        The DataFrame holding the original columns
+    normalized_columns : dict
+        ``n_`` column name -> Series with the same index as ``df``
+    originals : dict, optional
+        New column name -> the original column it goes after. By default
+        the original of ``n_X`` is ``X``. Several new columns with the same
+        original are placed after it in the order given.
+    inplace : bool, optional
+        Insert the columns into ``df`` itself. Otherwise a new DataFrame is
+        assembled in one concat and ``df`` is left unchanged. With
+        copy-on-write (the default from pandas 3.0) the original columns are
+        shared with ``df`` rather than copied; older pandas copies them.
+    
+    Returns:
+    --------
+    pandas.DataFrame
+        ``df`` when ``inplace``, otherwise the new DataFrame
+    """
+    for name in normalized_columns:
+        if name in df.columns:
+            raise ValueError(f"cannot insert {name}, already exists")
+    if originals is None:
+        originals = {name: name[2:] for name in normalized_columns}
+    
+    if inplace:
+        previous = {}
+        for name, values in normalized_columns.items():
+            original = originals[name]
+            df.insert(df.columns.get_loc(previous.get(original, original)) + 1, name, values)
+            previous[original] = name
+        return df
+    
+    if not normalized_columns:
+        return df.copy(deep=False)
+    
+    # Positions in concat([df, new]): the new columns go right after their original
+    new_positions = {}
+    for i, name in enumerate(normalized_columns):
+        new_positions.setdefault(originals[name], []).append(len(df.columns) + i)
+    order = []
+    for position, col in enumerate(df.columns):
+        order.append(position)
+        if col in new_positions:
+            order.extend(new_positions.pop(col))
+    
+    import pandas as pd
+    new_columns = pd.DataFrame(normalized_columns, index=df.index)
+    return pd.concat([df, new_columns], axis=1).iloc[:, order]
+
+def normalize_address_columns(df, specific_columns=None, cache_size=None, workers=None,
+                              executor=None, verbose=True, store=None, profile=None,
+                              inplace=False, rules=None):
     """
     Normalize address columns in a DataFrame.
     
+    Each column is deduplicated before normalizing, so identical cells are
+    only computed once. All ``n_`` columns are built first and added in one
+    step (see add_normalized_columns), so on pandas 3.0 or with copy-on-write
+    enabled the original data is never copied.
+    
     Parameters:
     -----------
     df : pandas.DataFrame
         The DataFrame containing address columns to normalize
     specific_columns : list, optional
         Specific column names to normalize. If None, will auto-detect address columns.
+    cache_size : int, optional
+        Size of the LRU result cache shared across all columns, so values
+        repeated between columns are also only normalized once.
+    workers : int, optional
+        Number of worker processes. With more than one worker the distinct
+        address values of all columns are split into chunks and normalized
+        in a process pool; the output is identical to the serial path.
+    executor : ProcessPoolExecutor, optional
+        Pool from create_worker_pool to reuse across calls (e.g. per chunk)
+        instead of starting a new one.
+    verbose : bool, optional
+        Print progress for each column (default True)
+    store : str or NormalizationStore, optional
+        Persistent result store (or the path of its SQLite file). Addresses
+        normalized by earlier runs with the same rules are looked up in bulk
+        instead of being normalized again; new results are added to it.
+    profile : NormalizationProfile, optional
+        Collect per-stage timings of every address normalized into this
+        profile (see AddressNormalizer). Requires the in-process path, i.e.
+        at most one worker.
+    inplace : bool, optional
+        Add the ``n_`` columns to ``df`` itself and return it, instead of
+        returning a new DataFrame (default False)
+    rules : RuleSet, optional
+        Normalization rules, e.g. from load_rules (default: the built-in
+        rules). A reused ``executor`` must have been created with the same rules.
     
     Returns:
     --------
     pandas.DataFrame
         DataFrame with normalized address columns added (prefixed with 'n_')
     """
-    # Create a copy to avoid modifying the original DataFrame
-    df_copy = df.copy()
-    
     # Initialize the address normalizer
-    normalizer = AddressNormalizer()
+    normalizer = AddressNormalizer(cache_size=cache_size, profile=profile, rules=rules)
     
     # Determine which columns to normalize
     if specific_columns is not None:
         # Use specific columns provided by user
         columns_to_normalize = {}
         for col in specific_columns:
-            if col in df_copy.columns:
+            if col in df.columns:
                 columns_to_normalize[col] = col  # Use the column name as is
-            else:
+            elif verbose:
                 print(f"Warning: Column '{col}' not found in DataFrame")
     else:
         # Auto-detect address columns
-        columns_to_normalize = identify_address_columns(df_copy)
+        columns_to_normalize = identify_address_columns(df)
     
     if not columns_to_normalize:
-        print("No address columns found to normalize")
-        return df_copy
+        if verbose:
+            print("No address columns found to normalize")
+        return add_normalized_columns(df, {}, inplace=inplace)
+    
+    if workers is not None and workers < 1:
+        raise ValueError("workers must be a positive integer")
+    if profile is not None and workers and workers > 1:
+        raise ValueError("profiling is only supported with a single worker")
+    
+    distinct_columns = None
+    if (workers and workers > 1) or store is not None:
+        if workers and workers > 1:
+            if verbose:
+                print(f"Normalizing {len(columns_to_normalize)} columns with {workers} worker processes")
+            normalize = lambda values: normalize_values_parallel(values, workers, executor=executor,
+                                                                 rules=normalizer.rules)
+        else:
+            normalize = normalizer.normalize_many
+        
+        store, owns_store = _open_store(store, normalizer)
+        try:
+            distinct_columns, reused = _normalize_columns_distinct(
+                df, list(columns_to_normalize), normalize, store=store
+            )
+        finally:
+            if owns_store:
+                store.close()
+        if store is not None and verbose:
+            print(f"Address store: reused {reused} previously normalized addresses")
     
     # Normalize each identified address column
+    normalized_columns = {}
     for original_col, standard_name in columns_to_normalize.items():
         normalized_col_name = f'n_{original_col}'
         
-        print(f"Normalizing column: {original_col} -> {normalized_col_name}")
+        if verbose:
+            print(f"Normalizing column: {original_col} -> {normalized_col_name}")
         
-        # Apply normalization to the column
-        normalized_data = df_copy[original_col].apply(
-            lambda x: normalizer.normalize_address(x) if pd.notna(x) else x
-        )
+        if distinct_columns is not None:
+            normalized_data = distinct_columns[original_col]
+        else:
+            # Normalize the whole column at once
+            normalized_data = normalizer.normalize_series(df[original_col])
         
-        # Find the position of the original column
-        original_col_position = df_copy.columns.get_loc(original_col)
+        normalized_columns[normalized_col_name] = normalized_data
+    
+    if cache_size and verbose:
+        info = normalizer.cache_info()
+        print(f"Address cache: {info['hits']} hits, {info['misses']} misses, {info['evictions']} evictions")
+    
+    # Insert the normalized columns right after their original columns
+    return add_normalized_columns(df, normalized_columns, inplace=inplace)
+
+def parse_address_columns(df, specific_columns=None, verbose=True, inplace=False, rules=None):
+    """
+    Normalize address columns and split them into their components.
+    
+    For each address column ``X`` this adds ``n_X`` (the same values as
+    normalize_address_columns) followed by one ``n_X_<field>`` column per
+    component of ParsedAddress (house_number, predirectional, street, suffix,
+    postdirectional, unit_type, unit). Both come out of the same pass over
+    the distinct values of the column.
+    
+    Parameters:
+    -----------
+    df : pandas.DataFrame
+        The DataFrame containing address columns to parse
+    specific_columns : list, optional
+        Specific column names to parse. If None, will auto-detect address columns.
+    verbose : bool, optional
+        Print progress for each column (default True)
+    inplace : bool, optional
+        Add the new columns to ``df`` itself and return it, instead of
+        returning a new DataFrame (default False)
+    rules : RuleSet, optional
+        Normalization rules, e.g. from load_rules (default: the built-in rules)
+    
+    Returns:
+    --------
+    pandas.DataFrame
+        DataFrame with the normalized and component columns added
+    """
+    normalizer = AddressNormalizer(rules=rules)
+    
+    if specific_columns is not None:
+        columns_to_parse = [col for col in specific_columns if col in df.columns]
+        if verbose:
+            for col in specific_columns:
+                if col not in df.columns:
+                    print(f"Warning: Column '{col}' not found in DataFrame")
+    else:
+        columns_to_parse = list(identify_address_columns(df))
+    
+    if not columns_to_parse and verbose:
+        print("No address columns found to parse")
+    
+    new_columns = {}
+    originals = {}
+    for original_col in columns_to_parse:
+        if verbose:
+            print(f"Parsing column: {original_col} -> n_{original_col}_*")
         
-        # Insert the normalized column right after the original column
-        df_copy.insert(original_col_position + 1, normalized_col_name, normalized_data)
+        parsed = normalizer.parse_series(df[original_col])
+        for field in parsed.columns:
+            name = f'n_{original_col}' if field == 'normalized' else f'n_{original_col}_{field}'
+            new_columns[name] = parsed[field]
+            originals[name] = original_col
+    
+    return add_normalized_columns(df, new_columns, inplace=inplace, originals=originals)
+
+# Chunks read ahead of, and written behind, the one being normalized
+PIPELINE_DEPTH = 2
+
+def run_pipeline(items, process, consume, depth=PIPELINE_DEPTH):
+    """
+    Call ``consume(process(item))`` for every item, overlapping the three stages.
+    
+    ``items`` is iterated on a reader thread and ``consume`` runs on a writer
+    thread, while ``process`` runs on the calling thread. So chunk N+1 is read
+    while chunk N is normalized and chunk N-1 is written. At most ``depth``
+    items wait on each side, which bounds memory. Items are consumed in
+    order, and an exception in any stage is raised here.
+    
+    Parameters:
+    -----------
+    items : iterable
+        Source of work items, e.g. a chunked pandas reader
+    process : callable
+        CPU stage, e.g. normalize_address_columns on one chunk
+    consume : callable
+        Output stage, e.g. appending the chunk to the output file
+    depth : int, optional
+        Items read ahead and pending writes allowed; 0 runs the stages one
+        after another on the calling thread
+    """
+    if depth < 1:
+        for item in items:
+            consume(process(item))
+        return
+    
+    from concurrent.futures import ThreadPoolExecutor
+    
+    iterator = iter(items)
+    done = object()
+    reader = ThreadPoolExecutor(max_workers=1)
+    writer = ThreadPoolExecutor(max_workers=1)
+    writing = False
+    try:
+        # Single-thread executors keep reads and writes in submission order
+        reads = deque(reader.submit(next, iterator, done) for _ in range(depth))
+        writes = deque()
+        while True:
+            item = reads.popleft().result()
+            if item is done:
+                break
+            reads.append(reader.submit(next, iterator, done))
+            writes.append(writer.submit(consume, process(item)))
+            writing = True
+            while len(writes) > depth:
+                writes.popleft().result()
+            writing = False
+        writing = True
+        while writes:
+            writes.popleft().result()
+    finally:
+        reader.shutdown(cancel_futures=True)
+        # When reading or processing failed, the items before it are still
+        # written, like the serial path does; after a failed write the
+        # writes that have not started yet are dropped
+        writer.shutdown(cancel_futures=writing)
+
+def normalize_csv_streaming(input_file, output_file, chunksize=100000, specific_columns=None,
+                            workers=None, encoding=None, store=None, profile=None,
+                            pipeline_depth=PIPELINE_DEPTH, rules=None):
+    """
+    Normalize address columns of a CSV file chunk by chunk.
+    
+    The header is read once to detect the address columns, then the file is
+    read ``chunksize`` rows at a time; each chunk is normalized and appended
+    to ``output_file``. Reading, normalizing and writing overlap (see
+    run_pipeline), so disk or network latency is hidden behind the CPU
+    work. Peak memory is bounded by the chunk size rather than the file size.
     
-    return df_copy
+    Every column is read as text so that type inference cannot differ from
+    one chunk to the next. Original values are therefore written back exactly
+    as they appeared in the input.
+    
+    Parameters:
+    -----------
+    input_file : str
+        Path to the CSV file to normalize
+    output_file : str
+        Path of the CSV file to write
+    chunksize : int, optional
+        Number of rows per chunk (default 100000)
+    specific_columns : list, optional
+        Specific column names to normalize. If None, will auto-detect address columns.
+    workers : int, optional
+        Number of worker processes; one pool is shared by all chunks
+    encoding : str, optional
+        File encoding. If None, it is detected with detect_file_encoding.
+    store : str or NormalizationStore, optional
+        Persistent result store shared by all chunks (see normalize_address_columns)
+    profile : NormalizationProfile, optional
+        Collect per-stage timings of all chunks into this profile
+    pipeline_depth : int, optional
+        Chunks read ahead and pending writes (default PIPELINE_DEPTH); 0 disables
+        the overlap
+    rules : RuleSet, optional
+        Normalization rules (default: the built-in rules)
+    
+    Returns:
+    --------
+    dict
+        Number of ``rows`` and ``chunks`` processed and the normalized ``columns``
+    """
+    import pandas as pd
+    
+    if encoding is None:
+        encoding = detect_file_encoding(input_file)
+    
+    # Detect the address columns once from the header
+    header = pd.read_csv(input_file, encoding=encoding, nrows=0)
+    if specific_columns is not None:
+        columns = [col for col in specific_columns if col in header.columns]
+    else:
+        columns = list(identify_address_columns(header))
+    
+    stats = {'rows': 0, 'chunks': 0, 'columns': columns}
+    executor = create_worker_pool(workers, rules) if workers and workers > 1 and columns else None
+    store, owns_store = _open_store(store, AddressNormalizer(rules=rules))
+    
+    def normalize_chunk(chunk):
+        # Each chunk is freshly read, so its n_ columns can be added in place
+        return normalize_address_columns(chunk, specific_columns=columns, workers=workers,
+                                         executor=executor, verbose=False, store=store,
+                                         profile=profile, inplace=True, rules=rules)
+    
+    try:
+        with open(output_file, 'w', encoding='utf-8', newline='') as out:
+            def write_chunk(chunk):
+                chunk.to_csv(out, index=False, header=stats['chunks'] == 0)
+                stats['rows'] += len(chunk)
+                stats['chunks'] += 1
+            
+            with pd.read_csv(input_file, encoding=encoding, chunksize=chunksize, dtype=str) as reader:
+                run_pipeline(reader, normalize_chunk, write_chunk, depth=pipeline_depth)
+            
+            if stats['chunks'] == 0:
+                # Header-only input: still write the header with the n_ columns
+                normalize_address_columns(header, specific_columns=columns, verbose=False).to_csv(
+                    out, index=False
+                )
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        if owns_store:
+            store.close()
+    
+    return stats
+
+# Encodings whose bytes can be copied straight into the UTF-8 output by normalize_csv_mapped
+MAPPED_ENCODINGS = ('utf-8', 'utf-8-sig', 'ascii')
+
+# Cells pandas reads as missing by default; their n_ field is left empty, as in the other paths
+CSV_NA_VALUES = frozenset([
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+])
+
+# The next delimiter or line break of an unquoted field, and the next quote or
+# line break in the rest of a row
+_FIELD_END = re.compile(rb'[,\r\n]')
+_ROW_END = re.compile(rb'["\r\n]')
+
+def _skip_quoted(buf, pos):
+    """Return the position just past the quoted section starting at ``pos`` ('""' is an escaped quote)."""
+    while True:
+        pos = buf.find(b'"', pos + 1)
+        if pos < 0:
+            raise ValueError("EOF inside a quoted CSV field")
+        if buf[pos + 1:pos + 2] != b'"':
+            return pos + 1
+        pos += 1
+
+def _scan_csv_row(buf, pos, targets, last_target):
+    """
+    Find the target fields and the end of the CSV row starting at ``pos``.
+    
+    Fields are only split up to ``last_target``; the rest of the row is
+    skipped with one search for a quote or line break, looking into quoted
+    sections only when a quote opens a field.
+    
+    Returns (target field spans, line end, start of the next row, number of
+    fields if the row ended before ``last_target`` else None).
+    """
+    size = len(buf)
+    spans = []
+    index = 0
+    if last_target < 0:
+        line_end, short = _find_row_end(buf, pos), None
+    while last_target >= 0:
+        start = pos
+        if buf[pos:pos + 1] == b'"':
+            pos = _skip_quoted(buf, pos)
+        match = _FIELD_END.search(buf, pos)
+        end = match.start() if match else size
+        if index in targets:
+            spans.append((start, end))
+        if end == size or buf[end] != 0x2C:
+            line_end, short = end, index + 1
+            break
+        pos = end + 1
+        if index == last_target:
+            line_end, short = _find_row_end(buf, pos), None
+            break
+        index += 1
+    
+    next_pos = line_end + 1
+    if buf[line_end:line_end + 2] == b'\r\n':
+        next_pos += 1
+    return spans, line_end, min(next_pos, size), short
+
+def _find_row_end(buf, pos):
+    """Return the position of the line break ending the row, from a field start ``pos``."""
+    field_start = pos
+    while True:
+        match = _ROW_END.search(buf, pos)
+        if match is None:
+            return len(buf)
+        pos = match.start()
+        if buf[pos] != 0x22:
+            return pos
+        if pos == field_start or buf[pos - 1] == 0x2C:
+            pos = _skip_quoted(buf, pos)
+        else:
+            # A quote inside an unquoted field is just a character
+            pos += 1
+
+def _csv_field_value(raw):
+    """Decode one raw CSV field; None for the cells pandas reads as missing."""
+    if raw[:1] == b'"':
+        close = _skip_quoted(raw, 0)
+        raw = raw[1:close - 1].replace(b'""', b'"') + raw[close:]
+    value = raw.decode('utf-8')
+    return None if value in CSV_NA_VALUES else value
+
+def _csv_field_bytes(value):
+    """Encode one value as a UTF-8 CSV field, quoted only when needed (like to_csv)."""
+    if value is None:
+        return b''
+    if any(char in value for char in ',"\r\n'):
+        value = '"' + value.replace('"', '""') + '"'
+    return value.encode('utf-8')
+
+def normalize_csv_mapped(input_file, output_file, chunksize=100000, specific_columns=None,
+                         workers=None, encoding=None, store=None, profile=None, rules=None):
+    """
+    Normalize address columns of a UTF-8 CSV file without parsing whole rows.
+    
+    The input is memory-mapped and each row is only split into fields up to
+    the last address column; the rest of the row is skipped over with a
+    single search. Each output row is the input row copied as raw byte
+    ranges from the mapped buffer with the encoded ``n_`` fields spliced in,
+    so only the address fields ever become Python strings. On wide files
+    this takes a fraction of the CPU and memory of read_csv.
+    
+    Quoted fields, escaped quotes and line breaks inside quotes are handled
+    as pandas does. Unlike the other paths every original value, including
+    cells pandas would read as missing, is written back byte for byte, and
+    each row keeps its own line ending. Blank lines, including lines of only
+    spaces and tabs, are skipped and short rows are padded to the header
+    width.
+    
+    Parameters:
+    -----------
+    input_file : str
+        Path to the CSV file to normalize
+    output_file : str
+        Path of the CSV file to write
+    chunksize : int, optional
+        Number of rows whose distinct addresses are normalized together (default 100000)
+    specific_columns : list, optional
+        Specific column names to normalize. If None, will auto-detect address columns.
+    workers : int, optional
+        Number of worker processes; one pool is shared by all chunks
+    encoding : str, optional
+        File encoding, one of MAPPED_ENCODINGS. If None, it is detected with
+        detect_file_encoding.
+    store : str or NormalizationStore, optional
+        Persistent result store shared by all chunks (see normalize_address_columns)
+    profile : NormalizationProfile, optional
+        Collect per-stage timings of all chunks into this profile (single worker only)
+    rules : RuleSet, optional
+        Normalization rules (default: the built-in rules)
+    
+    Returns:
+    --------
+    dict
+        Number of ``rows`` and ``chunks`` processed and the normalized ``columns``
+    """
+    import pandas as pd
+    
+    if encoding is None:
+        encoding = detect_file_encoding(input_file)
+    if codecs.lookup(encoding).name not in MAPPED_ENCODINGS:
+        raise ValueError(f"normalize_csv_mapped needs UTF-8 input, not {encoding}")
+    if profile is not None and workers and workers > 1:
+        raise ValueError("profiling is only supported with a single worker")
+    
+    # Column names as pandas reads them (duplicates renamed), to pick the address columns
+    header = pd.read_csv(input_file, encoding=encoding, nrows=0)
+    if specific_columns is not None:
+        columns = [col for col in specific_columns if col in header.columns]
+    else:
+        columns = list(identify_address_columns(header))
+    names = list(header.columns)
+    targets = sorted(names.index(col) for col in columns)
+    columns = [names[i] for i in targets]
+    
+    stats = {'rows': 0, 'chunks': 0, 'columns': columns}
+    normalizer = AddressNormalizer(profile=profile, rules=rules)
+    executor = create_worker_pool(workers, rules) if workers and workers > 1 and columns else None
+    if executor is not None:
+        normalize = lambda values: normalize_values_parallel(values, workers, executor=executor)
+    else:
+        normalize = normalizer.normalize_many
+    store, owns_store = _open_store(store, normalizer)
+    
+    try:
+        with open(input_file, 'rb') as source, open(output_file, 'wb') as out:
+            with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                _write_mapped_rows(buf, out, targets, len(names), columns, normalize, store,
+                                   chunksize, stats)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        if owns_store:
+            store.close()
+    
+    return stats
+
+def _write_mapped_rows(buf, out, targets, width, columns, normalize, store, chunksize, stats):
+    """Copy the rows of ``buf`` to ``out`` with the n_ fields of ``targets`` spliced in."""
+    view = memoryview(buf)
+    try:
+        pos = 3 if buf[:3] == codecs.BOM_UTF8 else 0
+        target_set = set(targets)
+        last_target = targets[-1] if targets else -1
+        
+        # Header: the original names, each address column followed by its n_ column
+        row_start = pos
+        spans, line_end, pos, short = _scan_csv_row(buf, pos, target_set, last_target)
+        _write_mapped_row(out, view, row_start, spans, line_end, pos, short, width, targets,
+                          [_csv_field_bytes(f'n_{col}') for col in columns[:len(spans)]])
+        
+        size = len(buf)
+        while pos < size:
+            rows = []
+            distinct = {}
+            while pos < size and len(rows) < chunksize:
+                row_start = pos
+                spans, line_end, pos, short = _scan_csv_row(buf, pos, target_set, last_target)
+                if line_end == row_start or (buf[row_start] in b' \t'
+                                             and not buf[row_start:line_end].strip(b' \t')):
+                    continue  # Blank line, or only spaces and tabs, which pandas skips too
+                raws = [buf[start:end] for start, end in spans]
+                for raw in raws:
+                    distinct[raw] = None
+                rows.append((row_start, spans, line_end, pos, short, raws))
+            
+            # Normalize each distinct non-blank address of the chunk once
+            values = {raw: _csv_field_value(raw) for raw in distinct}
+            lookup, _ = _normalize_distinct(
+                {value: None for value in values.values() if value is not None and value.strip()},
+                normalize, store
+            )
+            encoded = {raw: _csv_field_bytes(lookup.get(value, value)) for raw, value in values.items()}
+            
+            for row_start, spans, line_end, next_pos, short, raws in rows:
+                _write_mapped_row(out, view, row_start, spans, line_end, next_pos, short, width,
+                                  targets, [encoded[raw] for raw in raws])
+            stats['rows'] += len(rows)
+            stats['chunks'] += 1
+    finally:
+        view.release()
+
+def _write_mapped_row(out, view, row_start, spans, line_end, next_pos, short, width, targets, fields):
+    """Write one row as byte ranges of ``view``, with ``fields`` added after the target spans."""
+    copied = row_start
+    for (start, end), field in zip(spans, fields):
+        out.write(view[copied:end])
+        out.write(b',')
+        out.write(field)
+        copied = end
+    out.write(view[copied:line_end])
+    if short is not None:
+        # Pad a short row to the header width, with an empty n_ field after each missing target
+        for index in range(short, width):
+            out.write(b',,' if index in targets else b',')
+    # The row's own line ending; the last row of a file may not have one
+    out.write(view[line_end:next_pos] if next_pos > line_end else b'\n')
+
+# File formats by extension; anything else is treated as CSV
+FILE_FORMATS = {
+    '.csv': 'csv',
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.arrow': 'arrow',
+    '.feather': 'arrow',
+    '.ipc': 'arrow',
+}
+FORMAT_EXTENSIONS = {'csv': '.csv', 'parquet': '.parquet', 'arrow': '.arrow'}
+
+def file_format(file_path):
+    """Return 'csv', 'parquet' or 'arrow' based on the file extension."""
+    return FILE_FORMATS.get(os.path.splitext(file_path)[1].lower(), 'csv')
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("pyarrow is required for Parquet/Arrow files. Install it with: pip install pyarrow")
+    return pyarrow
+
+def _open_columnar(file_path):
+    """Return (schema, iterator over record batches) for a Parquet or Arrow IPC file."""
+    pa = _import_pyarrow()
+    if file_format(file_path) == 'parquet':
+        parquet_file = pa.parquet.ParquetFile(file_path)
+        return parquet_file.schema_arrow, lambda batch_size: parquet_file.iter_batches(batch_size=batch_size)
+    
+    try:
+        reader = pa.ipc.open_file(file_path)
+        batches = lambda batch_size: (reader.get_batch(i) for i in range(reader.num_record_batches))
+    except pa.ArrowInvalid:
+        # Not the random-access file format; read it as an IPC stream
+        reader = pa.ipc.open_stream(file_path)
+        batches = lambda batch_size: iter(reader)
+    return reader.schema, batches
+
+def _columnar_writer(file_path, schema):
+    pa = _import_pyarrow()
+    if file_format(file_path) == 'parquet':
+        return pa.parquet.ParquetWriter(file_path, schema)
+    return pa.ipc.new_file(file_path, schema)
+
+def read_table(file_path, columns=None, encoding=None):
+    """
+    Read a CSV, Parquet or Arrow IPC file into a DataFrame, by extension.
+    
+    For Parquet and Arrow only ``columns`` are read when given.
+    """
+    fmt = file_format(file_path)
+    if fmt == 'csv':
+        return read_csv_with_encoding(file_path, encoding=encoding)
+    
+    pa = _import_pyarrow()
+    if fmt == 'parquet':
+        return pa.parquet.read_table(file_path, columns=columns).to_pandas()
+    schema, batches = _open_columnar(file_path)
+    table = pa.Table.from_batches(list(batches(None)), schema=schema)
+    return (table.select(columns) if columns is not None else table).to_pandas()
+
+def read_table_chunks(file_path, chunksize=100000, encoding=None):
+    """
+    Read a CSV, Parquet or Arrow IPC file as DataFrames of up to ``chunksize`` rows, by extension.
+    
+    Only one chunk is held in memory at a time. CSV columns are all read as
+    text, as in normalize_csv_streaming, and the encoding is detected when not
+    given. Arrow IPC files are yielded in the record batches they were written with.
+    """
+    if file_format(file_path) == 'csv':
+        import pandas as pd
+        
+        if encoding is None:
+            encoding = detect_file_encoding(file_path)
+        with pd.read_csv(file_path, encoding=encoding, chunksize=chunksize, dtype=str) as reader:
+            yield from reader
+        return
+    
+    _, batches = _open_columnar(file_path)
+    for batch in batches(chunksize):
+        yield batch.to_pandas()
+
+def write_table(df, file_path):
+    """Write a DataFrame as CSV, Parquet or Arrow IPC, by extension."""
+    fmt = file_format(file_path)
+    if fmt == 'csv':
+        df.to_csv(file_path, index=False)
+    elif fmt == 'parquet':
+        _import_pyarrow()
+        df.to_parquet(file_path, index=False)
+    else:
+        _import_pyarrow()
+        df.to_feather(file_path)
+
+def normalize_columnar_file(input_file, output_file, specific_columns=None, batch_size=100000,
+                            store=None, profile=None, pipeline_depth=PIPELINE_DEPTH, rules=None,
+                            workers=None):
+    """
+    Normalize address columns of a Parquet or Arrow IPC file into another one.
+    
+    The address columns are detected from the schema alone. The file is read
+    one record batch at a time, overlapped with normalizing (see
+    run_pipeline); only the address columns are converted to Python values
+    and normalized, every other column is passed through as
+    Arrow data and written without any conversion to text. Each ``n_``
+    column is placed right after its original column.
+    
+    Parameters:
+    -----------
+    input_file : str
+        Path of the .parquet/.arrow/.feather file to normalize
+    output_file : str
+        Path of the .parquet/.arrow/.feather file to write
+    specific_columns : list, optional
+        Specific column names to normalize. If None, will auto-detect address columns.
+    batch_size : int, optional
+        Rows per record batch when reading Parquet (default 100000)
+    store : str or NormalizationStore, optional
+        Persistent result store shared by all batches (see normalize_address_columns)
+    profile : NormalizationProfile, optional
+        Collect per-stage timings of all batches into this profile
+    pipeline_depth : int, optional
+        Batches read ahead and pending writes (default PIPELINE_DEPTH); 0 disables
+        the overlap
+    rules : RuleSet, optional
+        Normalization rules (default: the built-in rules)
+    workers : int, optional
+        Number of worker processes; one pool is shared by all batches
+    
+    Returns:
+    --------
+    dict
+        Number of ``rows`` and ``chunks`` processed and the normalized ``columns``
+    """
+    if profile is not None and workers and workers > 1:
+        raise ValueError("profiling is only supported with a single worker")
+    pa = _import_pyarrow()
+    schema, batches = _open_columnar(input_file)
+    
+    if specific_columns is not None:
+        columns = [col for col in specific_columns if col in schema.names]
+    else:
+        columns = [col for col, standard_name in create_enhanced_reverse_mapping(schema.names).items()
+                   if 'Address line' in standard_name]
+    
+    # Output schema: each n_ field right after its original field
+    fields = []
+    for field in schema:
+        fields.append(field)
+        if field.name in columns:
+            # Non-string values pass through normalization unchanged, so they keep their type
+            n_type = field.type if not (pa.types.is_string(field.type) or pa.types.is_large_string(field.type)) \
+                else pa.string()
+            fields.append(pa.field(f'n_{field.name}', n_type))
+    out_schema = pa.schema(fields, metadata=schema.metadata)
+    
+    normalizer = AddressNormalizer(profile=profile, rules=rules)
+    stats = {'rows': 0, 'chunks': 0, 'columns': columns}
+    executor = create_worker_pool(workers, rules) if workers and workers > 1 and columns else None
+    if executor is not None:
+        normalize = lambda values: normalize_values_parallel(values, workers, executor=executor)
+    else:
+        normalize = normalizer.normalize_many
+    store, owns_store = _open_store(store, normalizer)
+    def normalize_batch(batch):
+        stored = {}
+        if (store is not None or executor is not None) and columns:
+            # The distinct addresses of all columns go to the store and the pool together
+            stored, _ = _normalize_columns_distinct(
+                batch.select(columns).to_pandas(), columns, normalize, store=store
+            )
+        
+        arrays = []
+        for name, array in zip(batch.schema.names, batch.columns):
+            arrays.append(array)
+            if name in columns:
+                normalized = stored[name] if name in stored else normalizer.normalize_series(array.to_pandas())
+                arrays.append(pa.array(normalized, type=out_schema.field(f'n_{name}').type,
+                                       from_pandas=True))
+        return pa.RecordBatch.from_arrays(arrays, schema=out_schema)
+    
+    try:
+        with _columnar_writer(output_file, out_schema) as writer:
+            def write_batch(batch):
+                writer.write_batch(batch)
+                stats['rows'] += batch.num_rows
+                stats['chunks'] += 1
+            
+            # Decoding the next batch and encoding the previous one overlap with normalizing
+            run_pipeline(batches(batch_size), normalize_batch, write_batch, depth=pipeline_depth)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        if owns_store:
+            store.close()
+    
+    return stats
 
 def normalize_specific_addresses(df, column_names):
     """
@@ -229,73 +1235,416 @@ def normalize_specific_addresses(df, column_names):
     
     return normalize_address_columns(df, specific_columns=column_names)
 
-def main():
+def expand_input_paths(paths):
+    """
+    Expand input arguments into a sorted list of input files.
+    
+    Each argument may be a file, a glob pattern, or a directory (all CSV,
+    Parquet and Arrow files in it, skipping ``*_proc`` outputs of earlier runs).
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(
+                f for f in sorted(glob.glob(os.path.join(path, '*')))
+                if os.path.splitext(f)[1].lower() in FILE_FORMATS
+                and not os.path.splitext(f)[0].endswith('_proc')
+            )
+        elif glob.has_magic(path):
+            files.extend(sorted(glob.glob(path)))
+        else:
+            files.append(path)
+    
+    # Drop duplicates while keeping order
+    return list(dict.fromkeys(files))
+
+def output_path_for(input_file, output_dir=None, output_format=None):
     """
-    Interactive address normalization - select CSV file from current directory.
+    Return the ``_proc`` output path for an input file.
+    
+    The extension is kept unless ``output_format`` ('csv', 'parquet' or
+    'arrow') asks for a different format.
+    """
+    base, ext = os.path.splitext(input_file)
+    if ext.lower() in FILE_FORMATS:
+        if output_format is not None and FILE_FORMATS[ext.lower()] != output_format:
+            ext = FORMAT_EXTENSIONS[output_format]
+        output_file = base + '_proc' + ext
+    elif output_format is not None:
+        output_file = input_file + '_proc' + FORMAT_EXTENSIONS[output_format]
+    else:
+        output_file = input_file + '_proc'
+    
+    if output_dir is not None:
+        output_file = os.path.join(output_dir, os.path.basename(output_file))
+    return output_file
+
+def process_file(input_file, output_dir=None, columns=None, chunksize=None, encoding=None,
+                 workers=None, verbose=True, encoding_cache=None, output_format=None, store=None,
+                 profile=None, pipeline_depth=PIPELINE_DEPTH, rules=None, memory_map=False):
     """
+    Normalize the address columns of one file and write the ``_proc`` output.
+    
+    CSV, Parquet and Arrow IPC files are supported, picked by extension.
+    Parquet/Arrow to Parquet/Arrow goes through normalize_columnar_file,
+    which never turns untouched columns into text.
+    
+    Parameters:
+    -----------
+    input_file : str
+        Path to the CSV, Parquet or Arrow file
+    output_dir : str, optional
+        Directory for the output file. Defaults to the input file's directory.
+    columns : list, optional
+        Specific column names to normalize. If None, will auto-detect address columns.
+    chunksize : int, optional
+        Stream the file this many rows at a time instead of loading it whole
+        (CSV), or the record batch size (Parquet)
+    encoding : str, optional
+        CSV file encoding. If None, it is detected.
+    workers : int, optional
+        Number of worker processes used to normalize addresses
+    verbose : bool, optional
+        Print progress while processing (default True)
+    encoding_cache : str, optional
+        JSON file persisting detected encodings between runs
+    output_format : str, optional
+        'csv', 'parquet' or 'arrow'. Defaults to the input file's format.
+    store : str or NormalizationStore, optional
+        Persistent result store reused across runs (see normalize_address_columns)
+    profile : NormalizationProfile, optional
+        Collect per-stage normalization timings into this profile
+    pipeline_depth : int, optional
+        Chunks read ahead and pending writes when streaming (see run_pipeline);
+        0 reads, normalizes and writes strictly one after another
+    rules : RuleSet, optional
+        Normalization rules, e.g. from load_rules (default: the built-in rules)
+    memory_map : bool, optional
+        CSV to CSV with UTF-8 input: use normalize_csv_mapped, which only
+        parses the address fields and copies everything else byte for byte.
+        Other encodings fall back to the usual paths.
+    
+    Returns:
+    --------
+    dict
+        Summary with ``file``, ``output``, ``rows``, ``columns``, ``elapsed``
+        (seconds) and ``rows_per_sec``
+    """
+    start = time.perf_counter()
+    input_format = file_format(input_file)
+    output_file = output_path_for(input_file, output_dir, output_format)
+    output_format = file_format(output_file)
+    if input_format == 'csv' and encoding is None:
+        encoding = detect_file_encoding(input_file, cache_file=encoding_cache)
+    
+    if input_format != 'csv' and output_format != 'csv':
+        stats = normalize_columnar_file(input_file, output_file, specific_columns=columns,
+                                        batch_size=chunksize or 100000, store=store, profile=profile,
+                                        pipeline_depth=pipeline_depth, rules=rules, workers=workers)
+        rows, normalized_columns = stats['rows'], stats['columns']
+    elif (input_format == 'csv' and output_format == 'csv' and memory_map
+          and codecs.lookup(encoding).name in MAPPED_ENCODINGS):
+        stats = normalize_csv_mapped(input_file, output_file, chunksize=chunksize or 100000,
+                                     specific_columns=columns, workers=workers, encoding=encoding,
+                                     store=store, profile=profile, rules=rules)
+        rows, normalized_columns = stats['rows'], stats['columns']
+    elif input_format == 'csv' and output_format == 'csv' and chunksize:
+        stats = normalize_csv_streaming(input_file, output_file, chunksize=chunksize,
+                                        specific_columns=columns, workers=workers, encoding=encoding,
+                                        store=store, profile=profile, pipeline_depth=pipeline_depth,
+                                        rules=rules)
+        rows, normalized_columns = stats['rows'], stats['columns']
+    else:
+        df = read_table(input_file, encoding=encoding)
+        if verbose:
+            print(f"Loaded DataFrame with {len(df)} rows and {len(df.columns)} columns")
+        original_columns = list(df.columns)
+        df = normalize_address_columns(df, specific_columns=columns, workers=workers, verbose=verbose,
+                                       store=store, profile=profile, inplace=True, rules=rules)
+        write_table(df, output_file)
+        rows = len(df)
+        normalized_columns = [col for col in original_columns if f'n_{col}' in df.columns]
+    
+    elapsed = time.perf_counter() - start
+    return {
+        'file': input_file,
+        'output': output_file,
+        'rows': rows,
+        'columns': normalized_columns,
+        'elapsed': elapsed,
+        'rows_per_sec': rows / elapsed if elapsed > 0 else 0.0,
+    }
+
+def _process_file_quietly(input_file, options):
     try:
-        # Find all CSV files in current directory
-        csv_files = glob.glob("*.csv")
-        
-        if not csv_files:
-            print("No CSV files found in the current directory.")
-            return
-        
-        # Display available CSV files
-        print("Available CSV files to normalize:")
-        print("-" * 50)
-        for i, filename in enumerate(csv_files, 1):
-            print(f"{i}. {filename}")
+        return process_file(input_file, verbose=False, **options)
+    except Exception as e:
+        return {'file': input_file, 'error': str(e)}
+
+def process_files(input_files, workers=1, **options):
+    """
+    Normalize many CSV files, one file per worker process.
+    
+    Parameters:
+    -----------
+    input_files : list
+        Paths of the CSV files to process
+    workers : int, optional
+        Number of files processed concurrently (default 1)
+    **options
+        Passed to process_file (output_dir, columns, chunksize, encoding, encoding_cache,
+        output_format, store, profile, pipeline_depth, rules, memory_map)
+    
+    Returns:
+    --------
+    list
+        One process_file summary per input file, in input order. Files that
+        failed have an ``error`` entry instead of the counts.
+    """
+    if workers <= 1 or len(input_files) <= 1:
+        return [_process_file_quietly(f, options) for f in input_files]
+    
+    from concurrent.futures import ProcessPoolExecutor
+    
+    with ProcessPoolExecutor(max_workers=min(workers, len(input_files))) as executor:
+        return list(executor.map(_process_file_quietly, input_files, [options] * len(input_files)))
+
+def print_summary(summaries):
+    """Print one line per processed file with rows, columns and throughput."""
+    print(f"\n{'File':40} {'Rows':>10} {'Cols':>5} {'Seconds':>9} {'Rows/sec':>11}")
+    print("-" * 79)
+    for summary in summaries:
+        name = os.path.basename(summary['file'])
+        if 'error' in summary:
+            print(f"{name:40} ERROR: {summary['error']}")
+        else:
+            print(f"{name:40} {summary['rows']:>10} {len(summary['columns']):>5} "
+                  f"{summary['elapsed']:>9.2f} {summary['rows_per_sec']:>11.0f}")
+
+def print_profile(stats):
+    """Print NormalizationProfile.stats(): time, calls and changes per stage, then the slowest inputs."""
+    total = stats['seconds']
+    print(f"\nProfiled {stats['addresses']} addresses in {total:.2f} s")
+    print(f"{'Stage':15} {'Calls':>10} {'Seconds':>9} {'Share':>6} {'us/call':>8} {'Changed':>10}")
+    print("-" * 63)
+    for stage, stage_stats in stats['stages'].items():
+        calls, seconds = stage_stats['calls'], stage_stats['seconds']
+        share = seconds / total * 100 if total > 0 else 0.0
+        per_call = seconds / calls * 1e6 if calls else 0.0
+        print(f"{stage:15} {calls:>10} {seconds:>9.3f} {share:>5.1f}% {per_call:>8.2f} "
+              f"{stage_stats['changed']:>10}")
+    
+    if stats['slowest']:
+        print("\nSlowest inputs:")
+        for seconds, address in stats['slowest']:
+            print(f"{seconds * 1e6:>10.1f} us  {address!r}")
+
+def select_file_interactively():
+    """List the CSV files in the current directory and ask which one to normalize."""
+    # Find all CSV files in current directory
+    csv_files = glob.glob("*.csv")
+    
+    if not csv_files:
+        print("No CSV files found in the current directory.")
+        return None
+    
+    # Display available CSV files
+    print("Available CSV files to normalize:")
+    print("-" * 50)
+    for i, filename in enumerate(csv_files, 1):
+        print(f"{i}. {filename}")
+    
+    # Get user selection
+    while True:
+        try:
+            choice = input(f"\nSelect a file to normalize (1-{len(csv_files)}): ").strip()
+            file_index = int(choice) - 1
+            
+            if 0 <= file_index < len(csv_files):
+                return csv_files[file_index]
+            else:
+                print(f"Please enter a number between 1 and {len(csv_files)}")
+        except ValueError:
+            print("Please enter a valid number")
+        except KeyboardInterrupt:
+            print("\nOperation cancelled.")
+            return None
+
+def build_arg_parser():
+    import argparse
+    
+    parser = argparse.ArgumentParser(
+        description="Normalize address columns in CSV, Parquet or Arrow files. With no inputs, "
+                    "asks which CSV file in the current directory to process."
+    )
+    parser.add_argument('inputs', nargs='*',
+                        help="CSV/Parquet/Arrow files, glob patterns or directories to process")
+    parser.add_argument('-o', '--output-dir', default=None,
+                        help="Directory for the _proc.csv outputs (default: next to each input)")
+    parser.add_argument('-c', '--columns', nargs='+', default=None,
+                        help="Column names to normalize (default: auto-detect address columns)")
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help="Stream each file this many rows at a time instead of loading it whole")
+    parser.add_argument('--encoding', default=None,
+                        help="Input file encoding (default: detect)")
+    parser.add_argument('--encoding-cache', default=None,
+                        help="JSON file remembering detected encodings per file between runs")
+    parser.add_argument('--output-format', choices=sorted(FORMAT_EXTENSIONS), default=None,
+                        help="Output file format (default: same as each input)")
+    parser.add_argument('--rules', default=None,
+                        help="JSON rule file adding to (or replacing) the built-in suffix, unit "
+                             "designator and directional tables")
+    parser.add_argument('--store', default=None,
+                        help="SQLite file remembering normalized addresses between runs; "
+                             "cleared automatically when the normalization rules change")
+    parser.add_argument('--pipeline-depth', type=int, default=PIPELINE_DEPTH,
+                        help="Chunks read ahead of and written behind the one being normalized "
+                             f"when streaming (default: {PIPELINE_DEPTH}; 0 disables the overlap)")
+    parser.add_argument('--memory-map', action='store_true',
+                        help="Memory-map UTF-8 CSV input and parse only the address fields, copying "
+                             "every other byte straight to the output (much faster on wide files)")
+    parser.add_argument('--dedupe', default=None, metavar='REPORT',
+                        help="Instead of writing _proc files, find duplicate addresses across all inputs "
+                             "with bounded memory and write the duplicate groups to this CSV file")
+    parser.add_argument('--dedupe-key', default='address',
+                        help="With --dedupe: address (default), address_zip, address_city, or a blocking "
+                             "key such as house_number_zip to use with --similarity")
+    parser.add_argument('--similarity', type=float, default=None,
+                        help="With --dedupe and a blocking key: minimum trigram similarity of duplicate "
+                             "addresses within a block (default: only equal addresses)")
+    parser.add_argument('--zip-column', default=None,
+                        help="With --dedupe: ZIP column for keys using the ZIP code, in files that have it "
+                             "(default: detected for numbered export columns)")
+    parser.add_argument('--city-column', default=None,
+                        help="With --dedupe: City column for keys using the city, in files that have it "
+                             "(default: detected for numbered export columns)")
+    parser.add_argument('--partitions', type=int, default=None,
+                        help="With --dedupe: number of on-disk partitions resolved one at a time (default: 64)")
+    parser.add_argument('--spill-dir', default=None,
+                        help="With --dedupe: directory for the temporary partition files (default: system temp)")
+    parser.add_argument('--profile', nargs='?', type=int, const=10, default=None, metavar='TOP_K',
+                        help="Time each normalization stage and print the stats and the TOP_K "
+                             "slowest addresses (default 10); requires --workers 1")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Worker processes: files processed concurrently when several inputs "
+                             "are given, otherwise processes used to normalize the one file (default: 1)")
+    return parser
+
+def run_dedupe(args):
+    """Run dedupe_files for the --dedupe command line and print its summary."""
+    from address_dedupe import dedupe_files
+    
+    input_files = expand_input_paths(args.inputs)
+    if not input_files:
+        print("No CSV files matched the given inputs.")
+        return 1
+    
+    options = {'partitions': args.partitions} if args.partitions is not None else {}
+    try:
+        summary = dedupe_files(input_files, args.dedupe, columns=args.columns, key=args.dedupe_key,
+                               threshold=args.similarity, chunksize=args.chunksize or 100000,
+                               workers=args.workers, spill_dir=args.spill_dir, encoding=args.encoding,
+                               zip_column=args.zip_column, city_column=args.city_column,
+                               rules=load_rules(args.rules) if args.rules else None, **options)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    
+    print(f"\n{summary['rows']} rows in {summary['files']} files, {summary['records']} addresses in "
+          f"{summary['partitions']} partitions (largest {summary['largest_partition']})")
+    print(f"Found {summary['groups']} duplicate groups with {summary['duplicates']} addresses "
+          f"in {summary['elapsed']:.1f} s")
+    print(f"Saved duplicate groups to: {summary['report']}")
+    return 0
+
+def main(argv=None):
+    """
+    Normalize address columns of the given CSV files, or of one file picked
+    interactively from the current directory when no inputs are given.
+    
+    Returns the process exit status.
+    """
+    parser = build_arg_parser()
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be a positive integer")
+    if args.chunksize is not None and args.chunksize < 1:
+        parser.error("--chunksize must be a positive integer")
+    if args.pipeline_depth < 0:
+        parser.error("--pipeline-depth must not be negative")
+    if args.profile is not None and args.workers > 1:
+        parser.error("--profile requires --workers 1")
+    if args.dedupe is not None:
+        if not args.inputs:
+            parser.error("--dedupe needs input files")
+        return run_dedupe(args)
+    
+    profile = NormalizationProfile(top_k=args.profile) if args.profile is not None else None
+    
+    options = {
+        'output_dir': args.output_dir,
+        'columns': args.columns,
+        'chunksize': args.chunksize,
+        'encoding': args.encoding,
+        'encoding_cache': args.encoding_cache,
+        'output_format': args.output_format,
+        'store': args.store,
+        'profile': profile,
+        'pipeline_depth': args.pipeline_depth,
+        'rules': load_rules(args.rules) if args.rules else None,
+        'memory_map': args.memory_map,
+    }
+    if args.output_dir is not None:
+        os.makedirs(args.output_dir, exist_ok=True)
+    
+    if args.inputs:
+        input_files = expand_input_paths(args.inputs)
+        if not input_files:
+            print("No CSV files matched the given inputs.")
+            return 1
         
-        # Get user selection
-        while True:
-            try:
-                choice = input(f"\nSelect a file to normalize (1-{len(csv_files)}): ").strip()
-                file_index = int(choice) - 1
-                
-                if 0 <= file_index < len(csv_files):
-                    input_file = csv_files[file_index]
-                    break
-                else:
-                    print(f"Please enter a number between 1 and {len(csv_files)}")
-            except ValueError:
-                print("Please enter a valid number")
-            except KeyboardInterrupt:
-                print("\nOperation cancelled.")
-                return
+        if len(input_files) == 1:
+            summaries = [_process_file_quietly(input_files[0], dict(options, workers=args.workers))]
+        else:
+            summaries = process_files(input_files, workers=args.workers, **options)
+        print_summary(summaries)
+        if profile is not None:
+            print_profile(profile.stats())
+        return 1 if any('error' in summary for summary in summaries) else 0
+    
+    # Every interactive run reads a CSV with pandas; imported here for the except clause below
+    import pandas as pd
+    
+    try:
+        input_file = select_file_interactively()
+        if input_file is None:
+            return 1
         
         print(f"\nSelected file: {input_file}")
-        print("Loading data...")
-        
-        # Load the selected DataFrame with encoding detection
-        df = read_csv_with_encoding(input_file)
-        print(f"Loaded DataFrame with {len(df)} rows and {len(df.columns)} columns")
         
-        # Check for address columns first
-        address_cols = identify_address_columns(df)
+        # Check for address columns first, so a file without any is not copied
+        encoding = options['encoding'] or detect_file_encoding(input_file, cache_file=options['encoding_cache'])
+        header = pd.read_csv(input_file, encoding=encoding, nrows=0)
+        if options['columns'] is not None:
+            address_cols = [col for col in options['columns'] if col in header.columns]
+        else:
+            address_cols = list(identify_address_columns(header))
         if address_cols:
-            print(f"Found address columns: {list(address_cols.keys())}")
+            print(f"Found address columns: {address_cols}")
         else:
             print("No address columns detected in this file.")
-            return
-        
-        # Auto-detect and normalize all address columns
-        print("\nNormalizing address columns...")
-        normalized_df = normalize_address_columns(df)
-        
-        # Generate output filename by adding '_proc' to the original filename
-        if input_file.endswith('.csv'):
-            output_file = input_file[:-4] + '_proc.csv'
-        else:
-            output_file = input_file + '_proc'
+            return 1
         
-        # Save the result
-        normalized_df.to_csv(output_file, index=False)
-        print(f"\nSuccessfully saved normalized data to: {output_file}")
+        print("Normalizing address columns...")
+        summary = process_file(input_file, workers=args.workers, **dict(options, encoding=encoding))
         
-        # Show summary
-        new_cols = [col for col in normalized_df.columns if col.startswith('n_')]
-        print(f"Added {len(new_cols)} normalized columns: {new_cols}")
+        print(f"\nSuccessfully saved normalized data to: {summary['output']}")
+        print(f"Added {len(summary['columns'])} normalized columns: "
+              f"{['n_' + col for col in summary['columns']]}")
+        print_summary([summary])
+        if profile is not None:
+            print_profile(profile.stats())
+        return 0
         
     except FileNotFoundError as e:
         print(f"File not found: {e}")
@@ -304,6 +1653,7 @@ def main():
     except Exception as e:
         print(f"Error: {e}")
         print("Please check the file format and try again.")
+    return 1
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    raise SystemExit(main())
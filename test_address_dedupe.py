@@ -0,0 +1,99 @@
+import pandas as pd
+import pytest
+
+from address_dedupe import dedupe_files
+from normalize_addresses import main
+
+
+def write_exports(tmp_path):
+    first = tmp_path / 'first.csv'
+    pd.DataFrame({
+        'Address1': ["123 Canyon Lake Circle", "456 Oak St", None, "123 Canyon Lk Cir", "9 Elm St"],
+        'Address2': ["Apt 4", "Apt 4", None, None, None],
+        'ZIP': ['78701', '80202', '78701', '78701-1234', '80202'],
+    }).to_csv(first, index=False)
+
+    second = tmp_path / 'second.parquet'
+    pd.DataFrame({
+        'CnAdrAll_1_01_Addrline1': ["456 Oak Street", "9 Elm", "123 canyon lake cir"],
+        'CnAdrAll_1_01_ZIP': ['80202', '80202', '78702'],
+        'CnAdrAll_1_02_Addrline1': [None, "123 Canyon Lake Cir", "456 Oak St"],
+        'CnAdrAll_1_02_ZIP': [None, '78701', '80202'],
+    }).to_parquet(second)
+    return [str(first), str(second)]
+
+
+def read_groups(report):
+    df = pd.read_csv(report, dtype=str, keep_default_na=False)
+    return [
+        [(file.rsplit('/', 1)[-1], int(row), column) for file, row, column in zip(g['file'], g['row'], g['column'])]
+        for _, g in df.groupby(df['group'].astype(int), sort=True)
+    ]
+
+
+def test_dedupe_files(tmp_path):
+    files = write_exports(tmp_path)
+    report = tmp_path / 'duplicates.csv'
+
+    summary = dedupe_files(files, report, chunksize=2, partitions=3)
+    assert summary['rows'] == 8
+    assert summary['records'] == 9
+    assert (summary['groups'], summary['duplicates']) == (2, 7)
+    # Address2 unit lines are not compared
+    expected = [
+        [('first.csv', 0, 'Address1'), ('first.csv', 3, 'Address1'),
+         ('second.parquet', 1, 'CnAdrAll_1_02_Addrline1'), ('second.parquet', 2, 'CnAdrAll_1_01_Addrline1')],
+        [('first.csv', 1, 'Address1'), ('second.parquet', 0, 'CnAdrAll_1_01_Addrline1'),
+         ('second.parquet', 2, 'CnAdrAll_1_02_Addrline1')],
+    ]
+    assert sorted(read_groups(report)) == expected
+
+    df = pd.read_csv(report, dtype=str)
+    assert list(df.columns) == ['group', 'file', 'row', 'column', 'original', 'address', 'zip', 'city']
+    assert df['original'].tolist()[:2] == ["123 Canyon Lake Circle", "123 Canyon Lk Cir"]
+    assert set(df['address']) == {"123 Canyon Lake Cir", "456 Oak St"}
+
+    # Partition count and workers don't change the groups
+    dedupe_files(files, report, partitions=1, workers=2)
+    assert sorted(read_groups(report)) == expected
+
+
+def test_dedupe_files_keys(tmp_path):
+    files = write_exports(tmp_path)
+    report = tmp_path / 'duplicates.csv'
+
+    # The explicit ZIP column applies to the CSV; the numbered columns find their own
+    dedupe_files(files, report, key='address_zip', zip_column='ZIP')
+    assert sorted(read_groups(report)) == [
+        [('first.csv', 0, 'Address1'), ('first.csv', 3, 'Address1'), ('second.parquet', 1, 'CnAdrAll_1_02_Addrline1')],
+        [('first.csv', 1, 'Address1'), ('second.parquet', 0, 'CnAdrAll_1_01_Addrline1'),
+         ('second.parquet', 2, 'CnAdrAll_1_02_Addrline1')],
+    ]
+
+    # Similar addresses within a house number + ZIP block
+    dedupe_files(files, report, key='house_number_zip', threshold=0.5, zip_column='ZIP')
+    assert [('first.csv', 4, 'Address1'), ('second.parquet', 1, 'CnAdrAll_1_01_Addrline1')] in read_groups(report)
+
+    with pytest.raises(ValueError):
+        dedupe_files(files, report, key='street')
+    with pytest.raises(ValueError):
+        dedupe_files(files, report, key='address', threshold=0.8)
+    with pytest.raises(ValueError, match='zip'):
+        dedupe_files(files, report, key='address_zip')
+
+
+def test_main_dedupe(tmp_path, capsys):
+    files = write_exports(tmp_path)
+    report = tmp_path / 'duplicates.csv'
+
+    assert main(files + ['--dedupe', str(report), '--partitions', '4']) == 0
+    assert len(read_groups(report)) == 2
+    assert "Found 2 duplicate groups with 7 addresses" in capsys.readouterr().out
+
+    assert main(files + ['--dedupe', str(report), '--dedupe-key', 'street']) == 1
+
+    # A plain ZIP column is named on the command line
+    assert main(files + ['--dedupe', str(report), '--dedupe-key', 'house_number_zip']) == 1
+    assert main(files + ['--dedupe', str(report), '--dedupe-key', 'house_number_zip', '--similarity', '0.5',
+                         '--zip-column', 'ZIP']) == 0
+    assert [('first.csv', 4, 'Address1'), ('second.parquet', 1, 'CnAdrAll_1_01_Addrline1')] in read_groups(report)
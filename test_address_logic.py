@@ -1,4 +1,4 @@
-from address_normalizer import AddressNormalizer
+from address_normalizer import PROFILE_STAGES, AddressNormalizer, NormalizationProfile, ParsedAddress
 
 def test_comprehensive_logic():
     normalizer = AddressNormalizer()
@@ -89,6 +89,123 @@ def test_comprehensive_logic():
             ignore_words = [words[j] for j in ignore_indices]
             print(f"    Ignore words: {ignore_words} at indices {ignore_indices}")
 
+def test_expected_outputs():
+    """Pin exact outputs so faster code paths can be checked against them."""
+    normalizer = AddressNormalizer()
+
+    expected = {
+        "7921 Canyon Lk Cir": "7921 Canyon Lake Cir",
+        "123 Main St Northeast": "123 Main St NE",
+        "456 Oak Ave #5": "456 Oak Ave Unit 5",
+        "789 Pine Dr, Unit #3": "789 Pine Dr Unit 3",
+        "321 Elm St #2B": "321 Elm St Unit 2B",
+        "456 Oak Street #3B Southwest": "456 Oak St Unit 3B SW",
+        "321 Maple Hill Circle Suite 100 NE": "321 Maple Hill Cir Suite 100 NE",
+        "50 Lake Dr #1/2": "50 Lake Dr Unit 1/2",
+        "123 Center25 Rd": "123 Center 25 Rd",
+        "25/1/2 Main St": "25 1/2 Main St",
+        "123 Main St /n Apt 4": "123 Main Street Apt 4",
+        "See Mailing Address": "See Mailing Address",
+        "unlisted 12 Oak Ln": "12 Oak Ln",
+        "12 Hill-Top Rd": "12 Hill Top Rd",
+        "1st Ave 3RD Floor": "1st Ave 3rd Floor",
+    }
+
+    for address, normalized in expected.items():
+        assert normalizer.normalize_address(address) == normalized, address
+
+    # Non-strings and blank strings are passed through untouched
+    assert normalizer.normalize_address(None) is None
+    assert normalizer.normalize_address("   ") == "   "
+
+def test_fraction_spans():
+    """Fractions are kept where they were matched, however many there are and whatever surrounds them."""
+    normalizer = AddressNormalizer()
+
+    fractions = " ".join(f"{i}/{i + 1}" for i in range(1, 13))
+    assert normalizer.normalize_address(f"{fractions} Main St") == f"{fractions} Main St"
+    assert normalizer.normalize_address("12 FRACTION_0 1/2 Oak Ave") == "12 Fraction_0 1/2 Oak Ave"
+    # The same text earlier in the address, but not as a whole fraction
+    assert normalizer.normalize_address("_1/2 1/2 Oak Ave") == "_12 1/2 Oak Ave"
+    assert normalizer.normalize_address("66149 Lakes 3/4thSte 3/4th") == "66149 Lks 34Thste 3/4Th"
+    assert normalizer.normalize_address("12-1/2 Hill-Top Rd.") == "12 1/2 Hill Top Rd"
+
+def test_token_table_matches_rules():
+    """Every token-table entry must equal classifying the word directly, whatever its case."""
+    normalizer = AddressNormalizer()
+
+    for key, info in normalizer._token_table.items():
+        for word in (key, key.upper(), key.title(), key.swapcase().title().swapcase()):
+            assert normalizer._classify_token(word) == info, word
+
+    # Words the table doesn't know, including non-ASCII ones, are classified directly
+    assert normalizer.normalize_address("12 Main Street SOUTHEAST Apt 3 apt 4") == "12 Main Street SE Apt 3 4"
+    assert normalizer.normalize_address("3rd Ave N \u017ft") == "3rd Avenue N St"
+
+def test_result_cache():
+    normalizer = AddressNormalizer(cache_size=2)
+    uncached = AddressNormalizer()
+
+    for address in ["456 Oak Ave #5", "456 Oak Ave #5", "123 Main St", "789 Pine Dr"]:
+        assert normalizer.normalize_address(address) == uncached.normalize_address(address)
+
+    info = normalizer.cache_info()
+    assert (info['hits'], info['misses'], info['evictions']) == (1, 3, 1)
+    assert (info['size'], info['max_size']) == (2, 2)
+
+    # "456 Oak Ave #5" was the least recently used entry and got evicted
+    normalizer.normalize_address("456 Oak Ave #5")
+    assert normalizer.cache_info()['misses'] == 4
+
+    normalizer.clear_cache()
+    assert normalizer.cache_info() == {'hits': 0, 'misses': 0, 'evictions': 0, 'size': 0, 'max_size': 2}
+
+    # The cache is opt-in
+    assert uncached.cache_info()['size'] == 0
+
+def test_profiling():
+    profiled = AddressNormalizer(profile=NormalizationProfile(top_k=2))
+    plain = AddressNormalizer()
+    addresses = ["456 Oak Ave #5", "123 Main St /n Apt 4", "50 Lake Dr 1/2", "unlisted 12 Oak Ln", "!!!", "  "]
+
+    assert profiled.normalize_many(addresses) == plain.normalize_many(addresses)
+
+    stats = profiled.profile_stats()
+    assert stats['addresses'] == 5
+    assert list(stats['stages']) == list(PROFILE_STAGES)
+    assert stats['stages']['slash_n']['calls'] == 5
+    assert stats['stages']['slash_n']['changed'] == 1
+    assert stats['stages']['phrases']['changed'] == 1
+    assert stats['stages']['hash']['changed'] == 1
+    assert stats['stages']['special_chars']['changed'] == 1
+    # "!!!" is empty after special characters, so it never reaches the token stage
+    assert stats['stages']['tokens']['calls'] == 4
+    assert len(stats['slowest']) == 2
+    assert stats['slowest'][0][0] >= stats['slowest'][1][0]
+
+    # Profiling is opt-in
+    assert plain.profile_stats() is None
+
+def test_parse_address():
+    normalizer = AddressNormalizer()
+
+    assert normalizer.parse_address("12 1/2 S Oak Avenue #5") == ParsedAddress(
+        "12 1/2 S Oak Ave Unit 5", "12 1/2", "S", "Oak", "Ave", None, "Unit", "5")
+    assert normalizer.parse_address("456 Elm Road NW Apt 2") == ParsedAddress(
+        "456 Elm Road NW Apt 2", "456", None, "Elm", "Road", "NW", "Apt", "2")
+    # An ordinal is the street, not the house number; the street keeps at least one word
+    assert normalizer.parse_address("1st Street") == ParsedAddress("1st St", street="1st", suffix="St")
+    assert normalizer.parse_address("123 N Street").street == "N"
+    assert normalizer.parse_address("PO Box 12") == ParsedAddress("PO Box 12", street="PO Box 12")
+    assert normalizer.parse_address("Suite 200 East") == ParsedAddress(
+        "Suite 200 E", postdirectional="E", unit_type="Suite", unit="200")
+    assert normalizer.parse_address("   ") == ParsedAddress("   ")
+    assert normalizer.parse_address(None) == ParsedAddress(None)
+
+    # The normalized string is always what normalize_address returns
+    for address in ["123 Canyon Lake Circle", "25/1/2 Main St /n Apt 4", "See Mailing Address", "!!!"]:
+        assert normalizer.parse_address(address).normalized == normalizer.normalize_address(address)
+
 def test_specific_address():
     """Test a specific address interactively"""
     normalizer = AddressNormalizer()
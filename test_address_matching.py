@@ -0,0 +1,121 @@
+import pandas as pd
+import pytest
+
+from address_matching import (
+    TrigramIndex,
+    build_address_index,
+    build_trigram_index,
+    candidate_pairs,
+    find_duplicate_clusters,
+    fuzzy_duplicate_pairs,
+    related_columns,
+    trigram_similarity,
+)
+from normalize_addresses import normalize_address_columns
+
+
+def make_export():
+    return pd.DataFrame({
+        'CnAdrAll_1_01_Addrline1': [
+            "123 Canyon Lake Circle",
+            "123 Canyon Lk Cir",
+            "456 Main Street Northeast",
+            "123 Canyon Lake Cir",
+            "456 Main St NE",
+            None,
+            "789 Oak Ave",
+        ],
+        'CnAdrAll_1_01_City': ['Austin', 'Austin', 'Denver', 'Dallas', 'Denver', 'Austin', 'Austin'],
+        'CnAdrAll_1_01_ZIP': ['78701', '78701-1234', '80202', '75201', '80202', '78701', '78701'],
+    }, index=[f'r{i}' for i in range(7)])
+
+
+def test_related_columns():
+    df = make_export()
+    assert related_columns(df.columns, 'CnAdrAll_1_01_Addrline1') == {
+        'City': 'CnAdrAll_1_01_City',
+        'ZIP Code': 'CnAdrAll_1_01_ZIP',
+    }
+    assert related_columns(['Address1', 'City'], 'Address1') == {}
+
+
+def test_find_duplicate_clusters():
+    df = normalize_address_columns(make_export(), verbose=False)
+    column = 'CnAdrAll_1_01_Addrline1'
+
+    assert find_duplicate_clusters(df, column) == [['r0', 'r1', 'r3'], ['r2', 'r4']]
+    # ZIP+4 blocks with the 5-digit ZIP; the Dallas row no longer matches
+    assert find_duplicate_clusters(df, column, use_zip=True) == [['r0', 'r1'], ['r2', 'r4']]
+    assert find_duplicate_clusters(df, column, use_city=True) == [['r0', 'r1'], ['r2', 'r4']]
+
+    # Works without the n_ columns too
+    assert find_duplicate_clusters(make_export(), column) == [['r0', 'r1', 'r3'], ['r2', 'r4']]
+
+    index = build_address_index(df, column, use_zip=True)
+    assert index[('123 Canyon Lake Cir', '78701')] == ['r0', 'r1']
+
+    # An empty Address line 2 read with read_csv is a float column with no addresses
+    df['Address2'] = float('nan')
+    df = normalize_address_columns(df, specific_columns=['Address2'], verbose=False)
+    assert df['n_Address2'].dtype.kind == 'f'
+    assert find_duplicate_clusters(df, 'Address2') == []
+    assert list(candidate_pairs(df, 'Address2', blocking_key='house_number')) == []
+
+
+def test_candidate_pairs():
+    df = normalize_address_columns(make_export(), verbose=False)
+    column = 'CnAdrAll_1_01_Addrline1'
+
+    assert list(candidate_pairs(df, column)) == [('r0', 'r1'), ('r2', 'r4')]
+    assert list(candidate_pairs(df, column, blocking_key='zip')) == [
+        ('r0', 'r1'), ('r0', 'r6'), ('r1', 'r6'), ('r2', 'r4'),
+    ]
+    assert list(candidate_pairs(df, column, blocking_key='zip', max_block_size=2)) == [('r2', 'r4')]
+
+    with pytest.raises(ValueError):
+        list(candidate_pairs(df, column, blocking_key='street'))
+    with pytest.raises(ValueError):
+        list(candidate_pairs(pd.DataFrame({'Address1': ['1 Main St']}), 'Address1'))
+
+
+def test_trigram_index():
+    addresses = [
+        "123 Canyon Lake Cir", "123 Canyn Lake Cir", "456 Main St NE", "456 Main St",
+        "789 Oak Ave", None, "", "123 Canyon Lake Cir",
+    ]
+    index = TrigramIndex(addresses)
+    assert len(index) == 5
+
+    assert index.search("123 Canyon Lake Cir", top_k=2) == [
+        (1.0, "123 Canyon Lake Cir"),
+        (trigram_similarity("123 Canyon Lake Cir", "123 Canyn Lake Cir"), "123 Canyn Lake Cir"),
+    ]
+    assert [address for _, address in index.search("456 main st", threshold=0.5)] == ["456 Main St", "456 Main St NE"]
+    assert index.search("Nowhere", threshold=0.5) == []
+
+    # Every pair the brute-force comparison finds, and nothing else
+    for threshold in (0.3, 0.6, 0.8):
+        expected = {
+            (a, b) for i, b in enumerate(index.addresses) for a in index.addresses[:i]
+            if trigram_similarity(a, b) >= threshold
+        }
+        assert {(a, b) for a, b, _ in index.similar_pairs(threshold)} == expected
+
+    with pytest.raises(ValueError):
+        index.search("789 Oak Ave", threshold=0)
+
+
+def test_fuzzy_duplicate_pairs():
+    df = make_export()
+    df.loc['r6', 'CnAdrAll_1_01_Addrline1'] = "123 Canyn Lake Circle"
+    df = normalize_address_columns(df, verbose=False)
+    column = 'CnAdrAll_1_01_Addrline1'
+
+    pairs = list(fuzzy_duplicate_pairs(df, column, threshold=0.75))
+    assert [(a, b) for a, b, _ in pairs] == [
+        ('r0', 'r1'), ('r0', 'r3'), ('r1', 'r3'), ('r2', 'r4'), ('r0', 'r6'), ('r1', 'r6'), ('r3', 'r6'),
+    ]
+    assert {similarity for a, b, similarity in pairs if b == 'r6'} == {
+        trigram_similarity("123 Canyon Lake Cir", "123 Canyn Lake Cir")
+    }
+    assert len(build_trigram_index(df, column)) == 3
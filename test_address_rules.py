@@ -0,0 +1,92 @@
+import json
+import pickle
+
+import pandas as pd
+import pytest
+
+from address_normalizer import AddressNormalizer
+from address_rules import compile_rules, default_rules, load_rules, save_rules
+from normalize_addresses import normalize_address_columns
+
+
+def write_rules(path, content):
+    path.write_text(json.dumps(content))
+    return str(path)
+
+
+def test_rules_are_shared_and_immutable():
+    assert AddressNormalizer().rules is AddressNormalizer().rules
+    assert compile_rules() is default_rules()
+
+    rules = default_rules()
+    with pytest.raises(AttributeError):
+        rules.ignore_list = set()
+    with pytest.raises(TypeError):
+        rules.street_suffix_mapping['Street'] = 'Str'
+
+    # Only the tables are pickled; the same process gets the compiled RuleSet back
+    assert pickle.loads(pickle.dumps(rules)) is rules
+
+
+def test_load_rules(tmp_path):
+    path = write_rules(tmp_path / 'client.json', {
+        'street_suffix_mapping': {'Montee': 'Mtee'},
+        'ignore_list': ['Bureau'],
+    })
+    rules = load_rules(path)
+    assert load_rules(path) is rules
+    assert rules.fingerprint != default_rules().fingerprint
+
+    normalizer = AddressNormalizer(rules=rules)
+    assert normalizer.normalize_address("100 Montee Bureau #5") == "100 Mtee Bureau 5"
+    # The built-in rules still apply
+    assert normalizer.normalize_address("12 Canyon Lake Circle") == "12 Canyon Lake Cir"
+    assert AddressNormalizer().normalize_address("100 Montee Bureau #5") == "100 Montee Bureau Unit 5"
+
+    # A saved rule set is stand-alone and loads back to the same rules
+    saved = str(tmp_path / 'saved.json')
+    save_rules(rules, saved)
+    assert load_rules(saved) is rules
+
+    standalone = load_rules(write_rules(tmp_path / 'only.json', {
+        'extends': None,
+        'street_suffix_mapping': {'Street': 'St'},
+    }))
+    assert AddressNormalizer(rules=standalone).normalize_address("12 Main Street Apt 4") == "12 Main St Apt 4"
+
+    # Entries and abbreviations in any case match like the built-in ones
+    shouted = load_rules(write_rules(tmp_path / 'upper.json', {
+        'street_suffix_mapping': {'MONTEE': 'MTEE'},
+        'ignore_list': ['BUREAU'],
+        'directional': ['nnw'],
+        'spelled_directionals': {'nornorwest': 'nnw'},
+    }))
+    assert shouted is load_rules(write_rules(tmp_path / 'title.json', {
+        'street_suffix_mapping': {'Montee': 'Mtee'},
+        'ignore_list': ['Bureau'],
+        'directional': ['NNW'],
+        'spelled_directionals': {'NORNORWEST': 'NNW'},
+    }))
+    normalizer = AddressNormalizer(rules=shouted)
+    assert normalizer.normalize_address("12 Foo Montee Bureau #5") == "12 Foo Mtee Bureau 5"
+    assert normalizer.normalize_address("12 Nornorwest Foo Rd") == "12 NNW Foo Rd"
+    # "Mtee" is known as an abbreviation: kept when last, spelled out otherwise
+    assert normalizer.normalize_address("12 Lake Mtee") == "12 Lake Mtee"
+    assert normalizer.normalize_address("12 Mtee Lake") == "12 Montee Lk"
+
+    with pytest.raises(ValueError, match="NNE"):
+        load_rules(write_rules(tmp_path / 'spelled.json', {'spelled_directionals': {'Nornoreast': 'NNE'}}))
+
+    with pytest.raises(ValueError, match="suffixes"):
+        load_rules(write_rules(tmp_path / 'bad.json', {'suffixes': {}}))
+
+
+def test_normalize_address_columns_with_rules(tmp_path):
+    rules = load_rules(write_rules(tmp_path / 'client.json', {'street_suffix_mapping': {'Montee': 'Mtee'}}))
+    df = pd.DataFrame({'Address1': ["100 Montee Street", "12 Rue Montee", None, "100 Montee Street"]})
+
+    serial = normalize_address_columns(df, verbose=False, rules=rules)
+    assert serial['n_Address1'].tolist()[:2] == ["100 Montee St", "12 Rue Mtee"]
+
+    parallel = normalize_address_columns(df, verbose=False, rules=rules, workers=2)
+    pd.testing.assert_frame_equal(parallel, serial)
@@ -0,0 +1,108 @@
+import json
+import socket
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from address_normalizer import AddressNormalizer
+from address_service import NormalizationService, RequestBatcher, ServiceClient
+
+ADDRESSES = ["123 Canyon Lake Circle", "456 Oak Ave #5", None, "", "789 Pine Dr, Unit #3", 5]
+
+
+class GatedNormalizer(AddressNormalizer):
+    """Holds the first batch until ``gate`` is set, so later requests pile up behind it."""
+
+    def __init__(self):
+        super().__init__()
+        self.gate = threading.Event()
+        self.started = threading.Event()
+        self.batches = []
+
+    def normalize_many(self, addresses):
+        self.started.set()
+        self.gate.wait()
+        self.batches.append(list(addresses))
+        return super().normalize_many(addresses)
+
+
+def test_request_batcher():
+    normalizer = GatedNormalizer()
+    batcher = RequestBatcher(normalizer).start()
+    results = {}
+
+    def call(i):
+        results[i] = batcher.normalize([ADDRESSES[i]])
+
+    threads = [threading.Thread(target=call, args=(0,))]
+    threads[0].start()
+    # The first request is taken on its own; the others queue behind it
+    assert normalizer.started.wait(5)
+    threads += [threading.Thread(target=call, args=(i,)) for i in range(1, len(ADDRESSES))]
+    for thread in threads[1:]:
+        thread.start()
+    while batcher.stats()['queue_depth'] < len(ADDRESSES) - 1:
+        time.sleep(0.001)
+    normalizer.gate.set()
+    for thread in threads:
+        thread.join()
+    batcher.stop()
+
+    expected = AddressNormalizer().normalize_many(ADDRESSES)
+    assert [results[i][0] for i in range(len(ADDRESSES))] == expected
+    assert [len(batch) for batch in normalizer.batches] == [1, len(ADDRESSES) - 1]
+
+    stats = batcher.stats()
+    assert (stats['requests'], stats['addresses'], stats['batches']) == (6, 6, 2)
+    assert stats['largest_batch'] == 5 and stats['max_queue_depth'] >= 5
+    assert stats['queue_depth'] == 0
+    assert 0 <= stats['latency_ms']['p50'] <= stats['latency_ms']['p99'] <= stats['latency_ms']['max']
+
+    with pytest.raises(RuntimeError):
+        batcher.normalize(["1 Main St"])
+
+
+def post(url, body, content_type):
+    request = urllib.request.Request(url + '/normalize', data=body.encode('utf-8'),
+                                     headers={'Content-Type': content_type})
+    with urllib.request.urlopen(request) as response:
+        return response.read().decode('utf-8')
+
+
+@pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason="needs Unix sockets")
+def test_normalization_service(tmp_path):
+    socket_path = str(tmp_path / 'normalizer.sock')
+    expected = AddressNormalizer().normalize_many(ADDRESSES)
+
+    with NormalizationService(port=0, socket_path=socket_path, cache_size=100) as service:
+        with ServiceClient(service.url) as client:
+            assert client.normalize(ADDRESSES) == expected
+            assert client.normalize_address("456 Oak Ave #5") == "456 Oak Ave Unit 5"
+            assert client.stats()['requests'] == 2
+
+        assert json.loads(post(service.url, json.dumps({'addresses': ADDRESSES}), 'application/json')) == {
+            'normalized': expected
+        }
+        assert post(service.url, "123 Canyon Lake Circle\r\n456 Oak Ave #5\n", 'text/plain') == (
+            "123 Canyon Lake Cir\n456 Oak Ave Unit 5\n"
+        )
+        with pytest.raises(urllib.error.HTTPError) as error:
+            post(service.url, '{"address": "1 Main St"}', 'application/json')
+        assert error.value.code == 400
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(service.url + '/missing')
+        assert error.value.code == 404
+
+        with ServiceClient(socket_path=socket_path) as client:
+            assert client.normalize(ADDRESSES) == expected
+            assert client.normalize_address("789 Pine Dr, Unit #3") == "789 Pine Dr Unit 3"
+            with pytest.raises(ValueError):
+                client._request({'address': "1 Main St"})
+            stats = client.stats()
+        assert stats['requests'] == 6
+        assert stats['cache']['hits'] > 0
+
+    assert not (tmp_path / 'normalizer.sock').exists()
@@ -0,0 +1,72 @@
+import pandas as pd
+import pytest
+
+from address_normalizer import AddressNormalizer
+from address_rules import compile_rules
+from address_store import NormalizationStore, rules_fingerprint
+from normalize_addresses import normalize_address_columns, process_file
+
+
+def test_store_round_trip(tmp_path):
+    path = str(tmp_path / 'store.sqlite')
+    with NormalizationStore(path) as store:
+        assert store.get_many(["123 Main Street"]) == {}
+        store.put_many([("123 Main Street", "123 Main St")])
+
+    with NormalizationStore(path) as store:
+        assert not store.invalidated
+        assert store.get_many(["123 Main Street", "other"]) == {"123 Main Street": "123 Main St"}
+        # More addresses than fit in one IN (...) query
+        store.put_many((f"{i} Oak Ave", f"{i} Oak Ave") for i in range(1200))
+        assert len(store.get_many(f"{i} Oak Ave" for i in range(1200))) == 1200
+
+
+def test_store_invalidated_when_rules_change(tmp_path):
+    path = str(tmp_path / 'store.sqlite')
+    with NormalizationStore(path) as store:
+        store.put_many([("123 Main Street", "123 Main St")])
+
+    changed = AddressNormalizer(rules=compile_rules(street_suffix_mapping={'Street': 'Str'}))
+    assert rules_fingerprint(changed) != rules_fingerprint(AddressNormalizer())
+
+    with NormalizationStore(path, normalizer=changed) as store:
+        assert store.invalidated
+        assert len(store) == 0
+
+        # A store opened for other rules is refused instead of serving stale results
+        with pytest.raises(ValueError, match="different normalization rules"):
+            normalize_address_columns(pd.DataFrame({'Address1': ["12 Main St"]}), verbose=False, store=store)
+
+
+def test_normalize_address_columns_with_store(tmp_path):
+    path = str(tmp_path / 'store.sqlite')
+    df = pd.DataFrame({
+        'Address1': ["123 Canyon Lake Circle", "456 Oak Ave #5", None, "", "123 Canyon Lake Circle"],
+        'Address2': ["Apt 4", None, "456 Oak Ave #5", "Suite 2", None],
+    })
+    expected = normalize_address_columns(df, verbose=False)
+
+    first = normalize_address_columns(df, verbose=False, store=path)
+    pd.testing.assert_frame_equal(first, expected)
+    with NormalizationStore(path) as store:
+        assert len(store) == 4
+        # A stored result is served instead of normalizing again
+        store.put_many([("Apt 4", "stored")])
+
+        second = normalize_address_columns(df, verbose=False, store=store)
+    assert second['n_Address2'].tolist()[0] == "stored"
+    assert second['n_Address1'].tolist() == expected['n_Address1'].tolist()
+
+
+def test_process_file_with_store(tmp_path):
+    input_file = tmp_path / 'export.csv'
+    pd.DataFrame({'Address1': ["123 Canyon Lake Circle", "456 Oak Ave #5"]}).to_csv(input_file, index=False)
+    path = str(tmp_path / 'store.sqlite')
+
+    for chunksize in (None, 1):
+        process_file(str(input_file), chunksize=chunksize, encoding='utf-8', verbose=False, store=path)
+        result = pd.read_csv(tmp_path / 'export_proc.csv')
+        assert result['n_Address1'].tolist() == ["123 Canyon Lake Cir", "456 Oak Ave Unit 5"]
+
+    with NormalizationStore(path) as store:
+        assert len(store) == 2
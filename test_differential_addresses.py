@@ -0,0 +1,71 @@
+import json
+
+import pandas as pd
+
+from address_normalizer import AddressNormalizer
+from differential_addresses import (
+    ENGINES,
+    check_engine,
+    generate_messy_corpus,
+    main,
+    minimize_difference,
+    run_differential,
+    same_output,
+)
+from reference_normalizer import ReferenceNormalizer
+
+
+def test_engines_match_reference():
+    addresses = generate_messy_corpus(2000, seed=3) + [None, float('nan'), 12345, "", "   ", "#", "/n"]
+    results = run_differential(addresses)
+    assert [result['engine'] for result in results] == list(ENGINES)
+    for result in results:
+        assert result['rows'] == len(addresses)
+        assert result['mismatches'] == 0, (result['engine'], result['examples'])
+        assert result['speedup'] > 0
+
+
+def test_same_output():
+    assert same_output(None, None)
+    assert same_output(float('nan'), float('nan'))
+    assert same_output("123 Main St", "123 Main St")
+    assert not same_output(None, float('nan'))
+    assert not same_output("123 Main St", "123 Main St ")
+
+
+def test_minimize_difference():
+    reference = ReferenceNormalizer()
+
+    def broken(addresses):
+        # Drops '#' instead of turning it into "Unit"
+        normalizer = AddressNormalizer()
+        return [normalizer.normalize_address(a.replace('#', '') if isinstance(a, str) else a) for a in addresses]
+
+    def differs(address):
+        return reference.normalize_address(address) != broken([address])[0]
+
+    assert minimize_difference("7921 Canyon Lake Cir, Suite 3 and #5", differs) == "#"
+    assert minimize_difference("1 Main St", lambda address: 'Main' in address) == "Main"
+
+    addresses = ["456 Oak Ave #5", "123 Main St", "456 Oak Ave #5", "789 Pine Dr #3B"]
+    expected = [reference.normalize_address(a) for a in addresses]
+    result = check_engine(addresses, broken, expected, max_examples=1)
+    assert result['mismatches'] == 3
+    assert result['examples'] == [
+        {'row': 0, 'address': "456 Oak Ave #5", 'minimized': "#", 'expected': "Unit", 'actual': ""},
+    ]
+
+
+def test_main(tmp_path, capsys):
+    export = tmp_path / 'export.csv'
+    pd.DataFrame({'Address1': ["123 Canyon Lake Circle", "456 Oak Ave #5", None], 'City': ['A', 'B', 'C']}).to_csv(
+        export, index=False)
+    output = tmp_path / 'results.json'
+
+    status = main(['--rows', '200', '--engines', 'normalize_many', 'cached', '--input', str(export),
+                   '--output', str(output)])
+    assert status == 0
+    report = json.loads(output.read_text())
+    assert list(report) == ['generated', 'messy', 'files']
+    assert report['files'][0]['rows'] == 3
+    assert 'normalize_many' in capsys.readouterr().out
@@ -0,0 +1,446 @@
+import codecs
+import json
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import normalize_addresses
+from address_normalizer import AddressNormalizer
+from normalize_addresses import (
+    add_normalized_columns,
+    classify_columns,
+    create_enhanced_reverse_mapping,
+    detect_file_encoding,
+    expand_input_paths,
+    main,
+    normalize_address_columns,
+    normalize_csv_mapped,
+    normalize_csv_streaming,
+    parse_address_columns,
+    process_file,
+    read_csv_with_encoding,
+    read_table,
+    run_pipeline,
+)
+
+ADDRESSES = [
+    "123 Canyon Lake Circle",
+    "456 Oak Ave #5",
+    None,
+    np.nan,
+    "",
+    "   ",
+    "25/1/2 Main St /n Apt 4",
+    "See Mailing Address",
+    "789 Pine Dr, Unit #3",
+    "123 Canyon Lake Circle",
+]
+
+
+def expected_outputs(addresses):
+    normalizer = AddressNormalizer()
+    return [normalizer.normalize_address(x) if pd.notna(x) else x for x in addresses]
+
+
+def assert_same_values(actual, expected):
+    assert len(actual) == len(expected)
+    for a, e in zip(actual, expected):
+        if pd.isna(e):
+            assert pd.isna(a)
+        else:
+            assert a == e
+
+
+def test_normalize_many():
+    normalizer = AddressNormalizer()
+    assert_same_values(normalizer.normalize_many(ADDRESSES), expected_outputs(ADDRESSES))
+    assert_same_values(normalizer.normalize_many(np.array(ADDRESSES, dtype=object)), expected_outputs(ADDRESSES))
+
+
+def test_normalize_series():
+    normalizer = AddressNormalizer()
+    series = pd.Series(ADDRESSES, index=range(10, 20), dtype=object)
+    result = normalizer.normalize_series(series)
+    assert list(result.index) == list(series.index)
+    assert_same_values(result.tolist(), expected_outputs(ADDRESSES))
+
+    # Empty and numeric columns come back unchanged
+    assert normalizer.normalize_series(pd.Series([np.nan, np.nan])).isna().all()
+    assert normalizer.normalize_series(pd.Series([], dtype=object)).empty
+
+    # Categories are not assigned into; two of them may normalize to the same value
+    categorical = pd.Series(pd.Categorical(["1 Main Street", "1 Main St", None, "2 Oak Avenue"]))
+    assert_same_values(normalizer.normalize_series(categorical).tolist(), ["1 Main St", "1 Main St", None, "2 Oak Ave"])
+
+
+def test_normalize_series_with_cache():
+    normalizer = AddressNormalizer(cache_size=100)
+    series = pd.Series(ADDRESSES * 3, dtype=object)
+    assert_same_values(normalizer.normalize_series(series).tolist(), expected_outputs(ADDRESSES * 3))
+
+    # Duplicates are folded before the cache is consulted; a second column hits it
+    info = normalizer.cache_info()
+    assert (info['hits'], info['misses']) == (0, 5)
+    normalizer.normalize_series(series)
+    assert normalizer.cache_info()['hits'] == 5
+
+
+def test_normalize_address_columns():
+    df = pd.DataFrame({
+        'Id': range(len(ADDRESSES)),
+        'Address1': ADDRESSES,
+        'CnAdrAll_1_01_Addrline2': list(reversed(ADDRESSES)),
+        'CnAdrAll_1_01_City': ['Austin'] * len(ADDRESSES),
+    })
+    result = normalize_address_columns(df)
+
+    assert list(result.columns) == [
+        'Id', 'Address1', 'n_Address1',
+        'CnAdrAll_1_01_Addrline2', 'n_CnAdrAll_1_01_Addrline2',
+        'CnAdrAll_1_01_City',
+    ]
+    assert_same_values(result['n_Address1'].tolist(), expected_outputs(ADDRESSES))
+    assert_same_values(result['n_CnAdrAll_1_01_Addrline2'].tolist(), expected_outputs(list(reversed(ADDRESSES))))
+    assert 'n_Address1' not in df.columns
+
+
+def test_normalize_address_columns_inplace():
+    df = pd.DataFrame({
+        'Address1': ADDRESSES,
+        'Id': range(len(ADDRESSES)),
+        'CnAdrAll_1_01_Addrline2': list(reversed(ADDRESSES)),
+    })
+    before = df.copy()
+
+    result = normalize_address_columns(df, verbose=False)
+    pd.testing.assert_frame_equal(df, before)
+
+    same = normalize_address_columns(df, verbose=False, inplace=True)
+    assert same is df
+    pd.testing.assert_frame_equal(df, result)
+
+    # Running again would silently duplicate the n_ columns
+    with pytest.raises(ValueError, match="n_Address1"):
+        normalize_address_columns(df, verbose=False)
+
+
+def test_add_normalized_columns():
+    df = pd.DataFrame([[1, 2, 3]], columns=['a', 'b', 'b'], index=[7])
+    new = {'n_b': pd.Series(['x'], index=[7]), 'n_a': pd.Series(['y'], index=[7])}
+
+    result = add_normalized_columns(df, new)
+    # Duplicate labels get the n_ column after the first one, like DataFrame.insert
+    assert list(result.columns) == ['a', 'n_a', 'b', 'n_b', 'b']
+    assert result.iloc[0].tolist() == [1, 'y', 2, 'x', 3]
+    assert list(df.columns) == ['a', 'b', 'b']
+
+
+def test_parse_address_columns():
+    df = pd.DataFrame({'Address1': ADDRESSES, 'City': 'Austin'})
+    result = parse_address_columns(df, verbose=False)
+
+    fields = ['house_number', 'predirectional', 'street', 'suffix', 'postdirectional', 'unit_type', 'unit']
+    assert list(result.columns) == ['Address1', 'n_Address1'] + [f'n_Address1_{f}' for f in fields] + ['City']
+    assert_same_values(result['n_Address1'].tolist(), normalize_address_columns(df, verbose=False)['n_Address1'].tolist())
+    assert result.loc[1, ['n_Address1_house_number', 'n_Address1_street', 'n_Address1_suffix',
+                          'n_Address1_unit_type', 'n_Address1_unit']].tolist() == ['456', 'Oak', 'Ave', 'Unit', '5']
+    assert pd.isna(result.loc[2, 'n_Address1_street'])
+    assert list(df.columns) == ['Address1', 'City']
+
+    inplace = parse_address_columns(df, verbose=False, inplace=True)
+    assert inplace is df
+    pd.testing.assert_frame_equal(inplace, result)
+
+
+def test_normalize_address_columns_parallel():
+    df = pd.DataFrame({
+        'Address1': ADDRESSES * 5,
+        'Address2': list(reversed(ADDRESSES)) * 5,
+    })
+    serial = normalize_address_columns(df)
+    parallel = normalize_address_columns(df, workers=2)
+    assert list(parallel.columns) == list(serial.columns)
+    for col in ('n_Address1', 'n_Address2'):
+        pd.testing.assert_series_equal(parallel[col], serial[col])
+    # Nulls stay as they were, also in columns with no other non-strings
+    strings = pd.DataFrame({'Address1': pd.Series(["456 Oak Ave #5", None] * 3, dtype=object)})
+    pd.testing.assert_frame_equal(normalize_address_columns(strings, workers=2), normalize_address_columns(strings))
+
+
+def test_normalize_csv_streaming(tmp_path):
+    input_file = tmp_path / 'export.csv'
+    df = pd.DataFrame({
+        'Id': [f'{i:05d}' for i in range(len(ADDRESSES) * 3)],
+        'Address1': ADDRESSES * 3,
+        'CnAdrAll_1_01_Addrline2': list(reversed(ADDRESSES)) * 3,
+    })
+    df.to_csv(input_file, index=False)
+
+    in_memory = normalize_address_columns(pd.read_csv(input_file, dtype=str))
+    expected_file = tmp_path / 'expected.csv'
+    in_memory.to_csv(expected_file, index=False)
+
+    output_file = tmp_path / 'export_proc.csv'
+    stats = normalize_csv_streaming(str(input_file), str(output_file), chunksize=4, encoding='utf-8')
+
+    assert stats == {'rows': 30, 'chunks': 8, 'columns': ['Address1', 'CnAdrAll_1_01_Addrline2']}
+    assert output_file.read_bytes() == expected_file.read_bytes()
+
+    # Without overlapping read/normalize/write the output is the same
+    sequential_file = tmp_path / 'sequential.csv'
+    normalize_csv_streaming(str(input_file), str(sequential_file), chunksize=4, encoding='utf-8',
+                            pipeline_depth=0)
+    assert sequential_file.read_bytes() == expected_file.read_bytes()
+
+
+def test_normalize_csv_mapped(tmp_path):
+    input_file = tmp_path / 'export.csv'
+    input_file.write_bytes(
+        b'Id,Address1,Note,Address2\r\n'
+        b'1,"123 Main Street, Apt 4",x,"Suite ""5"""\r\n'
+        b'2,"456 Oak\nAve #5","multi\r\nline, ""q""",N/A\r\n'
+        b'\r\n'
+        b' \t \r\n'
+        b'3,,5"3 tall,789 Pine Dr\n'
+        b'4\n'
+        b'5,12 Canyon Lake Circle'
+    )
+    output_file = tmp_path / 'mapped.csv'
+    stats = normalize_csv_mapped(str(input_file), str(output_file), chunksize=2, encoding='utf-8')
+    assert stats == {'rows': 5, 'chunks': 3, 'columns': ['Address1', 'Address2']}
+
+    # Untouched fields, quoting and line endings are copied byte for byte
+    assert output_file.read_bytes() == (
+        b'Id,Address1,n_Address1,Note,Address2,n_Address2\r\n'
+        b'1,"123 Main Street, Apt 4",123 Main Street Apt 4,x,"Suite ""5""",Suite 5\r\n'
+        b'2,"456 Oak\nAve #5",456 Oak Ave Unit 5,"multi\r\nline, ""q""",N/A,\r\n'
+        b'3,,,5"3 tall,789 Pine Dr,789 Pine Dr\n'
+        b'4,,,,,\n'
+        b'5,12 Canyon Lake Circle,12 Canyon Lake Cir,,,\n'
+    )
+
+    # The n_ values are the ones the streaming path computes
+    streamed_file = tmp_path / 'streamed.csv'
+    normalize_csv_streaming(str(input_file), str(streamed_file), chunksize=2, encoding='utf-8')
+    pd.testing.assert_frame_equal(pd.read_csv(output_file, dtype=str), pd.read_csv(streamed_file, dtype=str))
+
+    # Lines of only spaces and tabs are blank lines to pandas too
+    input_file.write_bytes(b'Address1\n12 Main Street\n   \n\t\n9 Elm St\n')
+    normalize_csv_mapped(str(input_file), str(output_file), encoding='utf-8')
+    normalize_csv_streaming(str(input_file), str(streamed_file), encoding='utf-8')
+    assert output_file.read_bytes() == b'Address1,n_Address1\n12 Main Street,12 Main St\n9 Elm St,9 Elm St\n'
+    pd.testing.assert_frame_equal(pd.read_csv(output_file, dtype=str), pd.read_csv(streamed_file, dtype=str))
+
+    with pytest.raises(ValueError, match="UTF-8"):
+        normalize_csv_mapped(str(input_file), str(output_file), encoding='utf-16')
+
+    # process_file falls back to the usual path for other encodings
+    latin_file = tmp_path / 'latin.csv'
+    latin_file.write_bytes('Address1\n12 Caf\xe9 Street\n'.encode('cp1252'))
+    summary = process_file(str(latin_file), encoding='cp1252', verbose=False, memory_map=True)
+    assert pd.read_csv(summary['output'])['n_Address1'].tolist() == ['12 Caf\xe9 St']
+
+
+def test_run_pipeline():
+    written = []
+    run_pipeline(range(20), lambda x: x * 2, written.append, depth=3)
+    assert written == [x * 2 for x in range(20)]
+
+    def fail_on_seven(x):
+        if x == 7:
+            raise ValueError("bad chunk")
+        return x
+
+    for depth in (0, 2):
+        written = []
+        with pytest.raises(ValueError, match="bad chunk"):
+            run_pipeline(range(20), fail_on_seven, written.append, depth=depth)
+        assert written == list(range(7))
+
+    def broken_reader():
+        yield 1
+        raise OSError("read failed")
+
+    with pytest.raises(OSError, match="read failed"):
+        run_pipeline(broken_reader(), lambda x: x, lambda x: None)
+
+
+def test_main_batch(tmp_path):
+    df = pd.DataFrame({'Id': range(len(ADDRESSES)), 'Address1': ADDRESSES})
+    for name in ('a.csv', 'b.csv', 'a_proc.csv'):
+        df.to_csv(tmp_path / name, index=False)
+
+    assert expand_input_paths([str(tmp_path)]) == [str(tmp_path / 'a.csv'), str(tmp_path / 'b.csv')]
+
+    output_dir = tmp_path / 'out'
+    status = main([str(tmp_path), '--output-dir', str(output_dir), '--workers', '2',
+                   '--encoding', 'utf-8'])
+    assert status == 0
+    assert sorted(p.name for p in output_dir.iterdir()) == ['a_proc.csv', 'b_proc.csv']
+
+    result = pd.read_csv(output_dir / 'b_proc.csv')
+    assert list(result.columns) == ['Id', 'Address1', 'n_Address1']
+
+    assert main([str(tmp_path / 'missing.csv'), '--output-dir', str(output_dir)]) == 1
+
+
+def test_main_interactive(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr('builtins.input', lambda prompt: '1')
+
+    pd.DataFrame({'Id': [1, 2], 'Name': ['Ann', 'Bo']}).to_csv('names.csv', index=False)
+    assert main([]) == 1
+    assert "No address columns detected" in capsys.readouterr().out
+    assert not (tmp_path / 'names_proc.csv').exists()
+
+    (tmp_path / 'names.csv').unlink()
+    pd.DataFrame({'Address1': ADDRESSES}).to_csv('addresses.csv', index=False)
+    assert main([]) == 0
+    assert "Successfully saved" in capsys.readouterr().out
+    assert pd.read_csv(tmp_path / 'addresses_proc.csv')['n_Address1'].tolist()[:2] == expected_outputs(ADDRESSES)[:2]
+
+
+def test_main_profile(tmp_path, capsys):
+    input_file = tmp_path / 'a.csv'
+    pd.DataFrame({'Address1': ADDRESSES}).to_csv(input_file, index=False)
+
+    assert main([str(input_file), '--profile', '3', '--encoding', 'utf-8']) == 0
+    output = capsys.readouterr().out
+    assert "Profiled 5 addresses" in output
+    assert "Slowest inputs:" in output
+    assert pd.read_csv(tmp_path / 'a_proc.csv')['n_Address1'].tolist()[:2] == expected_outputs(ADDRESSES)[:2]
+
+    with pytest.raises(SystemExit):
+        main([str(input_file), '--profile', '--workers', '2'])
+
+
+def test_import_does_not_load_pandas():
+    # pandas is only needed once a file is read or a DataFrame is built
+    script = "import sys, normalize_addresses; print('pandas' in sys.modules)"
+    output = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True).stdout
+    assert output.strip() == 'False'
+
+
+def test_detect_file_encoding(tmp_path):
+    samples = {
+        'ascii.csv': ('Address1\n123 Main St\n' * 1000).encode('ascii'),
+        'utf8.csv': 'Address1\n12 Straße Rd\n'.encode('utf-8'),
+        'bom.csv': codecs.BOM_UTF8 + 'Address1\n12 Straße Rd\n'.encode('utf-8'),
+        'cp1252.csv': 'Address1\n12 Café “Way”\n'.encode('cp1252'),
+        'latin1.csv': b'Address1\n12 Caf\xe9 \x81Way\n',
+        'utf16.csv': 'Address1\n12 Main St\n'.encode('utf-16'),
+    }
+    expected = {'ascii.csv': 'utf-8', 'utf8.csv': 'utf-8', 'bom.csv': 'utf-8-sig',
+                'cp1252.csv': 'cp1252', 'latin1.csv': 'latin-1', 'utf16.csv': 'utf-16'}
+
+    cache_file = tmp_path / 'encodings.json'
+    for name, data in samples.items():
+        (tmp_path / name).write_bytes(data)
+        assert detect_file_encoding(str(tmp_path / name), cache_file=str(cache_file)) == expected[name]
+        assert read_csv_with_encoding(str(tmp_path / name)).columns.tolist() == ['Address1']
+
+    assert len(json.loads(cache_file.read_text())) == len(samples)
+
+
+def test_detect_file_encoding_split_utf8_sequence(tmp_path, monkeypatch):
+    # A multi-byte character split across two blocks is still valid UTF-8
+    monkeypatch.setattr(normalize_addresses, 'ENCODING_BLOCK_SIZE', 4)
+    path = tmp_path / 'split.csv'
+    path.write_bytes('abcé'.encode('utf-8'))
+    assert detect_file_encoding(str(path)) == 'utf-8'
+
+    # ...but one interrupted by ASCII, or truncated at the end of the file, is not
+    path.write_bytes(b'abc\xc3defg\xa9')
+    assert detect_file_encoding(str(path)) == 'cp1252'
+    path.write_bytes(b'abc\xc3')
+    assert detect_file_encoding(str(path)) == 'cp1252'
+
+
+def test_detect_file_encoding_undefined_byte_before_invalid_utf8(tmp_path, monkeypatch):
+    # 'Á' is C3 81 in UTF-8; once a later block is not UTF-8, the 0x81 rules out cp1252
+    monkeypatch.setattr(normalize_addresses, 'ENCODING_BLOCK_SIZE', 16)
+    path = tmp_path / 'mixed.csv'
+    path.write_bytes('Address1\n12 Álamo St\n'.encode('utf-8') + b'9 Elm St\n' * 20 + b'12 Caf\xe9 Way\n')
+    assert detect_file_encoding(str(path)) == 'latin-1'
+    assert read_csv_with_encoding(str(path))['Address1'].tolist()[-1] == '12 Caf\xe9 Way'
+
+
+def test_classify_columns():
+    columns = ['Id', 'CnAdrAll_1_01_Addrline1', 'CnAdrAll_1_01_City', 'Address1',
+               'CnRelInd_1_01_Adr_Addrline1', 'CnRelInd_1_01_Adr_ZIP', 'CnAdrAll_1_02_State',
+               'CnAdrAll_1_01_Addrline1_Old', 'PRIMARY_ADDRESS']
+    reverse_mapping, groups = classify_columns(columns)
+
+    # Exact matches first (in COLUMN_MAPPING order), then pattern matches in column order
+    assert list(reverse_mapping.items()) == [
+        ('Address1', 'Address line 1'),
+        ('PRIMARY_ADDRESS', 'Address line 1'),
+        ('CnAdrAll_1_01_Addrline1', 'Address line 1'),
+        ('CnAdrAll_1_01_City', 'City'),
+        ('CnRelInd_1_01_Adr_Addrline1', 'Address line 1'),
+        ('CnRelInd_1_01_Adr_ZIP', 'ZIP Code'),
+        ('CnAdrAll_1_02_State', 'State'),
+    ]
+    assert create_enhanced_reverse_mapping(columns) == reverse_mapping
+    assert groups == {
+        'CnAdrAll_1_01': {'Address line 1': 'CnAdrAll_1_01_Addrline1', 'City': 'CnAdrAll_1_01_City'},
+        'CnRelInd_1_01': {'Address line 1': 'CnRelInd_1_01_Adr_Addrline1', 'ZIP Code': 'CnRelInd_1_01_Adr_ZIP'},
+        'CnAdrAll_1_02': {'State': 'CnAdrAll_1_02_State'},
+    }
+
+
+def test_columnar_files(tmp_path, monkeypatch):
+    pytest.importorskip('pyarrow')
+    df = pd.DataFrame({
+        'Id': range(len(ADDRESSES)),
+        'Address1': ADDRESSES,
+        'Amount': [float(i) for i in range(len(ADDRESSES))],
+    })
+    df.to_parquet(tmp_path / 'export.parquet', index=False)
+    df.to_feather(tmp_path / 'export.arrow')
+
+    expected = expected_outputs(ADDRESSES)
+    for name in ('export.parquet', 'export.arrow'):
+        summary = process_file(str(tmp_path / name), chunksize=4, verbose=False)
+        assert summary['rows'] == len(ADDRESSES)
+        assert summary['columns'] == ['Address1']
+
+        result = read_table(summary['output'])
+        assert list(result.columns) == ['Id', 'Address1', 'n_Address1', 'Amount']
+        assert result['Amount'].tolist() == df['Amount'].tolist()
+        assert_same_values(result['n_Address1'].tolist(), expected)
+
+    # Workers get one pool for the whole file
+    pools = []
+    create_worker_pool = normalize_addresses.create_worker_pool
+    monkeypatch.setattr(normalize_addresses, 'create_worker_pool',
+                        lambda *args: pools.append(args) or create_worker_pool(*args))
+    summary = process_file(str(tmp_path / 'export.parquet'), chunksize=4, workers=2, verbose=False)
+    assert len(pools) == 1
+    result = read_table(summary['output'])
+    assert result['Amount'].tolist() == df['Amount'].tolist()
+    assert_same_values(result['n_Address1'].tolist(), expected)
+
+    # Converting between CSV and columnar formats goes through pandas
+    summary = process_file(str(tmp_path / 'export.parquet'), output_format='csv', verbose=False)
+    assert summary['output'].endswith('export_proc.csv')
+    assert pd.read_csv(summary['output'])['n_Address1'].tolist()[:2] == expected[:2]
+
+    assert read_table(str(tmp_path / 'export.arrow'), columns=['Address1']).columns.tolist() == ['Address1']
+
+
+def test_categorical_columns(tmp_path):
+    df = pd.DataFrame({'Address1': pd.Categorical(["1 Main Street", "2 Oak Avenue", None, "1 Main St"])})
+    expected = ["1 Main St", "2 Oak Ave", None, "1 Main St"]
+    for options in ({}, {'workers': 2}, {'store': str(tmp_path / 'results.sqlite')}):
+        result = normalize_address_columns(df, verbose=False, **options)
+        assert_same_values(result['n_Address1'].tolist(), expected)
+
+    # Dictionary-encoded Arrow columns are read back as categoricals
+    pytest.importorskip('pyarrow')
+    df.to_feather(tmp_path / 'export.arrow')
+    summary = process_file(str(tmp_path / 'export.arrow'), verbose=False)
+    assert_same_values(read_table(summary['output'])['n_Address1'].tolist(), expected)